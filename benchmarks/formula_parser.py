@@ -0,0 +1,86 @@
+"""
+Compares the formula parser with the character loop the starting materials used.
+
+Run from the repository root:
+
+    python benchmarks/formula_parser.py [--repeat 20]
+
+The corpus holds the names of precursors, fluxes and dopants as they occur in
+growth runs, each repeated like in the starting materials of many templates. The
+loop only handled integer counts of plain elements and is timed on the formulas it
+can read. The parser is timed cold, with its cache cleared before every pass, and
+warm.
+"""
+
+import argparse
+import timeit
+
+from cpfs_synthesis.formula import atomic_fractions, element_counts
+
+CORPUS = (
+    'Co Bi Te Bi2Te3 Sb2Te3 Fe Se FeSe Fe0.95Se Mn MnBi2Te4 Cr2Ge2Te6 Sn Pb In Ga '
+    'Ce Yb Al Zn Cu Ag Au Pt Pd Rh Ir Ru Nb3Sn CoSn Co3Sn2S2 Fe3GeTe2 NaCl KCl '
+    'Na2CO3 K2CO3 B2O3 PbO MoO3 I2 TeCl4 CrCl3 Ca(OH)2 K4[Fe(CN)6] CuSO4·5H2O '
+    'Na2CO3*10H2O Mn0.5Fe0.5Si La1.85Sr0.15CuO4 (Bi0.5Sb0.5)2Te3'
+).split()
+COPIES = 200
+
+
+def character_loop(name: str) -> list[tuple[str, float]]:
+    """The elemental composition as the starting materials used to derive it."""
+    elements = []
+    nums = []
+    tmp_atom = name[0]
+    tmp_number = ''
+    for i in range(1, len(name)):
+        if name[i].isalpha():
+            if name[i].isupper():
+                elements.append(tmp_atom)
+                if tmp_number == '':
+                    tmp_number = '1'
+                nums.append(int(tmp_number))
+                tmp_atom = name[i]
+                tmp_number = ''
+            if name[i].islower():
+                tmp_atom += name[i]
+        if name[i] in '1234567890':
+            tmp_number += name[i]
+    elements.append(tmp_atom)
+    if tmp_number == '':
+        tmp_number = '1'
+    nums.append(int(tmp_number))
+    return [(element, num / sum(nums)) for element, num in zip(elements, nums)]
+
+
+def cold(names: list[str]) -> None:
+    element_counts.cache_clear()
+    atomic_fractions.cache_clear()
+    for name in names:
+        atomic_fractions(name)
+
+
+def warm(names: list[str]) -> None:
+    for name in names:
+        atomic_fractions(name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    names = list(CORPUS) * COPIES
+    simple = [name for name in names if name.isalnum()]
+    print(f'{len(names)} names, {len(CORPUS)} distinct, {len(simple)} plain')
+    for label, function in (
+        ('character loop (plain)', lambda: [character_loop(n) for n in simple]),
+        ('parser, plain, cold', lambda: cold(simple)),
+        ('parser, cold cache', lambda: cold(names)),
+        ('parser, warm cache', lambda: warm(names)),
+    ):
+        seconds = min(timeit.repeat(function, number=1, repeat=args.repeat))
+        print(f'{label:24} {seconds * 1000:8.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
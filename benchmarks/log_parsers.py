@@ -0,0 +1,135 @@
+"""
+Measures the throughput of the controller log formats on a multi-day log.
+
+Run from the repository root:
+
+    python benchmarks/log_parsers.py [--days 3] [--repeat 3]
+
+For each registered format, the script writes a synthetic 1 Hz log of a growth run
+over `--days` days to a temporary directory. It then times reading the log with
+`LogReader` and storing it with `write_log_hdf5`. As a reference, it also times
+converting the `cpfs` log row by row with `csv.reader`.
+"""
+
+import argparse
+import csv
+import datetime
+import os
+import tempfile
+import timeit
+
+from cpfs_synthesis.logs import LogReader, write_log_hdf5
+
+HEADERS = {
+    'cpfs': (
+        'time [s],temperature [°C],setpoint [°C],power [%],rotation [rpm],'
+        'pull position [mm]\n'
+    ),
+    'eurotherm': (
+        'Eurotherm nanodac export\n'
+        'Instrument,nanodac,Serial,12345\n'
+        'Date,Time,Loop.1.Main.PV (°C),Loop.1.Main.WorkingSP (°C),'
+        'Loop.1.OP.Output (%),Alarm.1.Status\n'
+    ),
+    'jumo': (
+        'JUMO LOGOSCREEN;Ofen 3\n'
+        'Datum;Uhrzeit;Istwert [°C];Sollwert [°C];Stellgrad [%];Drehzahl [rpm];'
+        'Ziehposition [mm]\n'
+    ),
+}
+START = datetime.datetime(2026, 10, 1)
+
+
+def rows(days: int):
+    """Yields the time and channel values of a growth run sampled at 1 Hz."""
+    for second in range(days * 86400):
+        setpoint = min(25 + second / 36, 1000)
+        temperature = setpoint + (second % 60 - 30) / 30
+        yield (
+            second,
+            START + datetime.timedelta(seconds=second),
+            temperature,
+            setpoint,
+            setpoint / 20,
+            6.0,
+            second / 36000,
+        )
+
+
+def write_logs(directory: str, days: int) -> dict[str, str]:
+    """Writes one log per format and returns their paths by format name."""
+    paths = {name: os.path.join(directory, f'{name}.log') for name in HEADERS}
+    files = {name: open(path, 'w', encoding='utf-8') for name, path in paths.items()}
+    try:
+        for name, file in files.items():
+            file.write(HEADERS[name])
+        for second, stamp, temperature, setpoint, power, rotation, position in rows(
+            days
+        ):
+            files['cpfs'].write(
+                f'{second},{temperature:.2f},{setpoint:.2f},{power:.1f},'
+                f'{rotation},{position:.4f}\n'
+            )
+            files['eurotherm'].write(
+                f'{stamp:%Y-%m-%d},{stamp:%H:%M:%S},{temperature:.2f},'
+                f'{setpoint:.2f},{power:.1f},0\n'
+            )
+            values = (temperature, setpoint, power, rotation, position)
+            files['jumo'].write(
+                f'{stamp:%d.%m.%Y};{stamp:%H:%M:%S};'
+                + ';'.join(f'{value:.4f}'.replace('.', ',') for value in values)
+                + '\n'
+            )
+    finally:
+        for file in files.values():
+            file.close()
+    return paths
+
+
+def read(path: str) -> int:
+    with open(path, 'rb') as file:
+        return sum(len(chunk['time']) for chunk in LogReader(file))
+
+
+def store(path: str, target: str) -> int:
+    with open(path, 'rb') as file:
+        return write_log_hdf5(LogReader(file), target).samples
+
+
+def csv_rows(path: str) -> int:
+    """Converts every cell with `float`, the way a row by row parser would."""
+    with open(path, newline='', encoding='utf-8') as file:
+        reader = csv.reader(file)
+        next(reader)
+        columns = [[] for _ in range(6)]
+        for row in reader:
+            for column, value in zip(columns, row):
+                column.append(float(value))
+    return len(columns[0])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--days', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_logs(directory, args.days)
+        samples = args.days * 86400
+        print(f'{samples} samples per log ({args.days} days at 1 Hz)')
+        runs = [('csv.reader, cpfs', lambda: csv_rows(paths['cpfs']))]
+        for name, path in paths.items():
+            target = os.path.join(directory, f'{name}.h5')
+            runs.append((f'read, {name}', lambda path=path: read(path)))
+            runs.append(
+                (f'store, {name}', lambda path=path, target=target: store(path, target))
+            )
+        for label, function in runs:
+            seconds = min(timeit.repeat(function, number=1, repeat=args.repeat))
+            rate = samples / seconds / 1e3
+            print(f'{label:18} {seconds:7.2f} s {rate:8.0f} k samples/s')
+
+
+if __name__ == '__main__':
+    main()
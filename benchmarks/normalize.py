@@ -0,0 +1,336 @@
+"""
+Times the normalization of growth runs of every technique on synthetic templates.
+
+Run from the repository root:
+
+    python benchmarks/normalize.py [--runs 20] [--materials 5] [--profile 20]
+        [--steps 0] [--repeat 3] [--save] [--compare RESULTS]
+
+For every technique, the script generates `--runs` CSV templates from its layout,
+with `--materials` starting materials and, for flux growth, a temperature profile of
+`--profile` points. The other techniques have a step table of `--steps` steps, or
+their single step if it is 0. It then times `normalize()` of the process section
+on each of them against an archive context that keeps the raw files in memory, so
+neither a NOMAD installation nor the disk is involved. The template cache is
+cleared before every pass. The formula parser and the instrument lookups are timed
+on their own.
+
+The times per item are compared with the results saved for the latest version up
+to the installed one in `benchmarks/results`, or with `--compare`. Benchmarks more
+than `--threshold` slower are reported as regressions and make the script exit
+with status 1. `--save` stores the results as `benchmarks/results/<version>.json`
+to compare later releases with.
+"""
+
+import argparse
+import importlib.metadata
+import io
+import json
+import math
+import os
+import platform
+import sys
+import timeit
+
+from nomad.datamodel import EntryArchive, EntryMetadata
+from nomad.datamodel.context import ClientContext
+from structlog.stdlib import BoundLogger
+from structlog.testing import ReturnLogger
+
+from cpfs_synthesis import templates
+from cpfs_synthesis.cache import get_template_cache
+from cpfs_synthesis.formula import atomic_fractions, element_counts
+from cpfs_synthesis.instruments import (
+    CRUCIBLES,
+    FURNACES,
+    TUBES,
+    load_catalog,
+    lookup_instrument,
+)
+from cpfs_synthesis.schema_packages import process_section
+
+RESULTS = os.path.join(os.path.dirname(__file__), 'results')
+FORMULAS = (
+    'Bi2Te3',
+    'Co',
+    'Fe0.95Se',
+    'MnBi2Te4',
+    'Ca(OH)2',
+    'CuSO4·5H2O',
+    'Co3Sn2S2',
+    'K4[Fe(CN)6]',
+)
+INSTRUMENTS = {'furnace': FURNACES, 'crucible': CRUCIBLES, 'tube': TUBES}
+TEXT = {
+    'rotation_direction': 'clockwise',
+    'single_poly': 'single',
+    'transport_agent': 'I2',
+}
+NUMBERS = {
+    templates.celsius_to_kelvin: lambda run: f'{900 + run % 200}',
+    templates.hours_to_seconds: lambda run: f'{1 + run % 48}',
+    templates.millimetre_to_metre: lambda run: f'{5 + run % 10 / 10}',
+    templates.millimetre_per_minute_to_metre_per_second: lambda run: '0.05',
+    templates.number: lambda run: f'{10 + run % 90}',
+}
+
+
+class MemoryContext(ClientContext):
+    """An archive context that keeps the raw files of one upload in memory."""
+
+    creates_archives = True
+
+    def __init__(self):
+        super().__init__()
+        self.files: dict[str, bytes] = {}
+
+    def raw_file(self, path, mode='r', *args, **kwargs):
+        if 'w' in mode:
+            return _MemoryFile(self.files, path)
+        file = io.BytesIO(self.files[path])
+        return file if 'b' in mode else io.TextIOWrapper(file, encoding='utf-8')
+
+    def raw_path_exists(self, path):
+        return path in self.files
+
+    def process_updated_raw_file(self, path, allow_modify=False):
+        pass
+
+    def normalize_reference(self, source, url):
+        return url
+
+
+class _MemoryFile(io.BytesIO):
+    def __init__(self, files: dict[str, bytes], path: str):
+        super().__init__()
+        self._files = files
+        self._path = path
+
+    def close(self):
+        self._files[self._path] = self.getvalue()
+        super().close()
+
+
+def cell_value(name: str, convert, run: int) -> str:
+    """Returns a plausible template value for the quantity `name` of a run."""
+    if name in INSTRUMENTS:
+        names = sorted(load_catalog()[INSTRUMENTS[name]])
+        return names[run % len(names)]
+    if name == 'name':
+        return f'Synthetic run {run}'
+    if name == 'sample_id':
+        return f'SYN{run:05d}'
+    if name == 'achieved_composition':
+        return FORMULAS[run % len(FORMULAS)]
+    if convert in NUMBERS:
+        return NUMBERS[convert](run)
+    return TEXT.get(name, f'{name} {run}')
+
+
+def synthetic_template(  # noqa: PLR0913
+    layout: templates.TemplateLayout,
+    run: int,
+    materials: int,
+    profile: int,
+    steps: int = 0,
+) -> bytes:
+    """
+    Returns a CSV template of a run filled in at the cells of `layout`. A series
+    longer than the rows the layout reserves moves the later cells down.
+    """
+    cells = {(layout.marker.row, layout.marker.column): f'Template {layout.technique}'}
+    shifts = []
+    for series_name, series in layout.series.items():
+        rows = steps if series_name == 'steps' else profile
+        end = series.start + series.rows
+        shifts.append((end, max(rows - series.rows, 0)))
+        for index in range(rows):
+            if series_name == 'steps':
+                values = {
+                    name: cell_value(name, column.convert, run + index)
+                    for name, column in series.columns.items()
+                }
+                values['name'] = f'step {index + 1}'
+            else:
+                # heat up and cool down again over the profile
+                angle = math.pi * index / max(rows - 1, 1)
+                temperature = f'{25 + 1075 * math.sin(angle):.1f}'
+                values = {
+                    name: f'{2 * index}' if name == series.key else temperature
+                    for name in series.columns
+                }
+            for name, column in series.columns.items():
+                cells[(series.start + index, column.column)] = values[name]
+
+    def shifted(row: int) -> int:
+        return row + sum(excess for end, excess in shifts if row >= end)
+
+    for label in layout.labels:
+        cells[(shifted(label.row), label.column)] = label.text
+    for group in layout.groups.values():
+        for name, cell in group.items():
+            cells[(shifted(cell.row), cell.column)] = cell_value(
+                name, cell.convert, run
+            )
+    for table in layout.tables.values():
+        for index in range(min(materials, table.rows)):
+            row = {
+                'name': FORMULAS[(run + index) % len(FORMULAS)],
+                'state': 'Powder',
+                'weight': f'{0.1 + index / 10:.1f}',
+                'providing_company': 'Alfa Aesar',
+            }
+            for name, column in table.columns.items():
+                cells[(shifted(table.start + index), column.column)] = row[name]
+    rows = max(row for row, _ in cells) + 1
+    columns = max(column for _, column in cells) + 1
+    lines = ['CPFS crystal growth template' + ',' * (columns - 1)]
+    for row in range(rows):
+        lines.append(
+            ','.join(cells.get((row, column), '') for column in range(columns))
+        )
+    return ('\n'.join(lines) + '\n').encode()
+
+
+def normalize_runs(
+    technique: str, files: dict[str, bytes], context: MemoryContext
+) -> None:
+    """Normalizes a process section for each template in a new in-memory upload."""
+    section = process_section(technique)
+    context.files = dict(files)
+    logger = BoundLogger(ReturnLogger(), [], {})
+    get_template_cache().clear()
+    for path in files:
+        archive = EntryArchive(
+            m_context=context,
+            metadata=EntryMetadata(upload_id='benchmark', mainfile=path),
+        )
+        archive.data = section(xlsx_file=path)
+        archive.data.normalize(archive, logger)
+        if archive.data.xlsx_file != path:
+            raise ValueError(f'{path} is not a valid {technique} template.')
+
+
+def cold_formulas(names: list[str]) -> None:
+    atomic_fractions.cache_clear()
+    element_counts.cache_clear()
+    for name in names:
+        atomic_fractions(name)
+
+
+def instrument_lookups(names: list[tuple[str, str]]) -> None:
+    for kind, name in names:
+        lookup_instrument(kind, name)
+
+
+def benchmarks(args) -> dict[str, tuple]:
+    """Returns the benchmarks by name, as a function and its number of items."""
+    runs = {}
+    context = MemoryContext()
+    for technique, layout in templates.LAYOUTS.items():
+        files = {
+            f'{technique}_{run}.csv': synthetic_template(
+                layout, run, args.materials, args.profile, args.steps
+            )
+            for run in range(args.runs)
+        }
+        runs[f'normalize {technique}'] = (
+            lambda technique=technique, files=files: normalize_runs(
+                technique, files, context
+            ),
+            args.runs,
+        )
+    formulas = list(FORMULAS) * 100
+    runs['formula parser, cold'] = (lambda: cold_formulas(formulas), len(formulas))
+    catalog = load_catalog()
+    lookups = [(kind, name) for kind in catalog for name in catalog[kind]] * 100
+    runs['instrument lookup'] = (lambda: instrument_lookups(lookups), len(lookups))
+    return runs
+
+
+def previous_results(version: str) -> str | None:
+    """Returns the results saved for the latest version up to `version`."""
+    from packaging.version import InvalidVersion, Version
+
+    saved = []
+    for file_name in os.listdir(RESULTS) if os.path.isdir(RESULTS) else []:
+        stem, extension = os.path.splitext(file_name)
+        if extension != '.json':
+            continue
+        try:
+            saved_version = Version(stem)
+        except InvalidVersion:
+            continue
+        if saved_version <= Version(version):
+            saved.append((saved_version, file_name))
+    if not saved:
+        return None
+    return os.path.join(RESULTS, max(saved)[1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--materials', type=int, default=5)
+    parser.add_argument('--profile', type=int, default=20)
+    parser.add_argument('--steps', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--threshold', type=float, default=0.2)
+    parser.add_argument('--compare', help='Results to compare with.')
+    parser.add_argument('--save', action='store_true')
+    args = parser.parse_args()
+
+    version = importlib.metadata.version('cpfs_synthesis')
+    results = {
+        'version': version,
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'parameters': {
+            'runs': args.runs,
+            'materials': args.materials,
+            'profile': args.profile,
+            'steps': args.steps,
+        },
+        'seconds_per_item': {},
+    }
+    for name, (function, items) in benchmarks(args).items():
+        # the first call imports and compiles what the later ones reuse
+        function()
+        seconds = min(timeit.repeat(function, number=1, repeat=args.repeat))
+        results['seconds_per_item'][name] = seconds / items
+
+    baseline_path = args.compare or previous_results(version)
+    baseline = {}
+    if baseline_path:
+        with open(baseline_path, encoding='utf-8') as file:
+            baseline = json.load(file)
+        print(f'compared with {baseline_path} (version {baseline["version"]})')
+        for key in ('parameters', 'machine', 'python'):
+            if baseline.get(key) != results[key]:
+                print(f'  the {key} differ, times may not be comparable')
+    regressions = []
+    for name, seconds in results['seconds_per_item'].items():
+        line = f'{name:40} {seconds * 1e6:10.1f} µs'
+        before = baseline.get('seconds_per_item', {}).get(name)
+        if before:
+            change = seconds / before - 1
+            line += f' {change:+8.1%}'
+            if change > args.threshold:
+                line += ' regression'
+                regressions.append(name)
+        print(line)
+
+    if args.save:
+        os.makedirs(RESULTS, exist_ok=True)
+        path = os.path.join(RESULTS, f'{version}.json')
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2)
+            file.write('\n')
+        print(f'saved {path}')
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
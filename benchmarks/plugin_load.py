@@ -0,0 +1,76 @@
+"""
+Measures what loading the entry points of this plugin costs at NOMAD startup.
+
+Run from the repository root:
+
+    python benchmarks/plugin_load.py [--repeat 5] [--json]
+
+Each run starts a fresh interpreter and first imports the NOMAD modules the
+schemas derive from, which a NOMAD app or worker has imported anyway. It then
+loads every `cpfs_synthesis` entry point, like NOMAD does at startup, and
+records the time this takes and the modules it imports. `--json` prints the
+result of the fastest run for `tests/test_plugin_load.py`.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+BASE_MODULES = (
+    'nomad.config.models.plugins',
+    'nomad.datamodel.metainfo.basesections',
+    'nomad.datamodel.metainfo.eln',
+    'nomad.parsing.parser',
+    'nomad_material_processing.crystal_growth',
+    # the logging of NOMAD apps and workers is built on it
+    'structlog.stdlib',
+)
+
+RUN = """
+import importlib, importlib.metadata, json, sys, time
+for module in {base!r}:
+    importlib.import_module(module)
+before = set(sys.modules)
+start = time.perf_counter()
+for entry_point in importlib.metadata.entry_points(group='nomad.plugin'):
+    if entry_point.value.startswith('cpfs_synthesis.'):
+        entry_point.load().load()
+seconds = time.perf_counter() - start
+print(json.dumps({{'seconds': seconds, 'modules': sorted(set(sys.modules) - before)}}))
+"""
+
+
+def load_entry_points() -> dict:
+    """
+    Loads all entry points in a fresh interpreter and returns the seconds it took
+    and the modules it imported.
+    """
+    output = subprocess.run(
+        [sys.executable, '-c', RUN.format(base=BASE_MODULES)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(output.stdout.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    runs = [load_entry_points() for _ in range(args.repeat)]
+    best = min(runs, key=lambda run: run['seconds'])
+    if args.json:
+        print(json.dumps(best))
+        return
+    print(f'entry point load: {best["seconds"] * 1000:.1f} ms (best of {args.repeat})')
+    print('modules imported:')
+    for module in best['modules']:
+        print(f'  {module}')
+
+
+if __name__ == '__main__':
+    main()
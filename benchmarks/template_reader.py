@@ -0,0 +1,88 @@
+"""
+Compares the streaming template reader with the former `pandas.read_csv` path.
+
+Run from the repository root:
+
+    python benchmarks/template_reader.py [--repeat 200]
+
+The pandas path reads the whole template into a DataFrame and looks up every cell
+of the layout with `inp.loc[row].iloc[column]`, like the normalizers used to. Both
+paths read the flux-growth example template from `tests/data`. The script also
+reports the cost of the first import of each path in a fresh interpreter.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import timeit
+
+from cpfs_synthesis.readers import read_csv_rows
+from cpfs_synthesis.templates import FLUX_GROWTH_LAYOUT, compile_layout
+
+TEMPLATE = os.path.join('tests', 'data', 'fluxgrowth.csv')
+
+
+def streaming():
+    with open(TEMPLATE, 'rb') as file:
+        return compile_layout(FLUX_GROWTH_LAYOUT).extract(read_csv_rows(file))
+
+
+def pandas_read_csv():
+    import pandas as pd
+
+    compiled = compile_layout(FLUX_GROWTH_LAYOUT)
+    with open(TEMPLATE, 'rb') as file:
+        inp = pd.read_csv(file)
+    return [
+        inp.loc[row].iloc[column]
+        for row, cells in compiled.plan.items()
+        for column, _ in cells
+        if row < len(inp)
+    ]
+
+
+def import_time(statement: str) -> float:
+    """Returns the wall time of `statement` in a fresh interpreter in seconds."""
+    code = (
+        'import time; start = time.perf_counter(); '
+        f'{statement}; print(time.perf_counter() - start)'
+    )
+    output = subprocess.run(
+        [sys.executable, '-c', code], capture_output=True, text=True, check=True
+    )
+    return float(output.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    rows = [
+        (
+            'streaming reader',
+            import_time('import cpfs_synthesis.templates'),
+            timeit.timeit(streaming, number=args.repeat) / args.repeat,
+        )
+    ]
+    try:
+        import pandas  # noqa: F401
+    except ImportError:
+        print('pandas is not installed, skipping the read_csv path')
+    else:
+        rows.append(
+            (
+                'pandas.read_csv',
+                import_time('import pandas'),
+                timeit.timeit(pandas_read_csv, number=args.repeat) / args.repeat,
+            )
+        )
+
+    print(f'{"path":<20}{"first import [ms]":>20}{"per template [ms]":>20}')
+    for name, first_import, per_template in rows:
+        print(f'{name:<20}{first_import * 1000:>20.2f}{per_template * 1000:>20.3f}')
+
+
+if __name__ == '__main__':
+    main()
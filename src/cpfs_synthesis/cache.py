@@ -0,0 +1,196 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an 'AS IS' BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+A cache for parsed templates, keyed by the checksum of the template content and
+layout version. Entries live in a bounded in-memory LRU and, optionally, as JSON
+files in a directory shared by the workers of a host. The directory is bounded as
+well, files are touched when read and the least recently used removed.
+"""
+
+import dataclasses
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from cpfs_synthesis.templates import LAYOUTS, TemplateData, text
+
+
+def _to_json(value):
+    # the columns of series are NumPy arrays
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+def _from_json(data: dict) -> TemplateData:
+    template = TemplateData(**data)
+    layout = LAYOUTS.get(template.technique)
+    for name, columns in template.series.items():
+        spec = layout.series.get(name) if layout else None
+        for key, values in columns.items():
+            # numeric columns were converted to float arrays, text stays a list
+            column = spec.columns.get(key) if spec else None
+            if column is not None and column.convert is not text:
+                columns[key] = np.asarray(values, dtype=float)
+    return template
+
+
+class TemplateCache:
+    """
+    A least recently used cache of parsed templates.
+
+    Args:
+        max_entries (int): The number of checksums kept in memory.
+        directory (str | None): A directory for the on-disk tier, disabled if `None`.
+        max_files (int): The number of checksums kept in `directory`.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        directory: str | None = None,
+        max_files: int = 4096,
+    ):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.max_files = max_files
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, list[TemplateData]] = OrderedDict()
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, checksum: str) -> str:
+        return os.path.join(self.directory, f'{checksum}.json')
+
+    def get(self, checksum: str) -> list[TemplateData] | None:
+        """Returns the templates cached for `checksum` or `None`."""
+        with self._lock:
+            templates = self._entries.get(checksum)
+            if templates is not None:
+                self._entries.move_to_end(checksum)
+                self.hits += 1
+                return templates
+        if self.directory:
+            path = self._path(checksum)
+            try:
+                with open(path) as file:
+                    templates = [_from_json(data) for data in json.load(file)]
+                # the modification time orders the files by use, see `_evict`
+                os.utime(path)
+            except (OSError, ValueError, TypeError):
+                pass
+            else:
+                with self._lock:
+                    self.disk_hits += 1
+                self._remember(checksum, templates)
+                return templates
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, checksum: str, templates: list[TemplateData]) -> None:
+        """Caches the `templates` parsed from the content with `checksum`."""
+        self._remember(checksum, templates)
+        if self.directory:
+            # write to a temporary file first, readers never see partial files
+            fd, path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w') as file:
+                    json.dump(
+                        [dataclasses.asdict(data) for data in templates],
+                        file,
+                        default=_to_json,
+                    )
+                os.replace(path, self._path(checksum))
+            except OSError:
+                if os.path.exists(path):
+                    os.remove(path)
+            else:
+                self._evict()
+
+    def _evict(self) -> None:
+        """Removes the least recently used files beyond `max_files`."""
+        try:
+            with os.scandir(self.directory) as entries:
+                files = [
+                    (entry.stat().st_mtime_ns, entry.path)
+                    for entry in entries
+                    if entry.name.endswith('.json')
+                ]
+        except OSError:
+            return
+        files.sort()
+        for _, path in files[: max(0, len(files) - self.max_files)]:
+            try:
+                os.remove(path)
+            except OSError:
+                # removed by another worker in the meantime
+                pass
+
+    def _remember(self, checksum: str, templates: list[TemplateData]) -> None:
+        with self._lock:
+            self._entries[checksum] = templates
+            self._entries.move_to_end(checksum)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Empties the in-memory tier and resets the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.disk_hits = self.misses = 0
+
+    def stats(self) -> dict[str, int]:
+        """Returns the hit and miss counters and the number of cached checksums."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'entries': len(self._entries),
+            }
+
+
+_template_cache: TemplateCache | None = None
+
+
+def get_template_cache(configuration=None) -> TemplateCache:
+    """
+    Returns the template cache of this process, set up with the
+    `template_cache_size`, `template_cache_dir` and `template_cache_dir_size` of
+    the given entry point configuration.
+    """
+    global _template_cache  # noqa: PLW0603
+    max_entries = getattr(configuration, 'template_cache_size', 256)
+    directory = getattr(configuration, 'template_cache_dir', None)
+    max_files = getattr(configuration, 'template_cache_dir_size', 4096)
+    if (
+        _template_cache is None
+        or _template_cache.max_entries != max_entries
+        or _template_cache.directory != directory
+        or _template_cache.max_files != max_files
+    ):
+        _template_cache = TemplateCache(max_entries, directory, max_files)
+    return _template_cache
@@ -0,0 +1,134 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an 'AS IS' BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+The `cpfs-synthesis` command line interface.
+"""
+
+import argparse
+import json
+import sys
+
+
+def _ingest(args: argparse.Namespace) -> int:
+    from cpfs_synthesis.ingest import ingest
+
+    summary = ingest(args.directory, output=args.output, workers=args.workers)
+    print(summary.report())
+    return 1 if summary.errors else 0
+
+
+def _export(args: argparse.Namespace) -> int:
+    from cpfs_synthesis.export import export
+
+    try:
+        summary = export(args.directory, args.output, batch_size=args.batch_size)
+    except ImportError as error:
+        print(error, file=sys.stderr)
+        return 1
+    print(summary.report())
+    return 1 if summary.errors else 0
+
+
+def _validate(args: argparse.Namespace) -> int:
+    from cpfs_synthesis.validate import validate
+
+    report = validate(args.directory, workers=args.workers, catalog=args.catalog)
+    content = json.dumps(report.to_dict(), indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(content + '\n')
+    else:
+        print(content)
+    return 0 if all(file.valid for file in report.files) else 1
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='cpfs-synthesis',
+        description='Tools for the CPFS growth-run templates.',
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    ingest = commands.add_parser(
+        'ingest',
+        help='Normalize a directory tree of templates into NOMAD archives.',
+    )
+    ingest.add_argument('directory', help='The directory to scan for templates.')
+    ingest.add_argument(
+        '-o',
+        '--output',
+        help='The directory receiving templates and archives, default: DIRECTORY.',
+    )
+    ingest.add_argument(
+        '-w',
+        '--workers',
+        type=int,
+        help='The number of worker processes, default: one per CPU.',
+    )
+    ingest.set_defaults(run=_ingest)
+
+    validate = commands.add_parser(
+        'validate',
+        help='Check a directory tree of templates and report the problems as JSON.',
+    )
+    validate.add_argument('directory', help='The directory to scan for templates.')
+    validate.add_argument(
+        '-o',
+        '--output',
+        help='The file receiving the JSON report, default: standard output.',
+    )
+    validate.add_argument(
+        '-w',
+        '--workers',
+        type=int,
+        help='The number of worker processes, default: one per CPU.',
+    )
+    validate.add_argument(
+        '--catalog',
+        help='The instrument catalog, default: the catalog shipped with the plugin.',
+    )
+    validate.set_defaults(run=_validate)
+
+    export = commands.add_parser(
+        'export',
+        help='Append the runs and crystals changed since the last export to Parquet.',
+    )
+    export.add_argument('directory', help='The directory to scan for archives.')
+    export.add_argument(
+        '-o',
+        '--output',
+        required=True,
+        help='The directory receiving the tables and the watermark.',
+    )
+    export.add_argument(
+        '--batch-size',
+        type=int,
+        default=1024,
+        help='The number of rows of a table written at once, default: 1024.',
+    )
+    export.set_defaults(run=_export)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.run(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -16,12 +16,23 @@
 # limitations under the License.
 #
 
+import copy
+import hashlib
+import re
+from typing import TYPE_CHECKING
+
+import numpy as np
 from nomad.datamodel.data import (
     ArchiveSection,
     EntryData,
 )
+from nomad.datamodel.hdf5 import (
+    HDF5Reference,
+)
 from nomad.datamodel.metainfo.annotations import (
+    BrowserAnnotation,
     ELNAnnotation,
+    H5WebAnnotation,
     SectionProperties,
 )
 from nomad.datamodel.metainfo.eln import (
@@ -30,7 +41,12 @@ from nomad.datamodel.metainfo.eln import (
     Instrument,
     SampleID,
 )
+from nomad.datamodel.metainfo.plot import (
+    PlotlyFigure,
+    PlotSection,
+)
 from nomad.metainfo import (
+    JSON,
     Datetime,
     MEnum,
     Package,
@@ -42,9 +58,100 @@ from structlog.stdlib import (
     BoundLogger,
 )
 
+from cpfs_synthesis.formula import MATERIAL_STATES, FormulaError, atomic_fractions
+from cpfs_synthesis.instruments import (
+    CRUCIBLES,
+    FURNACES,
+    TUBES,
+    lookup_instrument,
+)
+from cpfs_synthesis.spans import span, timed
+
+if TYPE_CHECKING:
+    from cpfs_synthesis.templates import (
+        TemplateData,
+    )
+
 m_package = Package(name='CPFS SCHEMES')
 
 
+def fill_from_catalog(section: ArchiveSection, kind: str, logger: BoundLogger) -> None:
+    """
+    Sets the quantities of an instrument section to the specification of its
+    `name` in the instrument catalog.
+
+    Args:
+        section (ArchiveSection): The furnace, tube or crucible section.
+        kind (str): The kind of instrument in the catalog, e.g. `furnaces`.
+        logger (BoundLogger): A structlog logger.
+    """
+    from cpfs_synthesis.schema_packages import get_instrument_catalog
+
+    path = get_instrument_catalog()
+    try:
+        with span('instrument lookup'):
+            specification = lookup_instrument(kind, section.name, path)
+    except (OSError, ValueError) as error:
+        logger.warning(
+            'Could not read the instrument catalog.', path=path, error=str(error)
+        )
+        return
+    if specification is None:
+        logger.info('The instrument is not in the catalog.', name=section.name)
+        return
+    quantities = section.m_def.all_quantities
+    for quantity, value in specification.items():
+        if quantity in quantities and quantity != 'name':
+            setattr(section, quantity, value)
+
+
+def set_elemental_composition(
+    section: ArchiveSection, formula: str, logger: BoundLogger
+) -> None:
+    """
+    Sets the elemental composition of a section from a chemical formula, e.g. the
+    name of a starting material or the achieved composition of a crystal.
+
+    Args:
+        section (ArchiveSection): A section with `elemental_composition`.
+        formula (str): The chemical formula.
+        logger (BoundLogger): A structlog logger.
+    """
+    try:
+        with span('formula'):
+            fractions = atomic_fractions(formula)
+    except FormulaError as error:
+        logger.warning(
+            'Could not derive the elemental composition from the formula.',
+            formula=formula,
+            error=str(error),
+        )
+        return
+    section.elemental_composition = [
+        ElementalComposition(element=element, atomic_fraction=fraction)
+        for element, fraction in fractions
+    ]
+
+
+def set_material_results(archive, elements: list[str]) -> None:
+    """
+    Adds elements to `results.material.elements` of an archive, which the search
+    indexes. The sections of the composition are only normalized, and add their
+    elements themselves, if they exist before the normalization starts.
+    """
+    from nomad.datamodel.results import Material, Results
+
+    if not elements:
+        return
+    if archive.results is None:
+        archive.results = Results()
+    if archive.results.material is None:
+        archive.results.material = Material()
+    material = archive.results.material
+    known = list(material.elements or [])
+    material.elements = known + sorted(set(elements) - set(known))
+
+
 class CPFSFurnace(Instrument, EntryData):
     m_def = Section(
         a_eln=ELNAnnotation(
@@ -85,13 +192,12 @@ class CPFSFurnace(Instrument, EntryData):
         """,
     )
     name = Quantity(
-        type=MEnum(
-            'Furnace1',
-            'Furnace2',
-            'Furnace3',
-        ),
+        type=str,
+        description="""
+        The name of the furnace in the instrument catalog.
+        """,
         a_eln=ELNAnnotation(
-            component='EnumEditQuantity',
+            component='StringEditQuantity',
         ),
     )
     datetime = Quantity(
@@ -108,6 +214,7 @@ class CPFSFurnace(Instrument, EntryData):
         description='Any information that cannot be captured in the other fields.',
     )
 
+    @timed
     def normalize(self, archive, logger: BoundLogger) -> None:
         """
         The normalizer for the `CPFSFurnace` class.
@@ -119,18 +226,7 @@ class CPFSFurnace(Instrument, EntryData):
         """
         super().normalize(archive, logger)
         if self.name:
-            furnace_list = [
-                ['Furnace1', 'FurnaceModel1', 'Steel', 'Box', 'Induction'],
-                ['Furnace2', 'FurnaceModel2', 'Cast Iron', 'Cube', 'Resistance'],
-                ['Furnace3', 'FurnaceModel3', 'Titanium', '', ''],
-            ]
-            for li in furnace_list:
-                if self.name == li[0]:
-                    self.model = li[1]
-                    self.material = li[2]
-                    self.geometry = li[3]
-                    self.heating = li[4]
-                    break
+            fill_from_catalog(self, FURNACES, logger)
 
 
 class CPFSCrystalGrowthTube(EntryData, ArchiveSection):
@@ -174,13 +270,12 @@ class CPFSCrystalGrowthTube(EntryData, ArchiveSection):
         },
     )
     name = Quantity(
-        type=MEnum(
-            'TubeType1',
-            'TubeType2',
-            'TubeType3',
-        ),
+        type=str,
+        description="""
+        The name of the tube in the instrument catalog.
+        """,
         a_eln=ELNAnnotation(
-            component='EnumEditQuantity',
+            component='StringEditQuantity',
         ),
     )
     datetime = Quantity(
@@ -197,6 +292,7 @@ class CPFSCrystalGrowthTube(EntryData, ArchiveSection):
         description='Any information that cannot be captured in the other fields.',
     )
 
+    @timed
     def normalize(self, archive, logger: BoundLogger) -> None:
         """
         The normalizer for the `CPFSCrystalGrowthTube` class.
@@ -208,17 +304,7 @@ class CPFSCrystalGrowthTube(EntryData, ArchiveSection):
         """
         super().normalize(archive, logger)
         if self.name:
-            furnace_list = [
-                ['TubeType1', 'Quartz', '0.011', 'Vacuum'],
-                ['TubeType2', 'Tantalum', '0.012', 'Iodine'],
-                ['TubeType3', 'Quartz', '0.010', ''],
-            ]
-            for li in furnace_list:
-                if self.name == li[0]:
-                    self.material = li[1]
-                    self.diameter = float(li[2])
-                    self.filling = li[3]
-                    break
+            fill_from_catalog(self, TUBES, logger)
 
 
 class CPFSCrucible(EntryData, ArchiveSection):
@@ -252,13 +338,12 @@ class CPFSCrucible(EntryData, ArchiveSection):
         unit='meter',
     )
     name = Quantity(
-        type=MEnum(
-            'CrucibleType1',
-            'CrucibleType2',
-            'CrucibleType3',
-        ),
+        type=str,
+        description="""
+        The name of the crucible in the instrument catalog.
+        """,
         a_eln=ELNAnnotation(
-            component='EnumEditQuantity',
+            component='StringEditQuantity',
         ),
     )
     datetime = Quantity(
@@ -275,6 +360,7 @@ class CPFSCrucible(EntryData, ArchiveSection):
         description='Any information that cannot be captured in the other fields.',
     )
 
+    @timed
     def normalize(self, archive, logger: BoundLogger) -> None:
         """
         The normalizer for the `CPFSCrucible` class.
@@ -286,16 +372,325 @@ class CPFSCrucible(EntryData, ArchiveSection):
         """
         super().normalize(archive, logger)
         if self.name:
-            furnace_list = [
-                ['CrucibleType1', 'Al', '0.011'],
-                ['CrucibleType2', 'Tantalum', '0.012'],
-                ['CrucibleType3', 'Al', '0.010'],
-            ]
-            for li in furnace_list:
-                if self.name == li[0]:
-                    self.material = li[1]
-                    self.diameter = float(li[2])
-                    break
+            fill_from_catalog(self, CRUCIBLES, logger)
+
+
+def instrument_archive_name(section_def: type[ArchiveSection], name: str) -> str:
+    """Returns the file name of the shared entry of an instrument in an upload."""
+    name = re.sub(r'[^\w.-]+', '_', name)
+    return f'{name}_{section_def.__name__}.archive.json'
+
+
+def set_instrument(
+    process: ArchiveSection, quantity: str, name: str | None, archive, logger
+) -> None:
+    """
+    Sets an instrument of a process by its name. The process references the shared
+    entry of the instrument in the upload via `<quantity>_entry`. The entry is only
+    created, from the catalog, if the upload does not have it yet, so edits made to
+    it later are kept. Where no entries can be created, or the name is empty, the
+    instrument is embedded as the `quantity` sub section instead.
+
+    Args:
+        process (ArchiveSection): The process using the instrument.
+        quantity (str): The name of the instrument sub section, e.g. `furnace`.
+        name (str | None): The name of the instrument.
+        archive (EntryArchive): The archive containing the process.
+        logger (BoundLogger): A structlog logger.
+    """
+    from cpfs_synthesis.utils import archive_reference, create_archive
+
+    section_def = process.m_def.all_sub_sections[quantity].sub_section.section_cls
+    instrument = None
+    reference = None
+    if name:
+        file_name = instrument_archive_name(section_def, name)
+        if archive.m_context.raw_path_exists(file_name):
+            reference = archive_reference(archive, file_name)
+        else:
+            instrument = section_def(name=name)
+            instrument.normalize(archive, logger)
+            reference = create_archive(instrument, archive, file_name)
+    if reference is None:
+        if instrument is None:
+            instrument = section_def(name=name)
+            instrument.normalize(archive, logger)
+        setattr(process, quantity, instrument)
+        setattr(process, f'{quantity}_entry', None)
+    else:
+        setattr(process, quantity, None)
+        setattr(process, f'{quantity}_entry', reference)
+
+
+def programmed_profiles(process: ArchiveSection) -> list[tuple]:
+    """
+    Returns the steps of a process with a temperature profile, with its times in
+    seconds and its temperatures in kelvin.
+    """
+    profiles = []
+    for step in process.steps:
+        time = getattr(step, 'process_time', None)
+        temperature = getattr(step, 'temperature', None)
+        if time is None or temperature is None or np.ndim(temperature.magnitude) == 0:
+            continue
+        if len(time) != len(temperature):
+            continue
+        profiles.append(
+            (step, time.to('second').magnitude, temperature.to('kelvin').magnitude)
+        )
+    return profiles
+
+
+def set_figures(process: PlotSection, archive, logger: BoundLogger) -> None:
+    """
+    Sets the figures of a process: the programmed temperature profiles of its steps
+    and the channels of its controller log, downsampled for the browser. The
+    figures are only built again if their content changed.
+
+    Args:
+        process (PlotSection): The process with `steps` and `controller_log`.
+        archive (EntryArchive): The archive containing the process.
+        logger (BoundLogger): A structlog logger.
+    """
+    from cpfs_synthesis.figures import (
+        Trace,
+        cached_figures,
+        figure_key,
+        process_figures,
+    )
+
+    programmed = [
+        Trace(f'programmed {step.name or index + 1}', time, temperature)
+        for index, (step, time, temperature) in enumerate(programmed_profiles(process))
+    ]
+    log = process.controller_log
+    hdf5_file = None
+    if log is not None and log.hdf5_file and log.samples:
+        hdf5_file = log.hdf5_file
+    if not programmed and hdf5_file is None:
+        # only remove figures set here, not those added by users
+        if process.figure_checksum is not None:
+            process.figures = []
+            process.figure_checksum = None
+        return
+    key = figure_key(
+        hdf5_file,
+        hdf5_file and log.log_checksum,
+        *(
+            part
+            for trace in programmed
+            for part in (trace.name, trace.time, trace.values)
+        ),
+    )
+    if key == process.figure_checksum and process.figures:
+        return
+
+    def build():
+        if hdf5_file is None:
+            return process_figures(programmed)
+        with archive.m_context.raw_file(hdf5_file, 'rb') as file:
+            return process_figures(programmed, file)
+
+    try:
+        with span('figures'):
+            figures = cached_figures(key, build)
+    except (OSError, KeyError) as error:
+        logger.warning(
+            'Could not read the controller log.', hdf5_file=hdf5_file, error=str(error)
+        )
+        return
+    process.figures = [
+        PlotlyFigure(label=label, index=index, figure=copy.deepcopy(figure))
+        for index, (label, figure) in enumerate(figures)
+    ]
+    process.figure_checksum = key
+
+
+def _finite(value: float) -> float | None:
+    return None if np.isnan(value) else float(value)
+
+
+def set_deviation(
+    process: ArchiveSection, archive, logger: BoundLogger, tolerance: float | None
+) -> None:
+    """
+    Compares the measured temperature in the controller log of a process with the
+    programmed one. This is the temperature profile of the steps, interpolated at
+    the times of the samples, or, for steps without profiles, the set point channel
+    of the log. The deviation is set per thermal segment of the profiles and for the
+    whole run as the `deviation` sub section. The log is only read again if the log,
+    the profiles or the tolerance changed.
+
+    Args:
+        process (ArchiveSection): The process with `steps` and `controller_log`.
+        archive (EntryArchive): The archive containing the process.
+        logger (BoundLogger): A structlog logger.
+        tolerance (float | None): The difference in kelvin beyond which the measured
+            temperature counts as out of tolerance, 5 K if `None`.
+    """
+    from cpfs_synthesis.thermal import (
+        DEFAULT_DEVIATION_TOLERANCE,
+        DeviationAccumulator,
+        programmed_temperature,
+    )
+
+    if tolerance is None:
+        tolerance = DEFAULT_DEVIATION_TOLERANCE
+    log = process.controller_log
+    channels = ['time', 'temperature']
+    if log is None or not log.samples or 'temperature' not in (log.channels or []):
+        process.deviation = None
+        return
+    profiles = programmed_profiles(process)
+    segments = [segment for step, _, _ in profiles for segment in step.segments]
+    if segments:
+        reference = 'programmed profile'
+        boundaries = [segment.start_time.to('second').magnitude for segment in segments]
+        boundaries.append(boundaries[-1] + segments[-1].duration.to('second').magnitude)
+        time = np.concatenate([time for _, time, _ in profiles])
+        temperature = np.concatenate([temperature for _, _, temperature in profiles])
+    elif 'setpoint' in log.channels:
+        reference = 'controller setpoint'
+        boundaries = [-np.inf, np.inf]
+        time = temperature = np.empty(0)
+        channels.append('setpoint')
+    else:
+        process.deviation = None
+        return
+    checksum = hashlib.sha256(
+        repr(
+            (
+                log.log_checksum,
+                tolerance,
+                boundaries,
+                time.tolist(),
+                temperature.tolist(),
+            )
+        ).encode()
+    ).hexdigest()
+    if (
+        process.deviation is not None
+        and process.deviation.checksum == checksum
+        and all(segment.time_out_of_tolerance is not None for segment in segments)
+    ):
+        return
+
+    from cpfs_synthesis.logs import (
+        read_log_hdf5,
+    )
+
+    accumulator = DeviationAccumulator(boundaries, tolerance)
+    try:
+        with (
+            span('deviation') as timing,
+            archive.m_context.raw_file(log.hdf5_file, 'rb') as file,
+        ):
+            for chunk in read_log_hdf5(file, channels):
+                timing.bytes += sum(values.nbytes for values in chunk.values())
+                if segments:
+                    programmed = programmed_temperature(
+                        time, temperature, chunk['time']
+                    )
+                else:
+                    programmed = chunk['setpoint']
+                accumulator.add(chunk['time'], chunk['temperature'], programmed)
+    except (OSError, KeyError) as error:
+        logger.warning(
+            'Could not read the controller log.',
+            hdf5_file=log.hdf5_file,
+            error=str(error),
+        )
+        return
+    deviation = accumulator.result()
+    for index, segment in enumerate(segments):
+        segment.max_overshoot = _finite(deviation.max_overshoot[index])
+        segment.rms_error = _finite(deviation.rms_error[index])
+        segment.time_out_of_tolerance = float(deviation.time_out_of_tolerance[index])
+    total = deviation.total()
+    process.deviation = CPFSProfileDeviation(
+        reference=reference,
+        tolerance=tolerance,
+        samples=int(total.samples[0]),
+        max_overshoot=_finite(total.max_overshoot[0]),
+        rms_error=_finite(total.rms_error[0]),
+        time_out_of_tolerance=float(total.time_out_of_tolerance[0]),
+        checksum=checksum,
+    )
+
+
+# the quantities of process steps summarized, in the units of the summary
+STEP_TEMPERATURES = ('temperature', 'temperature_one', 'temperature_two')
+
+
+def _step_values(steps: list, quantity: str, unit: str) -> np.ndarray:
+    values = [
+        np.ravel(value.to(unit).magnitude)
+        for step in steps
+        if (value := getattr(step, quantity, None)) is not None
+    ]
+    if not values:
+        return np.empty(0)
+    return np.concatenate(values).astype(float)
+
+
+def _maximum(values: np.ndarray) -> float | None:
+    values = values[np.isfinite(values)]
+    return float(values.max()) if len(values) else None
+
+
+def _minimum(values: np.ndarray) -> float | None:
+    values = values[np.isfinite(values)]
+    return float(values.min()) if len(values) else None
+
+
+def set_results(process: ArchiveSection, archive) -> None:
+    """
+    Projects a process onto what the search indexes: the elements of its starting
+    materials into `results.material`, and its maximum temperature, duration and
+    rates into the `summary` sub section, whose scalar quantities are searchable.
+    The values are taken from the steps as given, so they do not depend on the
+    steps being normalized first.
+
+    Args:
+        process (ArchiveSection): The process with `steps` and `initial_materials`.
+        archive (EntryArchive): The archive containing the process.
+    """
+    set_material_results(
+        archive,
+        [
+            composition.element
+            for material in process.initial_materials
+            for composition in material.elemental_composition
+        ],
+    )
+    steps = process.steps
+    temperatures = np.concatenate(
+        [_step_values(steps, name, 'kelvin') for name in STEP_TEMPERATURES]
+    )
+    durations = []
+    for step in steps:
+        if step.duration is not None:
+            durations.append(step.duration.to('second').magnitude)
+        elif (time := getattr(step, 'process_time', None)) is not None and len(time):
+            time = time.to('second').magnitude
+            durations.append(np.nanmax(time) - np.nanmin(time))
+    rates = [np.empty(0)]
+    for _, time, temperature in programmed_profiles(process):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rates.append(np.diff(temperature) / np.diff(time))
+    rates = np.concatenate(rates)
+    heating = _maximum(rates[rates > 0])
+    cooling = _maximum(-rates[rates < 0])
+    pulling_rates = _step_values(steps, 'pulling_rate', 'meter/second')
+    process.summary = CPFSGrowthSummary(
+        max_temperature=_maximum(temperatures),
+        duration=float(np.sum(durations)) if durations else None,
+        max_heating_rate=heating,
+        max_cooling_rate=cooling,
+        min_pulling_rate=_minimum(pulling_rates),
+        max_pulling_rate=_maximum(pulling_rates),
+        max_rotation_speed=_maximum(_step_values(steps, 'rotation_speed', 'hertz')),
+    )
 
 
 class CPFSCrystal(Ensemble, EntryData):
@@ -375,6 +770,12 @@ class CPFSCrystal(Ensemble, EntryData):
             logger (BoundLogger): A structlog logger.
         """
         super().normalize(archive, logger)
+        if self.achieved_composition:
+            set_elemental_composition(self, self.achieved_composition, logger)
+            set_material_results(
+                archive,
+                [composition.element for composition in self.elemental_composition],
+            )
 
 
 class CPFSInitialSynthesisComponent(Ensemble, EntryData):
@@ -392,12 +793,7 @@ class CPFSInitialSynthesisComponent(Ensemble, EntryData):
         description='Any information that cannot be captured in the other fields.',
     )
     state = Quantity(
-        type=MEnum(
-            'Powder',
-            'Polycrystal',
-            'Plate',
-            'Pieces',
-        ),
+        type=MEnum(*MATERIAL_STATES),
         a_eln=ELNAnnotation(
             component='EnumEditQuantity',
         ),
@@ -424,37 +820,9 @@ class CPFSInitialSynthesisComponent(Ensemble, EntryData):
             logger (BoundLogger): A structlog logger.
         """
         super().normalize(archive, logger)
-        #        """Figure out elemental composition from name if possible"""
+        # figure out the elemental composition from the name if it is a formula
         if self.name:
-            elements = []
-            nums = []
-            tmp_atom = self.name[0]
-            tmp_number = ''
-            for i in range(1, len(self.name)):
-                if self.name[i].isalpha():
-                    if self.name[i].isupper():
-                        elements.append(tmp_atom)
-                        if tmp_number == '':
-                            tmp_number = '1'
-                        nums.append(int(tmp_number))
-                        tmp_atom = self.name[i]
-                        tmp_number = ''
-                    if self.name[i].islower():
-                        tmp_atom += self.name[i]
-                if self.name[i] in '1234567890':
-                    tmp_number += self.name[i]
-            elements.append(tmp_atom)
-            if tmp_number == '':
-                tmp_number = '1'
-            nums.append(int(tmp_number))
-
-            elemental_comp = []
-            for i in range(len(nums)):
-                elemental = ElementalComposition(
-                    element=elements[i], atomic_fraction=float(nums[i]) / sum(nums)
-                )
-                elemental_comp.append(elemental)
-            self.elemental_composition = elemental_comp
+            set_elemental_composition(self, self.name, logger)
 
 
 class CPFSRodInformation(ArchiveSection):
@@ -494,4 +862,729 @@ class CPFSRodInformation(ArchiveSection):
     )
 
 
+class CPFSMeasuredLog(ArchiveSection):
+    """
+    The log of a furnace controller, e.g. temperature, power, rotation and pull
+    position sampled at 1 Hz over the whole run. The log file is stored as chunked,
+    compressed HDF5 datasets that the quantities of this section reference, instead
+    of as lists in the archive.
+    """
+
+    m_def = Section(
+        a_h5web=H5WebAnnotation(
+            axes='time', signal='temperature', auxiliary_signals=['power']
+        ),
+    )
+    log_file = Quantity(
+        type=str,
+        description="""
+        The controller log, a delimited text file with a header row of channels
+        and units, e.g. `time [s],temperature [°C],power [W]`.
+        """,
+        a_browser=BrowserAnnotation(adaptor='RawFileAdaptor'),
+        a_eln=ELNAnnotation(component='FileEditQuantity'),
+    )
+    log_format = Quantity(
+        type=str,
+        description="""
+        The format of the log file, e.g. `cpfs`, `eurotherm` or `jumo`. Detected from
+        the first lines of the file if empty.
+        """,
+        a_eln=ELNAnnotation(component='StringEditQuantity'),
+    )
+    hdf5_file = Quantity(
+        type=str,
+        description="""
+        The HDF5 file with one dataset per channel of the log.
+        """,
+        a_browser=BrowserAnnotation(adaptor='RawFileAdaptor'),
+    )
+    log_checksum = Quantity(
+        type=str,
+        description="""
+        The format and checksum of the log file last stored. The log is only stored
+        again if either changes.
+        """,
+    )
+    samples = Quantity(
+        type=int,
+        description='The number of samples in the log.',
+    )
+    channels = Quantity(
+        type=str,
+        shape=['*'],
+        description='The names of all channels in the log.',
+    )
+    start_time = Quantity(
+        type=Datetime,
+        description='The time of the first sample, if the log has timestamps.',
+    )
+    duration = Quantity(
+        type=float,
+        unit='second',
+        description='The time from the first to the last sample.',
+        a_eln=ELNAnnotation(defaultDisplayUnit='hour'),
+    )
+    time = Quantity(
+        type=HDF5Reference,
+        description='The time of each sample since the first one, in seconds.',
+    )
+    temperature = Quantity(
+        type=HDF5Reference,
+        description='The measured temperature in kelvin.',
+    )
+    power = Quantity(
+        type=HDF5Reference,
+        description='The heating power, in the unit of the log.',
+    )
+    rotation = Quantity(
+        type=HDF5Reference,
+        description='The rotation speed in hertz.',
+    )
+    pull_position = Quantity(
+        type=HDF5Reference,
+        description='The pull position in meter.',
+    )
+    setpoint = Quantity(
+        type=HDF5Reference,
+        description='The temperature set point of the controller in kelvin.',
+    )
+    overview = Quantity(
+        type=int,
+        shape=['*'],
+        description="""
+        The samples per bucket of each level of the min/max overview of the log,
+        stored in the HDF5 file to plot the log at a lower resolution.
+        """,
+    )
+
+    @timed
+    def normalize(self, archive, logger: BoundLogger) -> None:
+        """
+        The normalizer for the `CPFSMeasuredLog` class. Stores the log file as HDF5
+        if it changed since it was last stored.
+
+        Args:
+            archive (EntryArchive): The archive containing the section that is being
+            normalized.
+            logger (BoundLogger): A structlog logger.
+        """
+        super().normalize(archive, logger)
+        if not self.log_file:
+            return
+        from cpfs_synthesis.logs import (
+            CHANNEL_UNITS,
+            HDF5_GROUP,
+            LOG_FORMATS,
+            LogReader,
+            file_checksum,
+            write_log_hdf5,
+        )
+        from cpfs_synthesis.utils import (
+            raw_file_writer,
+        )
+
+        context = archive.m_context
+        hdf5_file = f'{self.log_file}.h5'
+        with (
+            span('log checksum') as timing,
+            context.raw_file(self.log_file, 'rb') as file,
+        ):
+            checksum = file_checksum(file)
+            size = timing.bytes = file.tell()
+        if (
+            f'{self.log_format}:{checksum}' == self.log_checksum
+            and self.hdf5_file == hdf5_file
+            and context.raw_path_exists(hdf5_file)
+            and (self.overview is not None or not self.samples)
+        ):
+            return
+        if self.log_format and self.log_format not in LOG_FORMATS:
+            logger.warning(
+                'Unknown controller log format.',
+                log_format=self.log_format,
+                known=sorted(LOG_FORMATS),
+            )
+            return
+        try:
+            with (
+                span('store log') as timing,
+                context.raw_file(self.log_file, 'rb') as file,
+                raw_file_writer(context, hdf5_file) as path,
+            ):
+                reader = LogReader(file, log_format=LOG_FORMATS.get(self.log_format))
+                summary = write_log_hdf5(reader, path)
+                timing.bytes = size
+        except ValueError as error:
+            logger.warning(
+                'Could not read the controller log.',
+                log_file=self.log_file,
+                error=str(error),
+            )
+            return
+        self.hdf5_file = hdf5_file
+        self.log_format = reader.format.name
+        self.log_checksum = f'{self.log_format}:{checksum}'
+        self.samples = summary.samples
+        self.channels = list(summary.channels)
+        self.start_time = summary.start_time
+        self.duration = summary.duration
+        self.overview = summary.overview
+        for channel in CHANNEL_UNITS:
+            reference = None
+            if channel in summary.channels:
+                reference = f'{hdf5_file}#/{HDF5_GROUP}/{channel}'
+            setattr(self, channel, reference)
+
+
+class CPFSProfileDeviation(ArchiveSection):
+    """
+    The deviation of the temperature measured by the furnace controller from the
+    programmed one over a whole run, to screen runs for controller faults.
+    """
+
+    reference = Quantity(
+        type=MEnum('programmed profile', 'controller setpoint'),
+        description="""
+        What the measured temperature is compared with: the temperature profile of
+        the steps or the set point channel of the controller log.
+        """,
+    )
+    tolerance = Quantity(
+        type=float,
+        unit='kelvin',
+        description="""
+        The difference beyond which the measured temperature is out of tolerance.
+        """,
+    )
+    samples = Quantity(
+        type=int,
+        description='The number of samples compared.',
+    )
+    max_overshoot = Quantity(
+        type=float,
+        unit='kelvin',
+        description="""
+        The largest excess of the measured over the programmed temperature.
+        """,
+    )
+    rms_error = Quantity(
+        type=float,
+        unit='kelvin',
+        description="""
+        The root mean square difference of the measured and the programmed
+        temperature.
+        """,
+    )
+    time_out_of_tolerance = Quantity(
+        type=float,
+        unit='second',
+        description="""
+        The time the measured temperature was further from the programmed one than
+        the tolerance.
+        """,
+        a_eln=ELNAnnotation(defaultDisplayUnit='minute'),
+    )
+    checksum = Quantity(
+        type=str,
+        description="""
+        The checksum of the log, the profiles and the tolerance compared. The log
+        is only read again if it changes.
+        """,
+    )
+
+
+class CPFSGrowthSummary(ArchiveSection):
+    """
+    The key figures of a process over all its steps, indexed for the search.
+    """
+
+    max_temperature = Quantity(
+        type=float,
+        unit='kelvin',
+        description='The highest temperature of any step.',
+        a_eln=ELNAnnotation(defaultDisplayUnit='celsius'),
+    )
+    duration = Quantity(
+        type=float,
+        unit='second',
+        description='The duration of all steps.',
+        a_eln=ELNAnnotation(defaultDisplayUnit='hour'),
+    )
+    max_heating_rate = Quantity(
+        type=float,
+        unit='kelvin/second',
+        description='The fastest heating of the temperature profiles.',
+        a_eln=ELNAnnotation(defaultDisplayUnit='kelvin/hour'),
+    )
+    max_cooling_rate = Quantity(
+        type=float,
+        unit='kelvin/second',
+        description="""
+        The fastest cooling of the temperature profiles, as a positive number.
+        """,
+        a_eln=ELNAnnotation(defaultDisplayUnit='kelvin/hour'),
+    )
+    min_pulling_rate = Quantity(
+        type=float,
+        unit='meter/second',
+        description='The slowest pulling rate of any step.',
+        a_eln=ELNAnnotation(defaultDisplayUnit='millimeter/minute'),
+    )
+    max_pulling_rate = Quantity(
+        type=float,
+        unit='meter/second',
+        description='The fastest pulling rate of any step.',
+        a_eln=ELNAnnotation(defaultDisplayUnit='millimeter/minute'),
+    )
+    max_rotation_speed = Quantity(
+        type=float,
+        unit='hertz',
+        description='The fastest rotation of any step.',
+    )
+
+
+class CPFSTechniqueStatistics(ArchiveSection):
+    technique = Quantity(
+        type=str,
+    )
+    runs = Quantity(
+        type=int,
+        description='The number of runs of the technique.',
+    )
+    single_crystals = Quantity(
+        type=int,
+        description='The number of runs that gave a single crystal.',
+    )
+    success_rate = Quantity(
+        type=float,
+        description='The fraction of runs that gave a single crystal.',
+    )
+
+
+class CPFSFurnaceStatistics(ArchiveSection):
+    name = Quantity(
+        type=str,
+    )
+    runs = Quantity(
+        type=int,
+        description='The number of runs in the furnace.',
+    )
+
+
+class CPFSCrucibleStatistics(ArchiveSection):
+    name = Quantity(
+        type=str,
+    )
+    crystals = Quantity(
+        type=int,
+        description='The number of crystals with a length grown in the crucible.',
+    )
+    average_crystal_length = Quantity(
+        type=float,
+        unit='meter',
+        a_eln=ELNAnnotation(defaultDisplayUnit='millimeter'),
+    )
+
+
+class CPFSUploadStatistics(EntryData):
+    """
+    The growth statistics of the runs read from templates in an upload, summed
+    from the contribution of each run, see `cpfs_synthesis.statistics`.
+    """
+
+    m_def = Section(
+        label='Upload growth statistics',
+    )
+    name = Quantity(
+        type=str,
+    )
+    runs = Quantity(
+        type=int,
+        description='The number of runs in the upload.',
+    )
+    techniques = SubSection(
+        section_def=CPFSTechniqueStatistics,
+        repeats=True,
+    )
+    furnaces = SubSection(
+        section_def=CPFSFurnaceStatistics,
+        repeats=True,
+    )
+    crucibles = SubSection(
+        section_def=CPFSCrucibleStatistics,
+        repeats=True,
+    )
+    totals = Quantity(
+        type=JSON,
+        description="""
+        The sums over all runs by technique, furnace and crucible.
+        """,
+    )
+    contributions = Quantity(
+        type=JSON,
+        description="""
+        The contribution of each run to the totals by its entry.
+        """,
+    )
+
+
+def statistics_section(totals: dict, contributions: dict) -> CPFSUploadStatistics:
+    """Returns the statistics section of the totals of an upload."""
+    return CPFSUploadStatistics(
+        name='Upload growth statistics',
+        runs=totals['runs'],
+        techniques=[
+            CPFSTechniqueStatistics(
+                technique=technique,
+                runs=counts['runs'],
+                single_crystals=counts['single_crystals'],
+                success_rate=counts['single_crystals'] / counts['runs'],
+            )
+            for technique, counts in sorted(totals['techniques'].items())
+        ],
+        furnaces=[
+            CPFSFurnaceStatistics(name=name, runs=counts['runs'])
+            for name, counts in sorted(totals['furnaces'].items())
+        ],
+        crucibles=[
+            CPFSCrucibleStatistics(
+                name=name,
+                crystals=counts['crystals'],
+                average_crystal_length=counts['total_crystal_length']
+                / counts['crystals'],
+            )
+            for name, counts in sorted(totals['crucibles'].items())
+        ],
+        totals=totals,
+        contributions=contributions,
+    )
+
+
+def update_upload_statistics(archive, runs: dict[str, dict]) -> None:
+    """
+    Records the contribution of each run to the statistics of the upload of
+    `archive`, and adds the statistics entry of the upload if it does not exist
+    yet. The entry is built from all contributions after the runs of the upload are
+    processed, see `upload_statistics`.
+
+    Args:
+        archive (EntryArchive): The archive of the normalized run.
+        runs (dict[str, dict]): The contribution of each run by its entry, see
+            `cpfs_synthesis.statistics.run_contribution`.
+    """
+    from cpfs_synthesis.statistics import (
+        STATISTICS_FILE,
+        STATISTICS_RECORDS,
+    )
+    from cpfs_synthesis.utils import (
+        add_upload_entry,
+        write_run_record,
+    )
+
+    for run, contribution in runs.items():
+        write_run_record(archive, STATISTICS_RECORDS, run, contribution)
+    add_upload_entry(
+        archive, STATISTICS_FILE, 'The growth statistics of the runs of the upload.\n'
+    )
+
+
+def upload_statistics(directory: str) -> CPFSUploadStatistics:
+    """
+    Returns the statistics section of an upload, summed from the contributions of
+    its runs.
+
+    Args:
+        directory (str): The directory with the raw files of the upload.
+    """
+    from cpfs_synthesis.statistics import (
+        STATISTICS_RECORDS,
+        update_totals,
+    )
+    from cpfs_synthesis.utils import (
+        read_run_records,
+    )
+
+    totals, contributions = update_totals(
+        None, None, read_run_records(directory, STATISTICS_RECORDS)
+    )
+    return statistics_section(totals, contributions)
+
+
+class CPFSLineageIndex(EntryData):
+    """
+    The lineage of the crystals of an upload, from the precursors over the runs to
+    the crystals, indexed from the record of each run, see
+    `cpfs_synthesis.lineage`.
+    """
+
+    m_def = Section(
+        label='Crystal lineage',
+    )
+    name = Quantity(
+        type=str,
+    )
+    runs = Quantity(
+        type=int,
+        description='The number of runs in the index.',
+    )
+    crystals = Quantity(
+        type=int,
+        description='The number of crystals in the index.',
+    )
+    precursors = Quantity(
+        type=str,
+        shape=['*'],
+        description='The names of the precursors of the runs.',
+    )
+    index = Quantity(
+        type=JSON,
+        description="""
+        The record of each run by its entry and the runs of each precursor, by name
+        and company, of each crystal entry and of each sample ID.
+        """,
+    )
+
+
+def update_lineage_index(archive, runs: dict[str, dict]) -> None:
+    """
+    Records the lineage of each run in the upload of `archive`, and adds the
+    lineage entry of the upload if it does not exist yet, like
+    `update_upload_statistics`. The entry is built after the runs of the upload are
+    processed, see `upload_lineage`.
+
+    Args:
+        archive (EntryArchive): The archive of the normalized run.
+        runs (dict[str, dict]): The lineage record of each run by its entry, see
+            `cpfs_synthesis.lineage.run_lineage`.
+    """
+    from cpfs_synthesis.lineage import (
+        LINEAGE_FILE,
+        LINEAGE_RECORDS,
+    )
+    from cpfs_synthesis.utils import (
+        add_upload_entry,
+        write_run_record,
+    )
+
+    for run, record in runs.items():
+        write_run_record(archive, LINEAGE_RECORDS, run, record)
+    add_upload_entry(
+        archive, LINEAGE_FILE, 'The crystal lineage of the runs of the upload.\n'
+    )
+
+
+def upload_lineage(directory: str) -> CPFSLineageIndex:
+    """
+    Returns the lineage section of an upload, indexed from the records of its runs.
+
+    Args:
+        directory (str): The directory with the raw files of the upload.
+    """
+    from cpfs_synthesis.lineage import (
+        LineageIndex,
+    )
+
+    index = LineageIndex.build(directory).index
+    return CPFSLineageIndex(
+        name='Crystal lineage',
+        runs=len(index['runs']),
+        crystals=len(index['crystals']),
+        precursors=sorted(index['precursors']),
+        index=index,
+    )
+
+
+class CPFSTemplateProcess(ArchiveSection):
+    """
+    A crystal growth process that can be read from an xlsx template. Each technique
+    names the layout of its template, its schema entry point, its step section and
+    the instruments of its template.
+    """
+
+    LAYOUT = ''
+    ENTRY_POINT = ''
+    STEP: type[ArchiveSection] = ArchiveSection
+    INSTRUMENTS: tuple[str, ...] = ()
+
+    @timed
+    def normalize(self, archive, logger: BoundLogger) -> None:
+        """
+        The normalizer for the `CPFSTemplateProcess` class. Reads the template of
+        `xlsx_file` if it changed, creates an entry for each further run of the
+        workbook and derives the deviation, figures and results.
+
+        Args:
+            archive (EntryArchive): The archive containing the section that is being
+            normalized.
+            logger (BoundLogger): A structlog logger.
+        """
+        super().normalize(archive, logger)
+        self.location = 'MPI CPfS Dresden'
+        from cpfs_synthesis.schema_packages import (
+            get_configuration,
+        )
+
+        configuration = get_configuration(
+            f'cpfs_synthesis.schema_packages:{self.ENTRY_POINT}'
+        )
+        if self.xlsx_file:
+            self.read_template(archive, logger, configuration)
+        if self.controller_log is not None:
+            for step in self.steps:
+                step.measured_log = self.controller_log
+        set_deviation(
+            self,
+            archive,
+            logger,
+            getattr(configuration, 'deviation_tolerance', None),
+        )
+        set_figures(self, archive, logger)
+        set_results(self, archive)
+
+    def read_template(self, archive, logger: BoundLogger, configuration) -> None:
+        """
+        Fills the section from the first run of `xlsx_file` and creates an entry for
+        each further run, unless the template is unchanged since the last
+        normalization.
+
+        Args:
+            archive (EntryArchive): The archive containing the section.
+            logger (BoundLogger): A structlog logger.
+            configuration (SchemaPackageEntryPoint): The entry point of the schema.
+        """
+        from cpfs_synthesis.cache import (
+            get_template_cache,
+        )
+        from cpfs_synthesis.lineage import (
+            run_lineage,
+        )
+        from cpfs_synthesis.statistics import (
+            run_contribution,
+        )
+        from cpfs_synthesis.templates import (
+            LAYOUTS,
+            load_templates,
+            sheet_archive_name,
+        )
+        from cpfs_synthesis.utils import (
+            create_archive,
+        )
+
+        cache = get_template_cache(configuration)
+        template_file = load_templates(
+            archive,
+            self.xlsx_file,
+            LAYOUTS[self.LAYOUT],
+            sheet=self.sheet_name,
+            checksum=self.template_checksum,
+            cache=cache,
+        )
+        templates = template_file.templates
+        if templates is None:
+            logger.debug('template unchanged', xlsx_file=self.xlsx_file)
+            return
+        if not templates:
+            self.xlsx_file = f'Not a valid {self.m_def.name} template.'
+            return
+        self.fill_from_template(templates[0], archive, logger)
+        self.template_checksum = template_file.checksum
+        runs = {archive.metadata.mainfile: run_contribution(templates[0])}
+        lineage = {archive.metadata.mainfile: run_lineage(templates[0])}
+        for template in templates[1:]:
+            run = type(self)(
+                xlsx_file=self.xlsx_file,
+                sheet_name=template.sheet,
+                template_checksum=template_file.checksum_for(template.sheet),
+            )
+            run.fill_from_template(template, archive, logger)
+            file_name = sheet_archive_name(self.xlsx_file, template.sheet)
+            create_archive(run, archive, file_name)
+            runs[file_name] = run_contribution(template)
+            lineage[file_name] = run_lineage(template)
+        update_upload_statistics(archive, runs)
+        update_lineage_index(archive, lineage)
+        logger.info('read template', xlsx_file=self.xlsx_file, **cache.stats())
+
+    def fill_from_template(
+        self, template: 'TemplateData', archive, logger: BoundLogger
+    ) -> None:
+        """
+        Fills the section with the values of one run of a template.
+
+        Args:
+            template (TemplateData): The values read from the template.
+            archive (EntryArchive): The archive containing the section.
+            logger (BoundLogger): A structlog logger.
+        """
+        from cpfs_synthesis.lineage import (
+            crystal_archive_name,
+            crystal_name,
+        )
+        from cpfs_synthesis.utils import (
+            create_archive,
+        )
+
+        for error in template.errors:
+            logger.warning(error, xlsx_file=self.xlsx_file)
+        instruments = template.groups['instruments']
+        self.name = template.groups['process']['name']
+        for quantity in self.INSTRUMENTS:
+            set_instrument(self, quantity, instruments[quantity], archive, logger)
+        if 'rod_information' in template.groups:
+            self.rod_information = CPFSRodInformation(
+                **template.groups['rod_information']
+            )
+        self.steps = self.steps_from_template(template, archive, logger)
+        components = []
+        for row in template.tables['initial_materials']:
+            single_component = CPFSInitialSynthesisComponent(**row)
+            single_component.normalize(archive, logger)
+            components.append(single_component)
+        self.initial_materials = components
+        self.resulting_crystal = create_archive(
+            CPFSCrystal(name=crystal_name(template), **template.groups['crystal']),
+            archive,
+            crystal_archive_name(template),
+        )
+
+    def steps_from_template(
+        self, template: 'TemplateData', archive, logger: BoundLogger
+    ) -> list[ArchiveSection]:
+        """
+        Returns the steps of one run of a template, a `STEP` for each row of the step
+        table.
+
+        Args:
+            template (TemplateData): The values read from the template.
+            archive (EntryArchive): The archive containing the section.
+            logger (BoundLogger): A structlog logger.
+
+        Returns:
+            list[ArchiveSection]: The steps of the run.
+        """
+        return [self.STEP(**step) for step in self.step_records(template)]
+
+    @staticmethod
+    def step_records(template: 'TemplateData') -> list[dict[str, object]]:
+        """
+        Returns the values of each step of one run of a template.
+
+        Args:
+            template (TemplateData): The values read from the template.
+
+        Returns:
+            list[dict[str, object]]: The values of each step by quantity.
+        """
+        from cpfs_synthesis.templates import (
+            series_records,
+        )
+
+        steps = series_records(template.series['steps'])
+        if not steps:
+            # templates without a step table hold a single step
+            steps = [dict(template.groups['step'])]
+        return steps
+
+
 m_package.__init_metainfo__()
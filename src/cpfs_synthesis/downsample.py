@@ -0,0 +1,193 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an 'AS IS' BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+Min/max downsampling of long time series for plotting.
+
+A series is split into buckets of consecutive samples and only the minimum and
+maximum of each bucket are kept, so peaks and dips survive at every resolution.
+The levels of a pyramid have buckets growing by `FACTOR`, from `BUCKET` samples up
+to the level that fits into `MAX_POINTS` plotted points.
+"""
+
+from dataclasses import dataclass, field
+
+import numpy as np
+
+BUCKET = 64
+FACTOR = 4
+# the points per trace sent to the browser, two per bucket
+MAX_POINTS = 4000
+
+
+@dataclass
+class OverviewLevel:
+    """
+    One level of a min/max pyramid.
+
+    Attributes:
+        bucket: The number of samples per bucket.
+        time: The time of the first sample of each bucket.
+        minimum: The minimum of each bucket by channel name.
+        maximum: The maximum of each bucket by channel name.
+    """
+
+    bucket: int
+    time: np.ndarray
+    minimum: dict[str, np.ndarray] = field(default_factory=dict)
+    maximum: dict[str, np.ndarray] = field(default_factory=dict)
+
+
+def _reduce(values: np.ndarray, size: int, function: np.ufunc) -> np.ndarray:
+    # pad the last, partial bucket with NaN, which `fmin` and `fmax` ignore
+    padding = -len(values) % size
+    if padding:
+        values = np.concatenate([values, np.full(padding, np.nan)])
+    return function.reduce(values.reshape(-1, size), axis=1)
+
+
+def _coarsen(level: OverviewLevel, factor: int) -> OverviewLevel:
+    return OverviewLevel(
+        bucket=level.bucket * factor,
+        time=level.time[::factor],
+        minimum={
+            name: _reduce(values, factor, np.fmin)
+            for name, values in level.minimum.items()
+        },
+        maximum={
+            name: _reduce(values, factor, np.fmax)
+            for name, values in level.maximum.items()
+        },
+    )
+
+
+class MinMaxPyramid:
+    """
+    Builds the min/max pyramid of a series that is read in chunks. Only the finest
+    level is kept while adding chunks, which has one bucket per `bucket` samples.
+
+    Args:
+        bucket (int): The number of samples per bucket of the finest level.
+        factor (int): The growth of the bucket size from level to level.
+        max_points (int): The points of the coarsest level, two per bucket.
+    """
+
+    def __init__(
+        self, bucket: int = BUCKET, factor: int = FACTOR, max_points: int = MAX_POINTS
+    ):
+        self.bucket = bucket
+        self.factor = factor
+        self.max_points = max_points
+        self._pending: dict[str, np.ndarray] = {}
+        self._levels: list[OverviewLevel] = []
+
+    def _add_buckets(self, chunk: dict[str, np.ndarray]) -> None:
+        self._levels.append(
+            OverviewLevel(
+                bucket=self.bucket,
+                time=chunk['time'][:: self.bucket],
+                minimum={
+                    name: _reduce(values, self.bucket, np.fmin)
+                    for name, values in chunk.items()
+                    if name != 'time'
+                },
+                maximum={
+                    name: _reduce(values, self.bucket, np.fmax)
+                    for name, values in chunk.items()
+                    if name != 'time'
+                },
+            )
+        )
+
+    def add(self, chunk: dict[str, np.ndarray]) -> None:
+        """Adds a chunk of samples, the arrays of the channels by name."""
+        if self._pending:
+            chunk = {
+                name: np.concatenate([self._pending[name], values])
+                for name, values in chunk.items()
+            }
+        full = len(chunk['time']) // self.bucket * self.bucket
+        self._pending = {name: values[full:] for name, values in chunk.items()}
+        if full:
+            self._add_buckets({name: values[:full] for name, values in chunk.items()})
+
+    def levels(self) -> list[OverviewLevel]:
+        """
+        Returns the levels from the finest to the coarsest. The remaining samples
+        form the last bucket of the finest level.
+        """
+        if self._pending and len(self._pending['time']):
+            self._add_buckets(self._pending)
+        self._pending = {}
+        if not self._levels:
+            return []
+        finest = self._levels[0]
+        names = finest.minimum
+        finest = OverviewLevel(
+            bucket=self.bucket,
+            time=np.concatenate([level.time for level in self._levels]),
+            minimum={
+                name: np.concatenate([level.minimum[name] for level in self._levels])
+                for name in names
+            },
+            maximum={
+                name: np.concatenate([level.maximum[name] for level in self._levels])
+                for name in names
+            },
+        )
+        self._levels = [finest]
+        levels = [finest]
+        while 2 * len(levels[-1].time) > self.max_points:
+            levels.append(_coarsen(levels[-1], self.factor))
+        return levels
+
+
+def envelope(
+    time: np.ndarray, minimum: np.ndarray, maximum: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the points of a line through the minimum and maximum of each bucket,
+    which draws the band a series spans.
+    """
+    return np.repeat(time, 2), np.column_stack([minimum, maximum]).ravel()
+
+
+def downsample(
+    time: np.ndarray, values: np.ndarray, max_points: int = MAX_POINTS
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns a series with at most `max_points` points, the envelope of its buckets
+    if it is longer.
+
+    Args:
+        time (np.ndarray): The time of each sample.
+        values (np.ndarray): The values of each sample.
+        max_points (int): The number of points to return at most.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The time and values of the points.
+    """
+    time = np.asarray(time, dtype=float)
+    values = np.asarray(values, dtype=float)
+    if len(time) <= max_points:
+        return time, values
+    bucket = -(-2 * len(time) // max_points)
+    return envelope(
+        time[::bucket],
+        _reduce(values, bucket, np.fmin),
+        _reduce(values, bucket, np.fmax),
+    )
@@ -0,0 +1,508 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an 'AS IS' BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+Columnar export of growth runs and crystals to Parquet.
+
+The archives below a directory are read one at a time: the `.archive.json` files
+of an upload or of the output of `cpfs-synthesis ingest`, and the processed
+archives of entries downloaded from NOMAD, `<upload id>/<entry id>.json`. The run
+of a template uploaded to NOMAD is created by its parser and only exists as a
+processed entry, so a template without the archive of its run is reported as an
+error instead of being left out silently. Each process becomes a row of
+the table of its technique, with the quantities of its single sub sections like
+`summary` flattened into `summary.max_temperature` columns, and its steps and
+initial materials become rows of the child tables `<table>_steps` and
+`<table>_initial_materials`. Crystals go to the `crystals` table. The columns
+are those of the section definitions in SI units, the unit of a column is kept in
+its field metadata.
+
+Rows are written in batches as row groups, so memory stays bounded by the batch
+size. A watermark in the output directory records the modification time and size
+of every entry exported. Repeated exports only read the entries that changed
+since and append them as a new part of each table, with the number of the export
+in the `export` column: the current version of an entry is its row with the
+highest `export`, and its child rows have the same `entry` and `export`.
+"""
+
+import json
+import os
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from cpfs_synthesis.schema_packages import PROCESS_SECTIONS
+
+# the raw `.archive.json` files and the processed `<entry id>.json` archives
+ARCHIVE_SUFFIX = '.json'
+RAW_ARCHIVE_SUFFIX = '.archive.json'
+WATERMARK_FILE = '_watermark.json'
+MISSING_ARCHIVE = (
+    'The run of the template has no archive, it was created when NOMAD parsed the '
+    'template. Export the processed entries of the upload instead, e.g. downloaded '
+    'with `entries/archive/download` of the NOMAD API.'
+)
+BATCH_SIZE = 1024
+
+# the table of the process section of each technique marker
+PROCESS_TABLES = {
+    'CPFSFluxGrowth': 'flux_growth',
+    'CPFSBridgmanTechnique': 'bridgman',
+    'CPFSChemicalVapourTransport': 'chemical_vapour_transport',
+    'CPFSCzochralskiProcess': 'czochralski',
+    'CPFSFloatingZone': 'floating_zone',
+}
+# the table of each section by its `m_def`
+TABLES = {
+    **{
+        PROCESS_SECTIONS[technique].replace(':', '.'): table
+        for technique, table in PROCESS_TABLES.items()
+    },
+    'cpfs_synthesis.cpfs_schemes.CPFSCrystal': 'crystals',
+}
+CHILD_SECTIONS = ('steps', 'initial_materials')
+
+# the key columns of every table, child tables also have `index`
+ENTRY = 'entry'
+EXPORT = 'export'
+INDEX = 'index'
+
+
+@dataclass(frozen=True)
+class Column:
+    """
+    A column of a table.
+
+    Attributes:
+        name: The name of the column, the path of the quantity joined with dots.
+        path: The keys of the value in the section.
+        kind: The kind of values: `float`, `int`, `bool`, `str` or `datetime`.
+        array: If the values are lists.
+        unit: The SI unit of the values.
+    """
+
+    name: str
+    path: tuple[str, ...]
+    kind: str
+    array: bool = False
+    unit: str | None = None
+
+
+def _column_kind(quantity) -> str | None:
+    from nomad.metainfo import Reference
+    from nomad.metainfo.data_type import (
+        Datetime,
+        Enum,
+        ExactNumber,
+        InexactNumber,
+        m_bool,
+        m_str,
+    )
+
+    kinds = (
+        (InexactNumber, 'float'),
+        (ExactNumber, 'int'),
+        (m_bool, 'bool'),
+        (Datetime, 'datetime'),
+        ((m_str, Enum, Reference), 'str'),
+    )
+    for types, kind in kinds:
+        if isinstance(quantity.type, types):
+            return kind
+    return None
+
+
+def section_columns(section_def, prefix: tuple[str, ...] = ()) -> list[Column]:
+    """
+    Returns the columns of a section definition: its scalar quantities, its
+    numeric arrays as list columns and, for the root section, the quantities of
+    its single sub sections.
+
+    Args:
+        section_def (Section): The section definition.
+        prefix (tuple[str, ...]): The path of the section within the table row.
+
+    Returns:
+        list[Column]: The columns in the order of the definition.
+    """
+    columns = []
+    for quantity in section_def.all_quantities.values():
+        kind = _column_kind(quantity)
+        array = list(quantity.shape) == ['*']
+        if kind is None or (quantity.shape and not array) or (array and kind == 'str'):
+            continue
+        path = (*prefix, quantity.name)
+        unit = str(quantity.unit) if quantity.unit is not None else None
+        columns.append(Column('.'.join(path), path, kind, array, unit))
+    if not prefix:
+        for sub_section in section_def.all_sub_sections.values():
+            if not sub_section.repeats:
+                columns.extend(
+                    section_columns(sub_section.sub_section, (sub_section.name,))
+                )
+    return columns
+
+
+def table_columns(section_def, table: str) -> dict[str, list[Column]]:
+    """
+    Returns the columns of the table of a section definition and of its child
+    tables.
+    """
+    keys = [Column(ENTRY, (), 'str'), Column(EXPORT, (), 'int')]
+    tables = {table: keys + section_columns(section_def)}
+    for name in CHILD_SECTIONS:
+        sub_section = section_def.all_sub_sections.get(name)
+        if sub_section is not None:
+            tables[f'{table}_{name}'] = [
+                *keys,
+                Column(INDEX, (), 'int'),
+                *section_columns(sub_section.sub_section),
+            ]
+    return tables
+
+
+def _value(section: dict, column: Column):
+    value = section
+    for key in column.path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    if value is None:
+        return None
+    if column.kind == 'datetime':
+        return datetime.fromisoformat(value)
+    if column.kind == 'str' and not isinstance(value, str):
+        return json.dumps(value)
+    if column.array and not isinstance(value, list):
+        return [value]
+    return value
+
+
+def _row(section: dict, columns: list[Column], **keys) -> dict:
+    return {
+        column.name: keys[column.name]
+        if column.name in keys
+        else _value(section, column)
+        for column in columns
+    }
+
+
+def archive_rows(
+    data: dict, table: str, tables: dict[str, list[Column]], entry: str, export: int
+) -> Iterator[tuple[str, dict]]:
+    """
+    Yields the rows of a process or crystal and of its steps and initial materials.
+
+    Args:
+        data (dict): The `data` section of the archive.
+        table (str): The table of the section.
+        tables (dict[str, list[Column]]): The columns of the table and its child
+            tables, see `table_columns`.
+        entry (str): The path of the entry.
+        export (int): The number of the export.
+
+    Yields:
+        tuple[str, dict]: The table and the row.
+    """
+    yield table, _row(data, tables[table], entry=entry, export=export)
+    for name in CHILD_SECTIONS:
+        child = f'{table}_{name}'
+        if child not in tables:
+            continue
+        for index, section in enumerate(data.get(name) or []):
+            yield (
+                child,
+                _row(section, tables[child], entry=entry, export=export, index=index),
+            )
+
+
+@dataclass
+class Watermark:
+    """
+    The state of the exports into an output directory.
+
+    Attributes:
+        exports: The number of the last export.
+        entries: The modification time in nanoseconds and the size of each entry
+            when it was last exported, by its path.
+        mainfiles: The mainfile of each processed archive by its path.
+    """
+
+    exports: int = 0
+    entries: dict[str, list[int]] = field(default_factory=dict)
+    mainfiles: dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def read(cls, output: str) -> 'Watermark':
+        """Reads the watermark of `output`, an empty one if there is none."""
+        try:
+            with open(os.path.join(output, WATERMARK_FILE), encoding='utf-8') as file:
+                state = json.load(file)
+        except FileNotFoundError:
+            return cls()
+        return cls(state['exports'], state['entries'], state.get('mainfiles', {}))
+
+    def write(self, output: str) -> None:
+        """Writes the watermark to `output`, replacing the previous one at once."""
+        path = os.path.join(output, WATERMARK_FILE)
+        with open(f'{path}.tmp', 'w', encoding='utf-8') as file:
+            json.dump(
+                {
+                    'exports': self.exports,
+                    'entries': self.entries,
+                    'mainfiles': self.mainfiles,
+                },
+                file,
+            )
+        os.replace(f'{path}.tmp', path)
+
+
+def find_archives(directory: str) -> Iterator[tuple[str, list[int]]]:
+    """
+    Yields the paths, relative to `directory`, of the archives below it with their
+    modification time in nanoseconds and size. Hidden files and directories are
+    skipped.
+    """
+    for root, directories, files in os.walk(directory):
+        directories[:] = sorted(d for d in directories if not d.startswith('.'))
+        for file_name in sorted(files):
+            if file_name.endswith(ARCHIVE_SUFFIX) and not file_name.startswith('.'):
+                path = os.path.join(root, file_name)
+                stat = os.stat(path)
+                yield (
+                    os.path.relpath(path, directory).replace(os.sep, '/'),
+                    [stat.st_mtime_ns, stat.st_size],
+                )
+
+
+def templates_without_archives(
+    directory: str, archives: Iterable[str]
+) -> Iterator[str]:
+    """
+    Yields the paths, relative to `directory`, of the templates below it whose run
+    has no archive among `archives`, see `cpfs_synthesis.ingest.archive_names`.
+
+    Args:
+        directory (str): The directory to scan for templates.
+        archives (Iterable[str]): The paths of the archives and the mainfiles of
+            the processed archives, relative to `directory`.
+    """
+    from cpfs_synthesis.ingest import find_templates
+    from cpfs_synthesis.templates import read_techniques
+
+    # the template itself is the mainfile of a processed run, otherwise its run is
+    # `<template>.archive.json` or `<template>.<technique>.archive.json`
+    templates = set(archives)
+    for archive in list(templates):
+        if archive.endswith(RAW_ARCHIVE_SUFFIX):
+            stem = archive[: -len(RAW_ARCHIVE_SUFFIX)]
+            templates.update((stem, stem.rsplit('.', 1)[0]))
+    for path in find_templates(directory):
+        if path in templates:
+            continue
+        with open(os.path.join(directory, path), 'rb') as file:
+            techniques = read_techniques(file)
+        if any(technique in PROCESS_SECTIONS for technique in techniques):
+            yield path
+
+
+def _read_archive(path: str) -> tuple[dict, str | None]:
+    # the data and, of a processed archive, the mainfile of the entry
+    with open(path, encoding='utf-8') as file:
+        content = json.load(file)
+    if not isinstance(content, dict):
+        return {}, None
+    data = content.get('data')
+    metadata = content.get('metadata')
+    mainfile = metadata.get('mainfile') if isinstance(metadata, dict) else None
+    return data if isinstance(data, dict) else {}, mainfile
+
+
+def _arrow_schema(columns: list[Column]):
+    import pyarrow as pa
+
+    types = {
+        'float': pa.float64(),
+        'int': pa.int64(),
+        'bool': pa.bool_(),
+        'str': pa.string(),
+        'datetime': pa.timestamp('us', tz='UTC'),
+    }
+    return pa.schema(
+        [
+            pa.field(
+                column.name,
+                pa.list_(types[column.kind]) if column.array else types[column.kind],
+                metadata={'unit': column.unit} if column.unit else None,
+            )
+            for column in columns
+        ]
+    )
+
+
+class _TableWriter:
+    """Buffers the rows of a table and writes them as row groups of one part."""
+
+    def __init__(self, path: str, columns: list[Column], batch_size: int):
+        self.path = path
+        self.schema = _arrow_schema(columns)
+        self.batch_size = batch_size
+        self.rows: list[dict] = []
+        self.written = 0
+        self._writer = None
+
+    def add(self, row: dict) -> None:
+        self.rows.append(row)
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if not self.rows:
+            return
+        if self._writer is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._writer = pq.ParquetWriter(self.path, self.schema)
+        self._writer.write_table(pa.Table.from_pylist(self.rows, schema=self.schema))
+        self.written += len(self.rows)
+        self.rows = []
+
+    def close(self) -> None:
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+
+
+@dataclass
+class ExportSummary:
+    """The outcome of an export."""
+
+    export: int = 0
+    entries: int = 0
+    unchanged: int = 0
+    removed: int = 0
+    rows: dict[str, int] = field(default_factory=dict)
+    errors: dict[str, str] = field(default_factory=dict)
+    seconds: float = 0.0
+
+    def report(self) -> str:
+        """Returns a human readable summary with the rows per table and errors."""
+        lines = [
+            f'Export {self.export}: {self.entries} changed entries, '
+            f'{self.unchanged} unchanged, {self.removed} removed, '
+            f'in {self.seconds:.1f} s.'
+        ]
+        lines.extend(f'  {table}: {rows} rows' for table, rows in self.rows.items())
+        lines.extend(f'  {path}: {error}' for path, error in self.errors.items())
+        return '\n'.join(lines)
+
+
+def _section_def(m_def: str):
+    import importlib
+
+    module, name = m_def.rsplit('.', 1)
+    return getattr(importlib.import_module(module), name).m_def
+
+
+def _table_rows(
+    data: dict, path: str, columns: dict[str, dict[str, list[Column]]], export: int
+) -> tuple[str | None, list[tuple[str, dict]]]:
+    # the table of an archive and its rows, no table if it is no process or crystal
+    table = TABLES.get(data.get('m_def'))
+    if table is None:
+        return None, []
+    if table not in columns:
+        columns[table] = table_columns(_section_def(data['m_def']), table)
+    return table, list(archive_rows(data, table, columns[table], path, export))
+
+
+def export(directory: str, output: str, batch_size: int = BATCH_SIZE) -> ExportSummary:
+    """
+    Exports the processes and crystals below `directory` that changed since the
+    last export into `output` as Parquet tables, `<output>/<table>/part-<n>.parquet`.
+
+    Args:
+        directory (str): The directory to scan for archives.
+        output (str): The directory receiving the tables and the watermark.
+        batch_size (int): The number of rows of a table written at once.
+
+    Returns:
+        ExportSummary: The number of the export and the rows written per table.
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as error:
+        raise ImportError(
+            'The export needs pyarrow, install it with `pip install '
+            'cpfs_synthesis[export]`.'
+        ) from error
+
+    start = time.perf_counter()
+    os.makedirs(output, exist_ok=True)
+    watermark = Watermark.read(output)
+    summary = ExportSummary(export=watermark.exports + 1)
+    columns: dict[str, dict[str, list[Column]]] = {}
+    writers: dict[str, _TableWriter] = {}
+    entries = {}
+    mainfiles = {}
+    try:
+        for path, stamp in find_archives(directory):
+            entries[path] = stamp
+            if watermark.entries.get(path) == stamp:
+                summary.unchanged += 1
+                mainfiles[path] = watermark.mainfiles.get(path)
+                continue
+            try:
+                data, mainfiles[path] = _read_archive(os.path.join(directory, path))
+                table, rows = _table_rows(data, path, columns, summary.export)
+            except Exception as error:
+                summary.errors[path] = f'{type(error).__name__}: {error}'
+                del entries[path]
+                continue
+            if table is None:
+                continue
+            for name, row in rows:
+                writer = writers.get(name)
+                if writer is None:
+                    writer = writers[name] = _TableWriter(
+                        os.path.join(
+                            output, name, f'part-{summary.export:05d}.parquet'
+                        ),
+                        columns[table][name],
+                        batch_size,
+                    )
+                writer.add(row)
+            summary.entries += 1
+    finally:
+        for writer in writers.values():
+            writer.close()
+    # only processed archives have a mainfile
+    mainfiles = {path: mainfile for path, mainfile in mainfiles.items() if mainfile}
+    for path in templates_without_archives(directory, [*entries, *mainfiles.values()]):
+        summary.errors[path] = MISSING_ARCHIVE
+    summary.rows = {name: writer.written for name, writer in sorted(writers.items())}
+    summary.removed = len(set(watermark.entries) - set(entries))
+    if summary.entries:
+        watermark.exports = summary.export
+    watermark.entries = entries
+    watermark.mainfiles = mainfiles
+    watermark.write(output)
+    summary.seconds = time.perf_counter() - start
+    return summary
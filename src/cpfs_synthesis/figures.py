@@ -0,0 +1,210 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an 'AS IS' BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+Plotly figures of the programmed profiles and controller logs of a process.
+
+Every trace is downsampled to at most `MAX_POINTS` points, logs from the min/max
+overview stored with them, so a figure stays small however long the run. The
+figure JSON is built as plain dicts without importing Plotly and cached by the
+hash of its content.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import BinaryIO
+
+import numpy as np
+
+from cpfs_synthesis.downsample import MAX_POINTS, downsample, envelope
+
+# changes the hash of all figures when their layout changes
+FIGURE_VERSION = 1
+MAX_CACHED_FIGURES = 128
+
+# label, channels and their conversion from SI to the plotted unit
+LOG_FIGURES = (
+    ('Temperature', '°C', ('temperature', 'setpoint'), lambda v: v - 273.15),
+    ('Power', None, ('power',), None),
+    ('Rotation', 'rpm', ('rotation',), lambda v: v * 60),
+    ('Pull position', 'mm', ('pull_position',), lambda v: v * 1e3),
+)
+
+# hash -> figures
+_figures: OrderedDict[str, list[tuple[str, dict]]] = OrderedDict()
+_lock = threading.Lock()
+
+
+@dataclass
+class Trace:
+    """A line of a figure, the time in seconds and the values as plotted."""
+
+    name: str
+    time: np.ndarray
+    values: np.ndarray
+
+
+def figure_key(*parts) -> str:
+    """
+    Returns the hash of the content of figures, given as strings, numbers or
+    arrays.
+    """
+    checksum = hashlib.sha256(str(FIGURE_VERSION).encode())
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            checksum.update(np.ascontiguousarray(part, dtype=float).tobytes())
+        else:
+            checksum.update(repr(part).encode())
+        checksum.update(b'\0')
+    return checksum.hexdigest()
+
+
+def line_figure(title: str, unit: str | None, traces: list[Trace]) -> dict:
+    """
+    Returns the Plotly JSON of a line plot over the process time in hours.
+
+    Args:
+        title (str): The title and the label of the y axis.
+        unit (str | None): The unit of the values.
+        traces (list[Trace]): The lines to plot.
+
+    Returns:
+        dict: The figure with `data` and `layout`.
+    """
+    return {
+        'data': [
+            {
+                'type': 'scattergl',
+                'mode': 'lines',
+                'name': trace.name,
+                'x': (np.asarray(trace.time) / 3600).round(4).tolist(),
+                'y': np.asarray(trace.values, dtype=float).round(4).tolist(),
+            }
+            for trace in traces
+        ],
+        'layout': {
+            'title': {'text': title},
+            'xaxis': {'title': {'text': 'Process time (h)'}},
+            'yaxis': {'title': {'text': f'{title} ({unit})' if unit else title}},
+            'showlegend': len(traces) > 1,
+        },
+    }
+
+
+def read_log_traces(file: BinaryIO, max_points: int = MAX_POINTS) -> dict:
+    """
+    Reads the channels of a log stored by `write_log_hdf5` with at most
+    `max_points` points each, from the finest overview level that is small enough.
+
+    Args:
+        file (BinaryIO): The HDF5 file, opened in binary mode.
+        max_points (int): The number of points per channel at most.
+
+    Returns:
+        dict: The time and the values in SI units by channel name, and the units
+            by channel name under `units`.
+    """
+    import h5py
+
+    # the log readers import pandas, profiles are plotted without them
+    from cpfs_synthesis.logs import HDF5_GROUP, OVERVIEW_GROUP
+
+    traces = {}
+    with h5py.File(file, 'r') as hdf5:
+        log = hdf5[HDF5_GROUP]
+        names = [name for name in log if name not in ('time', OVERVIEW_GROUP)]
+        units = {name: log[name].attrs.get('units') for name in names}
+        levels = sorted(log.get(OVERVIEW_GROUP, {}), key=int)
+        if log['time'].shape[0] <= max_points or not levels:
+            time = log['time'][:]
+            for name in names:
+                traces[name] = downsample(time, log[name][:], max_points)
+        else:
+            level = next(
+                (
+                    log[OVERVIEW_GROUP][bucket]
+                    for bucket in levels
+                    if 2 * log[OVERVIEW_GROUP][bucket]['time'].shape[0] <= max_points
+                ),
+                log[OVERVIEW_GROUP][levels[-1]],
+            )
+            time = level['time'][:]
+            for name in names:
+                traces[name] = envelope(
+                    time, level[f'{name}_min'][:], level[f'{name}_max'][:]
+                )
+    traces['units'] = units
+    return traces
+
+
+def process_figures(
+    programmed: list[Trace], log_file: BinaryIO | None = None
+) -> list[tuple[str, dict]]:
+    """
+    Returns the figures of a process: the temperature with the programmed profiles
+    and the measured channels, and one figure per further channel of the log.
+
+    Args:
+        programmed (list[Trace]): The programmed temperatures in kelvin.
+        log_file (BinaryIO | None): The HDF5 file of the controller log, if any.
+
+    Returns:
+        list[tuple[str, dict]]: The label and the Plotly JSON of each figure.
+    """
+    log = read_log_traces(log_file) if log_file is not None else {'units': {}}
+    figures = []
+    for title, plotted_unit, channels, convert in LOG_FIGURES:
+        traces = []
+        if channels[0] == 'temperature':
+            for trace in programmed:
+                time, values = downsample(trace.time, trace.values)
+                traces.append(Trace(trace.name, time, convert(values)))
+        for channel in channels:
+            if channel not in log:
+                continue
+            time, values = log[channel]
+            if convert is not None:
+                values = convert(values)
+            traces.append(Trace(channel.replace('_', ' '), time, values))
+        if traces:
+            unit = plotted_unit or log['units'].get(channels[0])
+            figures.append((title, line_figure(title, unit, traces)))
+    return figures
+
+
+def cached_figures(
+    key: str, build: Callable[[], list[tuple[str, dict]]]
+) -> list[tuple[str, dict]]:
+    """
+    Returns the figures with the hash `key`, built only if they are not among the
+    `MAX_CACHED_FIGURES` most recently used ones. The figures are shared, so they
+    must not be modified.
+    """
+    with _lock:
+        figures = _figures.get(key)
+        if figures is not None:
+            _figures.move_to_end(key)
+            return figures
+    figures = build()
+    with _lock:
+        _figures[key] = figures
+        while len(_figures) > MAX_CACHED_FIGURES:
+            _figures.popitem(last=False)
+    return figures
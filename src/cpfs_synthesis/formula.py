@@ -0,0 +1,175 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an 'AS IS' BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+A parser for the chemical formulas used as names of starting materials, e.g.
+`Bi2Te3`, `Fe0.95Se`, `Ca(OH)2`, `K4[Fe(CN)6]` or `CuSO4·5H2O`.
+
+Results are memoized by formula string, as the same precursors appear in many
+growth runs.
+"""
+
+import functools
+import re
+
+# the states a starting material is delivered in, see `CPFSInitialSynthesisComponent`
+MATERIAL_STATES = ('Powder', 'Polycrystal', 'Plate', 'Pieces')
+
+ELEMENTS = frozenset(
+    """
+    H He Li Be B C N O F Ne Na Mg Al Si P S Cl Ar K Ca Sc Ti V Cr Mn Fe Co Ni Cu
+    Zn Ga Ge As Se Br Kr Rb Sr Y Zr Nb Mo Tc Ru Rh Pd Ag Cd In Sn Sb Te I Xe Cs Ba
+    La Ce Pr Nd Pm Sm Eu Gd Tb Dy Ho Er Tm Yb Lu Hf Ta W Re Os Ir Pt Au Hg Tl Pb
+    Bi Po At Rn Fr Ra Ac Th Pa U Np Pu Am Cm Bk Cf Es Fm Md No Lr Rf Db Sg Bh Hs
+    Mt Ds Rg Cn Nh Fl Mc Lv Ts Og D
+    """.split()
+)
+
+_TOKEN = re.compile(
+    r'(?P<element>[A-Z][a-z]?)'
+    r'|(?P<number>\d+(?:\.\d+)?|\.\d+)'
+    r'|(?P<open>[(\[{])'
+    r'|(?P<close>[)\]}])'
+    r'|(?P<hydrate>[·•*])'
+    r'|(?P<space>\s+)'
+)
+_CLOSING = {'(': ')', '[': ']', '{': '}'}
+
+
+class FormulaError(ValueError):
+    """Raised for a string that is not a valid chemical formula."""
+
+
+def _tokenize(formula: str) -> list[tuple[str, str]]:
+    tokens = []
+    position = 0
+    while position < len(formula):
+        match = _TOKEN.match(formula, position)
+        if match is None:
+            raise FormulaError(
+                f'Unexpected {formula[position]!r} at position {position} '
+                f'of {formula!r}.'
+            )
+        if match.lastgroup != 'space':
+            tokens.append((match.lastgroup, match.group()))
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    def __init__(self, formula: str):
+        self.formula = formula
+        self.tokens = _tokenize(formula)
+        self.position = 0
+
+    def peek(self) -> tuple[str | None, str | None]:
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+        return None, None
+
+    def number(self, default: float = 1.0) -> float:
+        kind, value = self.peek()
+        if kind != 'number':
+            return default
+        self.position += 1
+        return float(value)
+
+    def group(self, closing: str | None = None) -> dict[str, float]:
+        counts: dict[str, float] = {}
+        while True:
+            kind, value = self.peek()
+            if kind == 'element':
+                if value not in ELEMENTS:
+                    raise FormulaError(
+                        f'Unknown element {value!r} in {self.formula!r}.'
+                    )
+                self.position += 1
+                _add(counts, {value: 1.0}, self.number())
+            elif kind == 'open':
+                self.position += 1
+                inner = self.group(_CLOSING[value])
+                _add(counts, inner, self.number())
+            elif kind == 'close':
+                if value != closing:
+                    raise FormulaError(f'Unbalanced {value!r} in {self.formula!r}.')
+                self.position += 1
+                return counts
+            else:
+                if closing is not None:
+                    raise FormulaError(f'Missing {closing!r} in {self.formula!r}.')
+                return counts
+
+    def parse(self) -> dict[str, float]:
+        counts: dict[str, float] = {}
+        while True:
+            # a hydrate part like `5H2O` may start with a coefficient
+            coefficient = self.number()
+            part = self.group()
+            if not part:
+                raise FormulaError(f'{self.formula!r} is not a chemical formula.')
+            _add(counts, part, coefficient)
+            kind, value = self.peek()
+            if kind is None:
+                return counts
+            if kind != 'hydrate':
+                raise FormulaError(f'Unexpected {value!r} in {self.formula!r}.')
+            self.position += 1
+
+
+def _add(counts: dict[str, float], part: dict[str, float], factor: float) -> None:
+    for element, count in part.items():
+        counts[element] = counts.get(element, 0.0) + count * factor
+
+
+@functools.lru_cache(maxsize=4096)
+def element_counts(formula: str) -> tuple[tuple[str, float], ...]:
+    """
+    Returns the number of atoms of each element of a formula unit, in the order
+    of first appearance.
+
+    Args:
+        formula (str): The chemical formula.
+
+    Returns:
+        tuple[tuple[str, float], ...]: The element symbols and their counts.
+
+    Raises:
+        FormulaError: If `formula` is not a valid chemical formula.
+    """
+    return tuple(_Parser(formula).parse().items())
+
+
+@functools.lru_cache(maxsize=4096)
+def atomic_fractions(formula: str) -> tuple[tuple[str, float], ...]:
+    """
+    Returns the atomic fraction of each element of a formula, in the order of first
+    appearance.
+
+    Args:
+        formula (str): The chemical formula.
+
+    Returns:
+        tuple[tuple[str, float], ...]: The element symbols and their fractions.
+
+    Raises:
+        FormulaError: If `formula` is not a valid chemical formula.
+    """
+    counts = element_counts(formula)
+    total = sum(count for _, count in counts)
+    if total <= 0:
+        raise FormulaError(f'{formula!r} has no atoms.')
+    return tuple((element, count / total) for element, count in counts)
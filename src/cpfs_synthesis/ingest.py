@@ -0,0 +1,218 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an 'AS IS' BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+Batch ingestion of growth-run templates outside of a NOMAD installation.
+
+Every template found below a directory is normalized with the process section of
+its technique. The resulting `.archive.json` files, the runs of further workbook
+sheets and the crystals are written to an output directory that can be uploaded
+to NOMAD as a whole.
+"""
+
+import os
+import shutil
+import time
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+
+TEMPLATE_EXTENSIONS = ('.csv', '.xlsx')
+
+
+@dataclass
+class IngestResult:
+    """The outcome of ingesting one template file."""
+
+    path: str
+    techniques: list[str] = field(default_factory=list)
+    archives: list[str] = field(default_factory=list)
+    error: str | None = None
+    seconds: float = 0.0
+
+
+@dataclass
+class IngestSummary:
+    """The outcome of a batch ingestion."""
+
+    results: list[IngestResult] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def ingested(self) -> list[IngestResult]:
+        return [result for result in self.results if result.techniques]
+
+    @property
+    def errors(self) -> list[IngestResult]:
+        return [result for result in self.results if result.error]
+
+    def report(self) -> str:
+        """Returns a human readable summary with throughput and errors."""
+        ingested = self.ingested
+        archives = sum(len(result.archives) for result in ingested)
+        rate = len(ingested) / self.seconds if self.seconds else 0.0
+        lines = [
+            f'Ingested {len(ingested)} of {len(self.results)} files '
+            f'({archives} archives) in {self.seconds:.1f} s, '
+            f'{rate:.1f} templates/s, {len(self.errors)} errors.'
+        ]
+        lines.extend(f'  {result.path}: {result.error}' for result in self.errors)
+        return '\n'.join(lines)
+
+
+def find_templates(directory: str) -> Iterator[str]:
+    """
+    Yields the paths, relative to `directory`, of the CSV and xlsx files below it.
+    Hidden files and directories are skipped.
+    """
+    for root, directories, files in os.walk(directory):
+        directories[:] = sorted(d for d in directories if not d.startswith('.'))
+        for file_name in sorted(files):
+            if file_name.endswith(TEMPLATE_EXTENSIONS) and not file_name.startswith(
+                '.'
+            ):
+                path = os.path.join(root, file_name)
+                yield os.path.relpath(path, directory).replace(os.sep, '/')
+
+
+def archive_names(path: str, techniques: list[str]) -> dict[str, str]:
+    """
+    Returns the mainfile of the entry written for each technique of the template at
+    `path`. The uploaded template is not parsed again if one of them exists.
+    """
+    # keep the extension, `run.csv` and `run.xlsx` may sit side by side
+    if len(techniques) == 1:
+        return {techniques[0]: f'{path}.archive.json'}
+    return {technique: f'{path}.{technique}.archive.json' for technique in techniques}
+
+
+def client_context(output: str):
+    """
+    Returns a client context that writes the archives created while normalizing,
+    e.g. of crystals, to the directory `output`, and records their files in its
+    `updated` list.
+    """
+    from nomad.datamodel.context import ClientContext
+
+    class IngestContext(ClientContext):
+        """A client context that writes the archives created to `local_dir`."""
+
+        creates_archives = True
+
+        def __init__(self, local_dir: str):
+            super().__init__(local_dir=local_dir)
+            self.updated: list[str] = []
+
+        def process_updated_raw_file(self, path, allow_modify=False):
+            self.updated.append(path)
+
+        def normalize_reference(self, source, url):
+            # there is no upload id yet, mainfile references are resolved on upload
+            if '/archive/mainfile/' in url:
+                return url
+            return super().normalize_reference(source, url)
+
+    return IngestContext(output)
+
+
+def ingest_file(path: str, directory: str, output: str) -> IngestResult:
+    """
+    Normalizes the template at `path` with the process section of each technique
+    it contains and writes the archives to `output`.
+
+    Args:
+        path (str): The path of the template relative to `directory`.
+        directory (str): The directory that is ingested.
+        output (str): The directory receiving the template and the archives.
+
+    Returns:
+        IngestResult: The archives written or the error that occurred.
+    """
+    from nomad.client import normalize_all
+    from nomad.datamodel import EntryArchive, EntryMetadata
+
+    from cpfs_synthesis.schema_packages import PROCESS_SECTIONS, process_section
+    from cpfs_synthesis.templates import read_techniques
+    from cpfs_synthesis.utils import canonical_json, write_raw_file
+
+    start = time.perf_counter()
+    result = IngestResult(path)
+    try:
+        with open(os.path.join(directory, path), 'rb') as file:
+            result.techniques = [
+                technique
+                for technique in read_techniques(file)
+                if technique in PROCESS_SECTIONS
+            ]
+        if result.techniques and os.path.abspath(directory) != os.path.abspath(output):
+            target = os.path.join(output, path)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copy2(os.path.join(directory, path), target)
+        for technique, mainfile in archive_names(path, result.techniques).items():
+            context = client_context(output)
+            archive = EntryArchive(
+                m_context=context, metadata=EntryMetadata(mainfile=mainfile)
+            )
+            archive.data = process_section(technique)(xlsx_file=path)
+            # all normalizers, as when the entry is processed in NOMAD
+            normalize_all(archive)
+            if archive.data.xlsx_file != path:
+                raise ValueError(archive.data.xlsx_file)
+            write_raw_file(
+                context,
+                mainfile,
+                canonical_json({'data': archive.data.m_to_dict(with_root_def=True)}),
+            )
+            result.archives.extend([mainfile, *context.updated])
+    except Exception as error:
+        result.error = f'{type(error).__name__}: {error}'
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def ingest(
+    directory: str, output: str | None = None, workers: int | None = None
+) -> IngestSummary:
+    """
+    Ingests all templates below `directory` in a pool of worker processes.
+
+    Args:
+        directory (str): The directory to scan for templates.
+        output (str | None): The directory receiving the archives, `directory` if
+            `None`.
+        workers (int | None): The number of worker processes, one per CPU if
+            `None`. With a single worker, the templates are ingested in this
+            process.
+
+    Returns:
+        IngestSummary: The results per template file.
+    """
+    output = output or directory
+    start = time.perf_counter()
+    summary = IngestSummary()
+    paths = list(find_templates(directory))
+    if workers == 1:
+        summary.results = [ingest_file(path, directory, output) for path in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(ingest_file, path, directory, output) for path in paths
+            ]
+            summary.results = [future.result() for future in as_completed(futures)]
+        summary.results.sort(key=lambda result: result.path)
+    summary.seconds = time.perf_counter() - start
+    return summary
@@ -0,0 +1,95 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an 'AS IS' BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+The catalog of furnaces, growth tubes and crucibles. It is a JSON or YAML file
+that maps each kind of instrument to the specifications by instrument name, e.g.
+
+    {"furnaces": {"Furnace1": {"model": "FurnaceModel1", "material": "Steel"}}}
+
+Values are given in SI units. A catalog is indexed on first use and only read
+again once its modification time changes.
+"""
+
+import json
+import os
+import threading
+
+FURNACES = 'furnaces'
+TUBES = 'tubes'
+CRUCIBLES = 'crucibles'
+
+DEFAULT_CATALOG = os.path.join(os.path.dirname(__file__), 'data', 'instruments.json')
+
+# path -> (modification time, kind -> name -> specification)
+_catalogs: dict[str, tuple[int, dict[str, dict[str, dict]]]] = {}
+_lock = threading.Lock()
+
+
+def _read_catalog(path: str) -> dict[str, dict[str, dict]]:
+    with open(path, encoding='utf-8') as file:
+        if path.endswith(('.yaml', '.yml')):
+            import yaml
+
+            catalog = yaml.safe_load(file)
+        else:
+            catalog = json.load(file)
+    if not isinstance(catalog, dict):
+        raise ValueError(f'The instrument catalog {path} is not a mapping.')
+    return {kind: dict(instruments or {}) for kind, instruments in catalog.items()}
+
+
+def load_catalog(path: str | None = None) -> dict[str, dict[str, dict]]:
+    """
+    Returns the index of an instrument catalog, read again only if the file was
+    modified since it was last read.
+
+    Args:
+        path (str | None): The catalog file, the catalog shipped with this plugin if
+            `None`.
+
+    Returns:
+        dict[str, dict[str, dict]]: The specifications by kind and name.
+    """
+    path = path or DEFAULT_CATALOG
+    mtime = os.stat(path).st_mtime_ns
+    cached = _catalogs.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with _lock:
+        cached = _catalogs.get(path)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, _read_catalog(path))
+            _catalogs[path] = cached
+    return cached[1]
+
+
+def lookup_instrument(kind: str, name: str, path: str | None = None) -> dict | None:
+    """
+    Returns the specification of an instrument from the catalog.
+
+    Args:
+        kind (str): The kind of instrument, e.g. `FURNACES`.
+        name (str): The name of the instrument.
+        path (str | None): The catalog file, the catalog shipped with this plugin if
+            `None`.
+
+    Returns:
+        dict | None: The specification or `None` if the catalog has no such
+            instrument.
+    """
+    return load_catalog(path).get(kind, {}).get(name)
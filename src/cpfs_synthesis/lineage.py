@@ -0,0 +1,212 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an 'AS IS' BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+The lineage of the crystals of an upload: precursor → run → crystal.
+
+Every run read from a template records its starting materials with their
+providing company, its furnace and the entry and sample ID of its crystal. A run
+writes this record to its own file when it is normalized, so no other run is read
+or rewritten. The index of an upload holds these records by run entry together
+with the edges in the other direction, from precursors and crystals to their runs,
+and the sample IDs in sorted order. It is built once, when the lineage entry of the
+upload is parsed after all runs are processed, and every query is answered from
+the index alone instead of loading the archives of the runs.
+
+Like the statistics of an upload, the records of deleted runs stay in the index
+until they are deleted from `.cpfs_runs` and the upload reprocessed.
+"""
+
+import json
+from bisect import bisect_left
+from itertools import islice
+
+# the mainfile of the lineage entry, parsed after the runs of the upload
+LINEAGE_FILE = 'cpfs_lineage.cpfs'
+LINEAGE_RECORDS = 'lineage'
+
+
+def crystal_name(template) -> str:
+    """
+    Returns the name of the crystal of a template, its sample ID and achieved
+    composition. Missing parts are left out, and a crystal without either is named
+    after its run.
+    """
+    crystal = template.groups.get('crystal', {})
+    parts = [crystal.get('sample_id'), crystal.get('achieved_composition')]
+    name = '_'.join(part for part in parts if part)
+    return name or template.groups.get('process', {}).get('name') or 'crystal'
+
+
+def crystal_archive_name(template) -> str:
+    """Returns the file name of the entry created for the crystal of a template."""
+    return f'{crystal_name(template)}_CPFSCrystal.archive.json'
+
+
+def run_lineage(template) -> dict:
+    """
+    Returns the lineage record of a run.
+
+    Args:
+        template (TemplateData): The values read from the template of the run.
+
+    Returns:
+        dict: The technique and name of the run, its furnace, its precursors as
+            `[name, company]` pairs, and the entry and sample ID of its crystal.
+    """
+    crystal = template.groups.get('crystal', {})
+    return {
+        'technique': template.technique,
+        'name': template.groups.get('process', {}).get('name'),
+        'furnace': template.groups.get('instruments', {}).get('furnace'),
+        'precursors': [
+            [row['name'], row.get('providing_company')]
+            for row in template.tables.get('initial_materials', [])
+            if row.get('name')
+        ],
+        'crystal': crystal_archive_name(template),
+        'sample_id': crystal.get('sample_id'),
+    }
+
+
+def empty_index() -> dict:
+    """Returns the index of an upload without runs."""
+    return {'runs': {}, 'precursors': {}, 'crystals': {}, 'sample_ids': []}
+
+
+def _company(company: str | None) -> str:
+    # JSON keys are strings, precursors without a company are kept under ''
+    return company or ''
+
+
+def _edit(items: list, item, add: bool) -> None:
+    # adds or removes `item` from the sorted list `items`
+    position = bisect_left(items, item)
+    present = position < len(items) and items[position] == item
+    if add and not present:
+        items.insert(position, item)
+    elif not add and present:
+        del items[position]
+
+
+def _link(index: dict, run: str, record: dict, add: bool) -> None:
+    for name, company in record['precursors']:
+        companies = index['precursors'].setdefault(name, {})
+        _edit(companies.setdefault(_company(company), []), run, add)
+        if not companies[_company(company)]:
+            del companies[_company(company)]
+        if not companies:
+            del index['precursors'][name]
+    crystals = index['crystals']
+    _edit(crystals.setdefault(record['crystal'], []), run, add)
+    if not crystals[record['crystal']]:
+        del crystals[record['crystal']]
+    if record['sample_id'] is not None:
+        _edit(index['sample_ids'], [str(record['sample_id']), run], add)
+
+
+def update_index(index: dict | None, runs: dict[str, dict]) -> dict:
+    """
+    Returns the index of an upload with the records of `runs` added or replaced,
+    without changing the given one.
+
+    Args:
+        index (dict | None): The current index, `None` for a new upload.
+        runs (dict[str, dict]): The new lineage records by run entry, see
+            `run_lineage`.
+
+    Returns:
+        dict: The new index.
+    """
+    # the index is plain JSON, a round trip is the cheapest deep copy
+    index = json.loads(json.dumps(index)) if index else empty_index()
+    for run, record in runs.items():
+        previous = index['runs'].get(run)
+        if previous == record:
+            continue
+        if previous is not None:
+            _link(index, run, previous, add=False)
+        _link(index, run, record, add=True)
+        index['runs'][run] = record
+    return index
+
+
+class LineageIndex:
+    """
+    Answers lineage queries in both directions from the index of an upload.
+    """
+
+    def __init__(self, index: dict):
+        self.index = index
+
+    @classmethod
+    def read(cls, path: str) -> 'LineageIndex':
+        """Reads the index from the downloaded archive of a lineage entry at `path`."""
+        with open(path) as file:
+            return cls(json.load(file)['data']['index'])
+
+    @classmethod
+    def build(cls, directory: str) -> 'LineageIndex':
+        """
+        Builds the index from the records of the runs of the upload with the raw
+        files in `directory`.
+        """
+        from cpfs_synthesis.utils import read_run_records
+
+        return cls(update_index(None, read_run_records(directory, LINEAGE_RECORDS)))
+
+    def runs_from_precursor(self, name: str, company: str | None = None) -> list[str]:
+        """
+        Returns the runs that started from a precursor, from any company if
+        `company` is `None`.
+        """
+        companies = self.index['precursors'].get(name, {})
+        if company is not None:
+            return list(companies.get(company, []))
+        return sorted({run for runs in companies.values() for run in runs})
+
+    def crystals_from_precursor(
+        self, name: str, company: str | None = None
+    ) -> list[str]:
+        """Returns the crystal entries grown from a precursor."""
+        runs = self.index['runs']
+        return sorted(
+            {runs[run]['crystal'] for run in self.runs_from_precursor(name, company)}
+        )
+
+    def runs_with_sample_prefix(self, prefix: str) -> list[str]:
+        """Returns the runs whose crystal has a sample ID starting with `prefix`."""
+        sample_ids = self.index['sample_ids']
+        position = bisect_left(sample_ids, [prefix])
+        runs = []
+        for sample_id, run in islice(sample_ids, position, None):
+            if not sample_id.startswith(prefix):
+                break
+            runs.append(run)
+        return runs
+
+    def runs_of_crystal(self, crystal: str) -> list[str]:
+        """Returns the runs that produced the crystal entry `crystal`."""
+        return list(self.index['crystals'].get(crystal, []))
+
+    def lineage_of_crystal(self, crystal: str) -> list[dict]:
+        """
+        Returns the records of the runs behind a crystal entry, with their furnace
+        and precursors, see `run_lineage`.
+        """
+        runs = self.index['runs']
+        return [{'run': run, **runs[run]} for run in self.runs_of_crystal(crystal)]
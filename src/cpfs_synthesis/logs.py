@@ -0,0 +1,467 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an 'AS IS' BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+Ingestion of furnace controller logs into chunked, compressed HDF5 datasets.
+
+A controller log is a delimited text file with one header row naming the channels
+and their units, e.g. `time [s],temperature [°C],power [W]`, followed by one row
+per sample. The time is given in seconds or as ISO 8601 timestamps. The exports of
+other controller families are read with the `LogFormat` registered for them, which
+maps their columns to channels.
+
+Logs are read in chunks of rows through a generator pipeline, converted to SI units
+and appended to resizable HDF5 datasets, so memory use does not grow with the
+length of a log.
+"""
+
+import datetime
+import hashlib
+import io
+import re
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
+from typing import BinaryIO
+
+import numpy as np
+import pandas as pd
+
+CHUNK_SIZE = 65536
+HDF5_GROUP = 'log'
+OVERVIEW_GROUP = 'overview'
+
+# the channels with quantities on `CPFSMeasuredLog` and the units they are stored in
+CHANNEL_UNITS = {
+    'time': 'second',
+    'temperature': 'kelvin',
+    'power': None,
+    'rotation': 'hertz',
+    'pull_position': 'meter',
+    'setpoint': 'kelvin',
+}
+
+# units pint reads differently, e.g. rpm as radians rather than turns per minute and
+# h as the Planck constant
+_UNIT_ALIASES = {'rpm': '1/minute', 'min^-1': '1/minute', '°c': 'degC', 'h': 'hour'}
+
+_HEADER = re.compile(r'^\s*(?P<name>[^\[(]+?)\s*(?:[\[(](?P<unit>[^\])]*)[\])])?\s*$')
+
+
+@dataclass
+class Channel:
+    """
+    A column of a controller log.
+
+    Attributes:
+        name: The channel name in snake case, e.g. `pull_position`.
+        unit: The unit the values are stored in, `None` if dimensionless or unknown.
+        convert: Converts the values as read to `unit`, if needed.
+    """
+
+    name: str
+    unit: str | None = None
+    convert: Callable[[np.ndarray], np.ndarray] | None = None
+
+
+@dataclass
+class LogSummary:
+    """The outcome of writing a log to HDF5."""
+
+    samples: int = 0
+    channels: dict[str, str | None] = field(default_factory=dict)
+    start_time: datetime.datetime | None = None
+    duration: float | None = None
+    overview: list[int] = field(default_factory=list)
+
+
+def _converter(unit: str, target: str | None):
+    from nomad.units import ureg
+
+    unit = _UNIT_ALIASES.get(unit.lower(), unit)
+    source = ureg(unit).units
+    if target is None:
+        return str(source), None
+    if source == ureg(target).units:
+        return target, None
+    if source.dimensionality != ureg(target).dimensionality:
+        raise ValueError(f'{unit} is not a unit of {target}.')
+    return target, lambda values: ureg.Quantity(values, source).to(target).magnitude
+
+
+def parse_channel(header: str) -> Channel:
+    """
+    Returns the channel of a header cell like `Pull position [mm]`.
+
+    Raises:
+        ValueError: If the unit is unknown or does not match the channel.
+    """
+    match = _HEADER.match(header)
+    if match is None or not match['name']:
+        raise ValueError(f'Invalid channel header {header!r}.')
+    name = re.sub(r'\W+', '_', match['name'].strip().lower())
+    target = CHANNEL_UNITS.get(name)
+    if not match['unit']:
+        return Channel(name, target)
+    try:
+        unit, convert = _converter(match['unit'].strip(), target)
+    except Exception as error:
+        raise ValueError(f'Invalid unit in channel header {header!r}.') from error
+    return Channel(name, unit, convert)
+
+
+@dataclass
+class LogFormat:
+    """
+    The layout of the log export of a controller family.
+
+    Attributes:
+        name: The name the format is registered under.
+        marker: A pattern found in the lines before the header row of an export of
+            this format. The format without marker is the fallback.
+        header_row: The index of the header row, preceded by export metadata.
+        delimiter: The column delimiter, guessed from the header row if `None`.
+        decimal: The decimal separator of the numbers.
+        columns: The channel header, like `temperature [°C]`, by column name. The
+            unit of a channel header may be left out if the column names its unit,
+            like `PV (°C)`. Columns not listed are skipped. If empty, the column
+            names are channel headers and all columns are read.
+        timestamp: The columns giving the time of a sample, a date column followed
+            by time of day columns like `13:05:00`, or a single column of ISO 8601
+            timestamps.
+        date_format: The `strftime` format of the date column, if not ISO 8601.
+    """
+
+    name: str
+    marker: str | None = None
+    header_row: int = 0
+    delimiter: str | None = None
+    decimal: str = '.'
+    columns: dict[str, str] = field(default_factory=dict)
+    timestamp: tuple[str, ...] = ()
+    date_format: str | None = None
+
+
+LOG_FORMATS: dict[str, LogFormat] = {}
+
+# the lines read to detect the format of a log
+DETECT_LINES = 20
+
+
+def register_log_format(log_format: LogFormat) -> LogFormat:
+    """
+    Registers the format of a further controller family. Formats with a marker are
+    detected in the order of registration.
+    """
+    LOG_FORMATS[log_format.name] = log_format
+    return log_format
+
+
+CPFS_LOG = register_log_format(LogFormat(name='cpfs'))
+
+# iTools and nanodac exports: a title and an instrument row, then tags with units
+EUROTHERM_LOG = register_log_format(
+    LogFormat(
+        name='eurotherm',
+        marker=r'^"?Eurotherm',
+        header_row=2,
+        delimiter=',',
+        columns={
+            'Loop.1.Main.PV': 'temperature',
+            'Loop.1.Main.WorkingSP': 'setpoint',
+            'Loop.1.OP.Output': 'power',
+        },
+        timestamp=('Date', 'Time'),
+    )
+)
+
+# German locale exports: semicolons, decimal commas and day-first dates
+JUMO_LOG = register_log_format(
+    LogFormat(
+        name='jumo',
+        marker=r'^"?JUMO',
+        header_row=1,
+        delimiter=';',
+        decimal=',',
+        columns={
+            'Istwert': 'temperature',
+            'Sollwert': 'setpoint',
+            'Stellgrad': 'power',
+            'Drehzahl': 'rotation',
+            'Ziehposition': 'pull_position',
+        },
+        timestamp=('Datum', 'Uhrzeit'),
+        date_format='%d.%m.%Y',
+    )
+)
+
+
+def detect_log_format(lines: list[str]) -> LogFormat:
+    """Returns the registered format whose marker is found in `lines`."""
+    for log_format in LOG_FORMATS.values():
+        if log_format.marker is None:
+            continue
+        marker = re.compile(log_format.marker)
+        if any(marker.search(line) for line in lines[: log_format.header_row]):
+            return log_format
+    return CPFS_LOG
+
+
+def _split_header(cell: str) -> tuple[str, str | None]:
+    match = _HEADER.match(cell)
+    if match is None:
+        return cell.strip(), None
+    return match['name'], match['unit']
+
+
+def _timestamps(
+    dates: np.ndarray, times: list[np.ndarray], date_format: str | None = None
+) -> np.ndarray:
+    if date_format is not None:
+        # a log spans few days, so only the distinct dates are parsed with the
+        # format, which is slow, and the rest is parsed as ISO 8601, which is fast
+        codes, uniques = pd.factorize(dates)
+        iso = pd.to_datetime(uniques, format=date_format).strftime('%Y-%m-%d')
+        dates = np.asarray(iso, dtype=object)[codes]
+    for time in times:
+        dates = dates + 'T' + time
+    timestamps = pd.to_datetime(dates, format='ISO8601', utc=True)
+    return timestamps.tz_localize(None).to_numpy('datetime64[ms]')
+
+
+class LogReader:
+    """
+    Reads a controller log in chunks of at most `chunk_size` rows.
+
+    Iterating yields one dict of SI arrays by channel name per chunk, each converted
+    in one vectorized pass per column. Times given as timestamps are converted to
+    seconds since the first sample, whose time is kept as `start_time`.
+
+    Args:
+        file (BinaryIO): The log file, opened in binary mode. It is read twice,
+            first for the header and then for the samples, so it must be seekable.
+        chunk_size (int): The number of rows per chunk.
+        log_format (LogFormat | None): The format of the log, detected from the
+            first lines if `None`.
+    """
+
+    def __init__(
+        self,
+        file: BinaryIO,
+        chunk_size: int = CHUNK_SIZE,
+        log_format: LogFormat | None = None,
+    ):
+        self.text = io.TextIOWrapper(file, encoding='utf-8-sig', errors='replace')
+        head = [self.text.readline() for _ in range(DETECT_LINES)]
+        self.format = log_format or detect_log_format(head)
+        header = head[self.format.header_row].rstrip('\r\n')
+        if not header:
+            raise ValueError(f'The log has no {self.format.name} header row.')
+        self.delimiter = self.format.delimiter or max(',;\t', key=header.count)
+        self.chunk_size = chunk_size
+        time = Channel('time', 'second')
+        self.time_columns: list[int] = []
+        self.columns: list[int] = []
+        channels = []
+        for index, cell in enumerate(header.split(self.delimiter)):
+            column = cell.strip().strip('"')
+            name, unit = _split_header(column)
+            if name in self.format.timestamp:
+                self.time_columns.append(index)
+                continue
+            if self.format.columns:
+                column = self.format.columns.get(name)
+                if column is None:
+                    continue
+                if unit is not None and '[' not in column:
+                    column = f'{column} [{unit}]'
+            channel = parse_channel(column)
+            if channel.name == 'time' and not self.format.timestamp:
+                self.time_columns = [index]
+                time = channel
+                continue
+            self.columns.append(index)
+            channels.append(channel)
+        if len(self.time_columns) != max(len(self.format.timestamp), 1):
+            raise ValueError('A controller log needs a time channel.')
+        self.channels = [time, *channels]
+        self.start_time: datetime.datetime | None = None
+        self._origin: np.datetime64 | None = None
+
+    def _seconds(self, timestamps: np.ndarray) -> np.ndarray:
+        if self._origin is None:
+            self._origin = timestamps[0]
+            self.start_time = self._origin.astype(datetime.datetime).replace(
+                tzinfo=datetime.timezone.utc
+            )
+        return (timestamps - self._origin) / np.timedelta64(1, 's')
+
+    def _time(self, columns: list[pd.Series]) -> np.ndarray:
+        values, *times = (column.to_numpy(dtype=object) for column in columns)
+        if self.format.timestamp:
+            return self._seconds(_timestamps(values, times, self.format.date_format))
+        try:
+            if self.format.decimal != '.':
+                values = np.char.replace(values.astype(str), self.format.decimal, '.')
+            values = pd.to_numeric(values).astype(float)
+        except ValueError:
+            return self._seconds(_timestamps(values, times))
+        time = self.channels[0]
+        return values if time.convert is None else time.convert(values)
+
+    def __iter__(self) -> Iterator[dict[str, np.ndarray]]:
+        self.text.seek(0)
+        dtype = dict.fromkeys(self.time_columns, str)
+        dtype.update(dict.fromkeys(self.columns, float))
+        with pd.read_csv(
+            self.text,
+            sep=self.delimiter,
+            decimal=self.format.decimal,
+            header=None,
+            skiprows=self.format.header_row + 1,
+            usecols=[*self.time_columns, *self.columns],
+            dtype=dtype,
+            skipinitialspace=True,
+            chunksize=self.chunk_size,
+        ) as chunks:
+            for rows in chunks:
+                table = rows.dropna(subset=self.time_columns)
+                if table.empty:
+                    continue
+                chunk = {
+                    'time': self._time([table[index] for index in self.time_columns])
+                }
+                for index, channel in zip(self.columns, self.channels[1:]):
+                    values = table[index].to_numpy(dtype=float)
+                    if channel.convert is not None:
+                        values = channel.convert(values)
+                    chunk[channel.name] = values
+                yield chunk
+
+
+def write_log_hdf5(reader: LogReader, path: str, group: str = HDF5_GROUP) -> LogSummary:
+    """
+    Appends the chunks of a log to one resizable, gzip compressed dataset per
+    channel in the group `group` of the HDF5 file at `path`. The file is replaced.
+
+    The min/max pyramid of the log is stored alongside, one group per level in
+    `<group>/overview`, named by the samples per bucket, with the datasets `time`,
+    `<channel>_min` and `<channel>_max`.
+
+    Args:
+        reader (LogReader): The log to write.
+        path (str): The path of the HDF5 file.
+        group (str): The group of the datasets.
+
+    Returns:
+        LogSummary: The number of samples, the channels with their units, the
+            time span of the log and the bucket sizes of the overview levels.
+    """
+    import h5py
+
+    from cpfs_synthesis.downsample import MinMaxPyramid
+
+    summary = LogSummary(
+        channels={channel.name: channel.unit for channel in reader.channels}
+    )
+    first = last = None
+    pyramid = MinMaxPyramid()
+    with h5py.File(path, 'w') as file:
+        log = file.create_group(group)
+        log.attrs['NX_class'] = 'NXdata'
+        log.attrs['axes'] = 'time'
+        signals = [name for name in summary.channels if name != 'time']
+        if signals:
+            log.attrs['signal'] = signals[0]
+            log.attrs['auxiliary_signals'] = signals[1:]
+        for channel in reader.channels:
+            dataset = log.create_dataset(
+                channel.name,
+                shape=(0,),
+                maxshape=(None,),
+                dtype=float,
+                chunks=(min(reader.chunk_size, CHUNK_SIZE),),
+                compression='gzip',
+                shuffle=True,
+            )
+            if channel.unit:
+                dataset.attrs['units'] = channel.unit
+        for chunk in reader:
+            size = len(chunk['time'])
+            for name, values in chunk.items():
+                dataset = log[name]
+                dataset.resize((summary.samples + size,))
+                dataset[summary.samples :] = values
+            summary.samples += size
+            pyramid.add(chunk)
+            first = chunk['time'][0] if first is None else first
+            last = chunk['time'][-1]
+        for level in pyramid.levels():
+            overview = log.create_group(f'{OVERVIEW_GROUP}/{level.bucket}')
+            overview.attrs['bucket'] = level.bucket
+            overview.create_dataset('time', data=level.time)
+            for name, values in level.minimum.items():
+                for suffix, data in (('min', values), ('max', level.maximum[name])):
+                    dataset = overview.create_dataset(f'{name}_{suffix}', data=data)
+                    if summary.channels[name]:
+                        dataset.attrs['units'] = summary.channels[name]
+            summary.overview.append(level.bucket)
+    summary.start_time = reader.start_time
+    if first is not None:
+        summary.duration = float(last - first)
+    return summary
+
+
+def read_log_hdf5(
+    file: BinaryIO,
+    channels: list[str],
+    chunk_size: int = CHUNK_SIZE,
+    group: str = HDF5_GROUP,
+) -> Iterator[dict[str, np.ndarray]]:
+    """
+    Reads channels of a log stored by `write_log_hdf5` in chunks of at most
+    `chunk_size` samples.
+
+    Args:
+        file (BinaryIO): The HDF5 file, opened in binary mode.
+        channels (list[str]): The channels to read.
+        chunk_size (int): The number of samples per chunk.
+        group (str): The group of the datasets.
+
+    Yields:
+        dict[str, np.ndarray]: The values of the channels by name.
+
+    Raises:
+        KeyError: If the log has no such channel.
+    """
+    import h5py
+
+    with h5py.File(file, 'r') as hdf5:
+        datasets = {name: hdf5[group][name] for name in channels}
+        samples = min(dataset.shape[0] for dataset in datasets.values())
+        for start in range(0, samples, chunk_size):
+            yield {
+                name: dataset[start : start + chunk_size]
+                for name, dataset in datasets.items()
+            }
+
+
+def file_checksum(file: BinaryIO, block_size: int = 1 << 20) -> str:
+    """Returns the SHA-256 checksum of a file, read in blocks."""
+    checksum = hashlib.sha256()
+    for block in iter(lambda: file.read(block_size), b''):
+        checksum.update(block)
+    return checksum.hexdigest()
@@ -0,0 +1,32 @@
+from nomad.config.models.plugins import ParserEntryPoint
+
+
+class CPFSTemplateParserEntryPoint(ParserEntryPoint):
+    def load(self):
+        from cpfs_synthesis.parsers.parser import CPFSTemplateParser
+
+        return CPFSTemplateParser(**self.dict())
+
+
+parser_template_entry_point = CPFSTemplateParserEntryPoint(
+    name='CPFSTemplateParser',
+    description='Creates growth-run entries from uploaded CPFS templates.',
+    mainfile_name_re=r'.*\.(csv|xlsx)$',
+    mainfile_mime_re=r'(text/.*|application/.*)',
+)
+
+
+class CPFSUploadSummaryParserEntryPoint(ParserEntryPoint):
+    def load(self):
+        from cpfs_synthesis.parsers.parser import CPFSUploadSummaryParser
+
+        return CPFSUploadSummaryParser(**self.dict())
+
+
+parser_upload_summary_entry_point = CPFSUploadSummaryParserEntryPoint(
+    name='CPFSUploadSummaryParser',
+    description='Builds the growth statistics and crystal lineage of an upload.',
+    mainfile_name_re=r'(.*/)?cpfs_(upload_statistics|lineage)\.cpfs',
+    # after the runs of the upload
+    level=1,
+)
@@ -0,0 +1,140 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an 'AS IS' BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import io
+import os
+from collections.abc import Iterable
+
+from nomad.parsing.parser import MatchingParser
+from structlog.stdlib import (
+    BoundLogger,
+)
+
+from cpfs_synthesis.schema_packages import PROCESS_SECTIONS, process_section
+
+
+def sniff_techniques(filename: str, buffer: bytes) -> list[str]:
+    """
+    Returns the known techniques of a template. A CSV template is classified from
+    the `buffer` with the first bytes of the file alone, the marker is on its fourth
+    line. The cells of a workbook are compressed, only the rows up to the marker
+    and the shared strings they refer to are read from the file.
+
+    Args:
+        filename (str): The path of the file.
+        buffer (bytes): The first bytes of the file.
+
+    Returns:
+        list[str]: The techniques found, in the order of the workbook sheets.
+    """
+    from cpfs_synthesis.readers import XLSX_MAGIC
+    from cpfs_synthesis.templates import read_techniques
+
+    if buffer.startswith(XLSX_MAGIC):
+        with open(filename, 'rb') as file:
+            techniques = read_techniques(file)
+    else:
+        techniques = read_techniques(io.BytesIO(buffer))
+    return [technique for technique in techniques if technique in PROCESS_SECTIONS]
+
+
+class CPFSTemplateParser(MatchingParser):
+    """
+    Matches the CSV and xlsx growth-run templates by their technique marker. The
+    entry of a template holds the process section of its technique, which reads
+    the template when it is normalized. A workbook with sheets of more than one
+    technique gets a child entry per further technique.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.creates_children = True
+
+    def is_mainfile(
+        self,
+        filename: str,
+        mime: str,
+        buffer: bytes,
+        decoded_buffer: str,
+        compression: str | None = None,
+    ) -> bool | Iterable[str]:
+        if not super().is_mainfile(filename, mime, buffer, decoded_buffer, compression):
+            return False
+        try:
+            techniques = sniff_techniques(filename, buffer)
+        except Exception:
+            # a broken workbook or an unreadable file is not a template
+            return False
+        from cpfs_synthesis.ingest import archive_names
+
+        # templates uploaded with the archives of `cpfs-synthesis ingest` have entries
+        if any(
+            os.path.exists(name)
+            for name in archive_names(filename, techniques).values()
+        ):
+            return False
+        return techniques[1:] or bool(techniques)
+
+    def parse(
+        self,
+        mainfile: str,
+        archive,
+        logger: BoundLogger,
+        child_archives: dict | None = None,
+    ) -> None:
+        from cpfs_synthesis.templates import read_techniques
+
+        with open(mainfile, 'rb') as file:
+            techniques = [
+                technique
+                for technique in read_techniques(file)
+                if technique in PROCESS_SECTIONS
+            ]
+        child_archives = child_archives or {}
+        for technique in techniques:
+            target = child_archives.get(technique, archive)
+            if target is archive and technique != techniques[0]:
+                continue
+            target.data = process_section(technique)(
+                xlsx_file=archive.metadata.mainfile
+            )
+
+
+class CPFSUploadSummaryParser(MatchingParser):
+    """
+    Builds the growth statistics and crystal lineage entries of an upload from the
+    records of its runs. The parser has a higher level than the parsers of the
+    runs, so NOMAD parses the entries once after all runs of the upload are
+    processed.
+    """
+
+    def parse(
+        self,
+        mainfile: str,
+        archive,
+        logger: BoundLogger,
+        child_archives: dict | None = None,
+    ) -> None:
+        from cpfs_synthesis.cpfs_schemes import upload_lineage, upload_statistics
+        from cpfs_synthesis.lineage import LINEAGE_FILE
+
+        directory = os.path.dirname(os.path.abspath(mainfile))
+        if os.path.basename(mainfile) == LINEAGE_FILE:
+            archive.data = upload_lineage(directory)
+        else:
+            archive.data = upload_statistics(directory)
@@ -0,0 +1,211 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an 'AS IS' BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+Lightweight readers for the growth-run templates.
+
+The readers yield the rows below the header row lazily, so the consumer decides
+how much of the file is read. They only depend on the standard library.
+"""
+
+import csv
+import io
+import posixpath
+import re
+import zipfile
+from collections.abc import Iterator
+from typing import BinaryIO
+from xml.etree.ElementTree import iterparse
+
+XLSX_MAGIC = b'PK\x03\x04'
+_RELATIONSHIP = (
+    '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id'
+)
+_CELL_REFERENCE = re.compile(r'([A-Z]+)(\d+)')
+
+
+def read_csv_rows(file: BinaryIO) -> Iterator[list[str]]:
+    """
+    Yields the rows of a CSV template below its header row. Empty lines are skipped,
+    like `pandas.read_csv` does.
+
+    Args:
+        file (BinaryIO): The template opened in binary mode.
+    """
+    text = io.TextIOWrapper(file, encoding='utf-8-sig', errors='replace', newline='')
+    try:
+        reader = csv.reader(text)
+        next(reader, None)
+        for row in reader:
+            if row:
+                yield row
+    finally:
+        # leave closing the file to the caller
+        text.detach()
+
+
+def is_xlsx(file: BinaryIO) -> bool:
+    """
+    Tells whether the seekable binary `file` is a zip container, i.e. an xlsx
+    workbook rather than a CSV export.
+    """
+    position = file.tell()
+    magic = file.read(len(XLSX_MAGIC))
+    file.seek(position)
+    return magic == XLSX_MAGIC
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+
+def _column_index(letters: str) -> int:
+    index = 0
+    for letter in letters:
+        index = index * 26 + ord(letter) - ord('A') + 1
+    return index - 1
+
+
+def _sheet_paths(workbook: zipfile.ZipFile) -> list[tuple[str, str]]:
+    targets = {}
+    with workbook.open('xl/_rels/workbook.xml.rels') as rels:
+        for _, element in iterparse(rels):
+            if _local(element.tag) == 'Relationship':
+                target = element.get('Target')
+                if target.startswith('/'):
+                    target = target[1:]
+                else:
+                    target = posixpath.normpath(posixpath.join('xl', target))
+                targets[element.get('Id')] = target
+    sheets = []
+    with workbook.open('xl/workbook.xml') as xml:
+        for _, element in iterparse(xml):
+            if _local(element.tag) == 'sheet':
+                sheets.append(
+                    (element.get('name'), targets[element.get(_RELATIONSHIP)])
+                )
+    return sheets
+
+
+def _add_cell(row: list[object], cell, strings: list[str]) -> None:
+    value = None
+    for child in cell:
+        tag = _local(child.tag)
+        if tag == 'v':
+            value = child.text
+        elif tag == 'is':
+            value = ''.join(
+                text.text or '' for text in child.iter() if _local(text.tag) == 't'
+            )
+    if value is None:
+        return
+    if cell.get('t') == 's':
+        index = int(value)
+        value = strings[index] if index < len(strings) else None
+    column = len(row)
+    reference = cell.get('r')
+    if reference:
+        column = _column_index(_CELL_REFERENCE.match(reference)[1])
+    row.extend([None] * (column + 1 - len(row)))
+    row[column] = value
+
+
+def _sheet_rows(
+    workbook: zipfile.ZipFile, path: str, last_row: int | None, strings: list[str]
+) -> Iterator[list[str | None]]:
+    """
+    Yields the rows of a worksheet up to `last_row`, parsing the sheet XML only as
+    far as the rows are consumed. Missing rows are yielded empty.
+    """
+    row_index = 0
+    count = 0
+    with workbook.open(path) as xml:
+        for _, element in iterparse(xml):
+            tag = _local(element.tag)
+            if tag != 'row':
+                if tag == 'sheetData':
+                    break
+                continue
+            row_index = int(element.get('r', row_index + 1))
+            # the first row of the sheet is the header
+            index = row_index - 2
+            if last_row is not None and index > last_row:
+                break
+            if index >= 0:
+                row: list[str | None] = []
+                for cell in element:
+                    if _local(cell.tag) == 'c':
+                        _add_cell(row, cell, strings)
+                element.clear()
+                for _ in range(index - count):
+                    yield []
+                yield row
+                count = index + 1
+            else:
+                element.clear()
+
+
+def _shared_strings(workbook: zipfile.ZipFile) -> list[str]:
+    """Reads the shared strings of a workbook."""
+    strings: list[str] = []
+    if 'xl/sharedStrings.xml' not in workbook.namelist():
+        return strings
+    with workbook.open('xl/sharedStrings.xml') as xml:
+        for _, element in iterparse(xml):
+            if _local(element.tag) != 'si':
+                continue
+            # skip phonetic runs, they are not part of the text
+            strings.append(
+                ''.join(
+                    text.text or ''
+                    for run in element
+                    if _local(run.tag) != 'rPh'
+                    for text in run.iter()
+                    if _local(text.tag) == 't'
+                )
+            )
+            element.clear()
+    return strings
+
+
+def read_xlsx_sheets(
+    file: BinaryIO, last_row: int | None = None
+) -> Iterator[tuple[str, Iterator[list[str | None]]]]:
+    """
+    Reads the rows below the header row of every worksheet of an xlsx workbook,
+    in workbook order. The sheet XML is streamed straight from the zip container
+    and only parsed as far as the rows of a sheet are consumed, which has to
+    happen before the next sheet is requested. The shared strings are read first.
+
+    Args:
+        file (BinaryIO): The workbook opened in binary mode.
+        last_row (int | None): The last row index to read, counted like in
+            `read_csv_rows`. Reads the whole sheets if `None`.
+
+    Yields:
+        tuple[str, Iterator]: The name and the rows of each sheet.
+    """
+    if not file.seekable():
+        file = io.BytesIO(file.read())
+    with zipfile.ZipFile(file) as workbook:
+        strings = _shared_strings(workbook)
+        for name, path in _sheet_paths(workbook):
+            rows = _sheet_rows(workbook, path, last_row, strings)
+            try:
+                yield name, rows
+            finally:
+                rows.close()
@@ -1,52 +1,165 @@
+import functools
+import importlib
+
 from nomad.config.models.plugins import SchemaPackageEntryPoint
 from pydantic import Field
 
-
-class NewSchemaBridgmanEntryPoint(SchemaPackageEntryPoint):
+# the process section of each technique marker, imported on demand
+PROCESS_SECTIONS = {
+    'CPFSFluxGrowth': 'cpfs_synthesis.schema_packages.fluxgrowth:CPFSFluxGrowthProcess',
+    'CPFSBridgmanTechnique': (
+        'cpfs_synthesis.schema_packages.bridgman:CPFSBridgmanTechnique'
+    ),
+    'CPFSChemicalVapourTransport': (
+        'cpfs_synthesis.schema_packages.cvt:CPFSChemicalVapourTransport'
+    ),
+    'CPFSCzochralskiProcess': (
+        'cpfs_synthesis.schema_packages.czochalski:CPFSCzochralskiProcess'
+    ),
+    'CPFSFloatingZone': (
+        'cpfs_synthesis.schema_packages.floatingzone:CPFSFloatingZoneProcess'
+    ),
+}
+
+
+def process_section(technique: str):
+    """Returns the process section class of a technique marker."""
+    module, name = PROCESS_SECTIONS[technique].split(':')
+    return getattr(importlib.import_module(module), name)
+
+
+@functools.cache
+def get_configuration(entry_point_id: str):
+    """
+    Returns the configuration of an entry point of this plugin. It is looked up on
+    first use instead of when the schema package is loaded.
+    """
+    from nomad.config import config
+
+    return config.get_plugin_entry_point(entry_point_id)
+
+
+def get_instrument_catalog() -> str | None:
+    """
+    Returns the instrument catalog configured for this plugin, if any. The schema
+    packages share the instrument sections, so the first schema entry point that
+    sets `instrument_catalog` applies to all of them.
+    """
+    for name in SCHEMA_ENTRY_POINTS:
+        try:
+            configuration = get_configuration(f'{__name__}:{name}')
+        except (AttributeError, KeyError):
+            # plugins are not configured, e.g. outside of a NOMAD installation
+            continue
+        if getattr(configuration, 'instrument_catalog', None):
+            return configuration.instrument_catalog
+    return None
+
+
+@functools.cache
+def timing_spans_enabled() -> bool:
+    """
+    Returns if the normalizers log the timing spans of their phases, unless a
+    schema entry point of this plugin turns off `timing_spans`. The normalizers of
+    shared sections cannot tell their technique, so the setting applies to all.
+    """
+    for name in SCHEMA_ENTRY_POINTS:
+        try:
+            configuration = get_configuration(f'{__name__}:{name}')
+        except (AttributeError, KeyError):
+            # plugins are not configured, e.g. outside of a NOMAD installation
+            continue
+        if not getattr(configuration, 'timing_spans', True):
+            return False
+    return True
+
+
+class CPFSSchemaPackageEntryPoint(SchemaPackageEntryPoint):
     parameter: int = Field(0, description='Custom configuration parameter')
-
+    template_cache_size: int = Field(
+        256, description='Number of parsed templates kept in memory per worker.'
+    )
+    template_cache_dir: str | None = Field(
+        None,
+        description='Directory for parsed templates shared by the workers of a host.',
+    )
+    template_cache_dir_size: int = Field(
+        4096,
+        description=(
+            'Number of parsed templates kept in the directory, the least recently '
+            'used are removed.'
+        ),
+    )
+    dwell_tolerance: float = Field(
+        1.0,
+        description='Rate in K/h up to which a segment of a profile counts as dwell.',
+    )
+    deviation_tolerance: float = Field(
+        5.0,
+        description=(
+            'Difference in K between the measured and the programmed temperature '
+            'beyond which a run counts as out of tolerance.'
+        ),
+    )
+    timing_spans: bool = Field(
+        True,
+        description=(
+            'Log the duration and bytes of the phases of every normalization, '
+            'e.g. reading the template or creating archives.'
+        ),
+    )
+    instrument_catalog: str | None = Field(
+        None,
+        description=(
+            'JSON or YAML file with the furnaces, tubes and crucibles. The catalog '
+            'shipped with the plugin if not set.'
+        ),
+    )
+
+
+class NewSchemaBridgmanEntryPoint(CPFSSchemaPackageEntryPoint):
     def load(self):
         from cpfs_synthesis.schema_packages.bridgman import m_package
 
         return m_package
 
 
-class NewSchemaCVTEntryPoint(SchemaPackageEntryPoint):
-    parameter: int = Field(0, description='Custom configuration parameter')
-
+class NewSchemaCVTEntryPoint(CPFSSchemaPackageEntryPoint):
     def load(self):
         from cpfs_synthesis.schema_packages.cvt import m_package
 
         return m_package
 
 
-class NewSchemaCzochalskiEntryPoint(SchemaPackageEntryPoint):
-    parameter: int = Field(0, description='Custom configuration parameter')
-
+class NewSchemaCzochalskiEntryPoint(CPFSSchemaPackageEntryPoint):
     def load(self):
         from cpfs_synthesis.schema_packages.czochalski import m_package
 
         return m_package
 
 
-class NewSchemaFloatingZoneEntryPoint(SchemaPackageEntryPoint):
-    parameter: int = Field(0, description='Custom configuration parameter')
-
+class NewSchemaFloatingZoneEntryPoint(CPFSSchemaPackageEntryPoint):
     def load(self):
         from cpfs_synthesis.schema_packages.floatingzone import m_package
 
         return m_package
 
 
-class NewSchemaFluxGrowthEntryPoint(SchemaPackageEntryPoint):
-    parameter: int = Field(0, description='Custom configuration parameter')
-
+class NewSchemaFluxGrowthEntryPoint(CPFSSchemaPackageEntryPoint):
     def load(self):
         from cpfs_synthesis.schema_packages.fluxgrowth import m_package
 
         return m_package
 
 
+SCHEMA_ENTRY_POINTS = (
+    'schema_bridgman_entry_point',
+    'schema_cvt_entry_point',
+    'schema_czochalski_entry_point',
+    'schema_floatingzone_entry_point',
+    'schema_fluxgrowth_entry_point',
+)
+
 schema_bridgman_entry_point = NewSchemaBridgmanEntryPoint(
     name='NewSchemaBridgman',
     description='New schema package entry point configuration.',
@@ -15,7 +15,6 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
-from nomad.config import config
 from nomad.datamodel.data import (
     EntryData,
 )
@@ -25,7 +24,10 @@ from nomad.datamodel.metainfo.annotations import (
     SectionProperties,
 )
 from nomad.datamodel.metainfo.basesections import (
-    ActivityStep,
+    ProcessStep,
+)
+from nomad.datamodel.metainfo.plot import (
+    PlotSection,
 )
 from nomad.metainfo import (
     Package,
@@ -36,9 +38,6 @@ from nomad.metainfo import (
 from nomad_material_processing.crystal_growth import (
     CrystalGrowth,
 )
-from nomad_material_processing.utils import (
-    create_archive,
-)
 from structlog.stdlib import (
     BoundLogger,
 )
@@ -48,17 +47,17 @@ from cpfs_synthesis.cpfs_schemes import (
     CPFSCrystal,
     CPFSCrystalGrowthTube,
     CPFSFurnace,
+    CPFSGrowthSummary,
     CPFSInitialSynthesisComponent,
+    CPFSMeasuredLog,
+    CPFSProfileDeviation,
+    CPFSTemplateProcess,
 )
 
 m_package = Package(name='MPI CPFS BRIDGMAN')
 
-configuration = config.get_plugin_entry_point(
-    'cpfs_synthesis.schema_packages:schema_bridgman_entry_point'
-)
-
 
-class CPFSBridgmanTechniqueStep(ActivityStep, EntryData):
+class CPFSBridgmanTechniqueStep(ProcessStep, EntryData):
     """
     A step in the Bridgman technique. Contains temperature and pulling rate.
     """
@@ -78,6 +77,13 @@ class CPFSBridgmanTechniqueStep(ActivityStep, EntryData):
         ),
     )
 
+    measured_log = Quantity(
+        type=CPFSMeasuredLog,
+        description="""
+        The controller log of the process, which covers this step.
+        """,
+    )
+
     def normalize(self, archive, logger: BoundLogger) -> None:
         """
         The normalizer for the `BridgmanTechniqueStep` class.
@@ -90,11 +96,16 @@ class CPFSBridgmanTechniqueStep(ActivityStep, EntryData):
         super().normalize(archive, logger)
 
 
-class CPFSBridgmanTechnique(CrystalGrowth, EntryData):
+class CPFSBridgmanTechnique(CPFSTemplateProcess, CrystalGrowth, PlotSection, EntryData):
     """
     Application definition section for a Bridgman technique at MPI CPFS.
     """
 
+    LAYOUT = 'CPFSBridgmanTechnique'
+    ENTRY_POINT = 'schema_bridgman_entry_point'
+    STEP = CPFSBridgmanTechniqueStep
+    INSTRUMENTS = ('furnace', 'crucible', 'tube')
+
     m_def = Section(
         links=['http://purl.obolibrary.org/obo/CHMO_0002160'],
         a_eln=ELNAnnotation(
@@ -115,12 +126,39 @@ class CPFSBridgmanTechnique(CrystalGrowth, EntryData):
     furnace = SubSection(
         section_def=CPFSFurnace,
     )
+    furnace_entry = Quantity(
+        type=CPFSFurnace,
+        description="""
+        The shared entry of the furnace, used instead of `furnace`.
+        """,
+        a_eln=ELNAnnotation(
+            component='ReferenceEditQuantity',
+        ),
+    )
     crucible = SubSection(
         section_def=CPFSCrucible,
     )
+    crucible_entry = Quantity(
+        type=CPFSCrucible,
+        description="""
+        The shared entry of the crucible, used instead of `crucible`.
+        """,
+        a_eln=ELNAnnotation(
+            component='ReferenceEditQuantity',
+        ),
+    )
     tube = SubSection(
         section_def=CPFSCrystalGrowthTube,
     )
+    tube_entry = Quantity(
+        type=CPFSCrystalGrowthTube,
+        description="""
+        The shared entry of the growth tube, used instead of `tube`.
+        """,
+        a_eln=ELNAnnotation(
+            component='ReferenceEditQuantity',
+        ),
+    )
     initial_materials = SubSection(
         section_def=CPFSInitialSynthesisComponent,
         repeats=True,
@@ -129,6 +167,15 @@ class CPFSBridgmanTechnique(CrystalGrowth, EntryData):
         section_def=CPFSBridgmanTechniqueStep,
         repeats=True,
     )
+    controller_log = SubSection(
+        section_def=CPFSMeasuredLog,
+    )
+    deviation = SubSection(
+        section_def=CPFSProfileDeviation,
+    )
+    summary = SubSection(
+        section_def=CPFSGrowthSummary,
+    )
     resulting_crystal = Quantity(
         type=CPFSCrystal,
         a_eln=ELNAnnotation(
@@ -143,6 +190,27 @@ class CPFSBridgmanTechnique(CrystalGrowth, EntryData):
         a_browser=BrowserAnnotation(adaptor='RawFileAdaptor'),
         a_eln=ELNAnnotation(component='FileEditQuantity'),
     )
+    sheet_name = Quantity(
+        type=str,
+        description="""
+        The workbook sheet of `xlsx_file` that holds this run. If empty, every sheet
+        of the workbook is read and each further run is created as its own entry.
+        """,
+    )
+    template_checksum = Quantity(
+        type=str,
+        description="""
+        The checksum of the template content and layout version of the last
+        normalization. The template is only read again if it changes.
+        """,
+    )
+    figure_checksum = Quantity(
+        type=str,
+        description="""
+        The hash of the content of the figures set in the last normalization. The
+        figures are only built again if it changes.
+        """,
+    )
     lab_id = Quantity(
         type=str,
         description="""An ID string that is unique at least for the lab that produced
@@ -153,71 +221,5 @@ class CPFSBridgmanTechnique(CrystalGrowth, EntryData):
         description='Any information that cannot be captured in the other fields.',
     )
 
-    def normalize(self, archive, logger: BoundLogger) -> None:
-        """
-        The normalizer for the `Bridgman Technique` class.
-
-        Args:
-            archive (EntryArchive): The archive containing the section that is being
-            normalized.
-            logger (BoundLogger): A structlog logger.
-        """
-        super().normalize(archive, logger)
-        self.location = 'MPI CPfS Dresden'
-        if self.xlsx_file:
-            import pandas as pd
-
-            with archive.m_context.raw_file(self.xlsx_file, 'r') as xlsx:
-                inp = pd.read_csv(xlsx)
-                if inp.loc[2][1].split()[1] == 'CPFSBridgmanTechnique':
-                    self.name = str(inp.loc[10][2])
-                    self.furnace = CPFSFurnace(name=str(inp.loc[13][2]))
-                    self.furnace.normalize(archive, logger)
-                    self.crucible = CPFSCrucible(name=str(inp.loc[14][2]))
-                    self.crucible.normalize(archive, logger)
-                    self.tube = CPFSCrystalGrowthTube(name=str(inp.loc[15][2]))
-                    self.tube.normalize(archive, logger)
-                    step = []
-                    step.append(
-                        CPFSBridgmanTechniqueStep(
-                            temperature=float(inp.loc[27][2]) + 273.15,
-                            pulling_rate=float(inp.loc[28][2]) / 1000 / 60,
-                        )
-                    )
-                    self.steps = step
-                    components = []
-                    for i in range(5):
-                        if not pd.isna(inp.loc[20 + i][1]):
-                            single_component = CPFSInitialSynthesisComponent(
-                                name=str(inp.loc[20 + i][1]),
-                                state=str(inp.loc[20 + i][2]),
-                                weight=float(inp.loc[20 + i][3]),
-                                providing_company=str(inp.loc[20 + i][4]),
-                            )
-                            single_component.normalize(archive, logger)
-                            components.append(single_component)
-                    self.initial_materials = components
-                    crystal_ref = create_archive(
-                        CPFSCrystal(
-                            name=str(inp.loc[31][2]) + '_' + str(inp.loc[32][2]),
-                            sample_id=str(inp.loc[31][2]),
-                            achieved_composition=str(inp.loc[32][2]),
-                            final_crystal_length=float(inp.loc[33][2]) / 1000,
-                            single_poly=str(inp.loc[34][2]),
-                            crystal_shape=str(inp.loc[35][2]),
-                            crystal_orientation=str(inp.loc[36][2]),
-                            safety_reactivity=str(inp.loc[37][2]),
-                            description=str(inp.loc[38][2]),
-                        ),
-                        archive,
-                        str(inp.loc[31][2])
-                        + '_'
-                        + str(inp.loc[32][2])
-                        + '_CPFSCrystal.archive.json',
-                    )
-                    self.resulting_crystal = crystal_ref
-                else:
-                    self.xlsx_file = 'Not a valid CPFSBridgmanTechnique template.'
-
 
 m_package.__init_metainfo__()
@@ -16,7 +16,8 @@
 # limitations under the License.
 #
 
-from nomad.config import config
+from typing import TYPE_CHECKING
+
 from nomad.datamodel.data import (
     EntryData,
 )
@@ -26,11 +27,14 @@ from nomad.datamodel.metainfo.annotations import (
     SectionProperties,
 )
 from nomad.datamodel.metainfo.basesections import (
-    ActivityStep,
+    ProcessStep,
 )
 from nomad.datamodel.metainfo.eln import (
     Ensemble,
 )
+from nomad.datamodel.metainfo.plot import (
+    PlotSection,
+)
 from nomad.metainfo import (
     Package,
     Quantity,
@@ -40,9 +44,6 @@ from nomad.metainfo import (
 from nomad_material_processing.crystal_growth import (
     CrystalGrowth,
 )
-from nomad_material_processing.utils import (
-    create_archive,
-)
 from structlog.stdlib import (
     BoundLogger,
 )
@@ -51,17 +52,22 @@ from cpfs_synthesis.cpfs_schemes import (
     CPFSCrystal,
     CPFSCrystalGrowthTube,
     CPFSFurnace,
+    CPFSGrowthSummary,
     CPFSInitialSynthesisComponent,
+    CPFSMeasuredLog,
+    CPFSProfileDeviation,
+    CPFSTemplateProcess,
 )
 
-configuration = config.get_plugin_entry_point(
-    'cpfs_synthesis.schema_packages:schema_cvt_entry_point'
-)
+if TYPE_CHECKING:
+    from cpfs_synthesis.templates import (
+        TemplateData,
+    )
 
 m_package = Package(name='MPI CPFS CVT')
 
 
-class CPFSChemicalVapourTransportStep(ActivityStep, EntryData):
+class CPFSChemicalVapourTransportStep(ProcessStep, EntryData):
     """
     A step in the Chemical Vapour Transport. Contains 2 temperatures and transport agent
     """
@@ -84,6 +90,13 @@ class CPFSChemicalVapourTransportStep(ActivityStep, EntryData):
         section_def=Ensemble,
     )
 
+    measured_log = Quantity(
+        type=CPFSMeasuredLog,
+        description="""
+        The controller log of the process, which covers this step.
+        """,
+    )
+
     def normalize(self, archive, logger: BoundLogger) -> None:
         """
         The normalizer for the `ChemicalVapourTransportStep` class.
@@ -96,11 +109,18 @@ class CPFSChemicalVapourTransportStep(ActivityStep, EntryData):
         super().normalize(archive, logger)
 
 
-class CPFSChemicalVapourTransport(CrystalGrowth, EntryData):
+class CPFSChemicalVapourTransport(
+    CPFSTemplateProcess, CrystalGrowth, PlotSection, EntryData
+):
     """
     Application definition section for a Chemical Vapour Transport at MPI CPFS.
     """
 
+    LAYOUT = 'CPFSChemicalVapourTransport'
+    ENTRY_POINT = 'schema_cvt_entry_point'
+    STEP = CPFSChemicalVapourTransportStep
+    INSTRUMENTS = ('furnace', 'tube')
+
     m_def = Section(
         links=['http://purl.obolibrary.org/obo/CHMO_0002652'],
         a_eln=ELNAnnotation(
@@ -109,7 +129,9 @@ class CPFSChemicalVapourTransport(CrystalGrowth, EntryData):
                     'name',
                     'datetime',
                     'furnace',
+                    'furnace_entry',
                     'tube',
+                    'tube_entry',
                     'initial_materials',
                     'steps',
                     'resulting_crystal',
@@ -137,9 +159,27 @@ class CPFSChemicalVapourTransport(CrystalGrowth, EntryData):
     furnace = SubSection(
         section_def=CPFSFurnace,
     )
+    furnace_entry = Quantity(
+        type=CPFSFurnace,
+        description="""
+        The shared entry of the furnace, used instead of `furnace`.
+        """,
+        a_eln=ELNAnnotation(
+            component='ReferenceEditQuantity',
+        ),
+    )
     tube = SubSection(
         section_def=CPFSCrystalGrowthTube,
     )
+    tube_entry = Quantity(
+        type=CPFSCrystalGrowthTube,
+        description="""
+        The shared entry of the growth tube, used instead of `tube`.
+        """,
+        a_eln=ELNAnnotation(
+            component='ReferenceEditQuantity',
+        ),
+    )
     initial_materials = SubSection(
         section_def=CPFSInitialSynthesisComponent,
         repeats=True,
@@ -148,6 +188,15 @@ class CPFSChemicalVapourTransport(CrystalGrowth, EntryData):
         section_def=CPFSChemicalVapourTransportStep,
         repeats=True,
     )
+    controller_log = SubSection(
+        section_def=CPFSMeasuredLog,
+    )
+    deviation = SubSection(
+        section_def=CPFSProfileDeviation,
+    )
+    summary = SubSection(
+        section_def=CPFSGrowthSummary,
+    )
     resulting_crystal = Quantity(
         type=CPFSCrystal,
         a_eln=ELNAnnotation(
@@ -162,6 +211,27 @@ class CPFSChemicalVapourTransport(CrystalGrowth, EntryData):
         a_browser=BrowserAnnotation(adaptor='RawFileAdaptor'),
         a_eln=ELNAnnotation(component='FileEditQuantity'),
     )
+    sheet_name = Quantity(
+        type=str,
+        description="""
+        The workbook sheet of `xlsx_file` that holds this run. If empty, every sheet
+        of the workbook is read and each further run is created as its own entry.
+        """,
+    )
+    template_checksum = Quantity(
+        type=str,
+        description="""
+        The checksum of the template content and layout version of the last
+        normalization. The template is only read again if it changes.
+        """,
+    )
+    figure_checksum = Quantity(
+        type=str,
+        description="""
+        The hash of the content of the figures set in the last normalization. The
+        figures are only built again if it changes.
+        """,
+    )
     lab_id = Quantity(
         type=str,
         description="""An ID string that is unique at least for the lab that produced
@@ -172,70 +242,28 @@ class CPFSChemicalVapourTransport(CrystalGrowth, EntryData):
         description='Any information that cannot be captured in the other fields.',
     )
 
-    def normalize(self, archive, logger: BoundLogger) -> None:
+    def steps_from_template(
+        self, template: 'TemplateData', archive, logger: BoundLogger
+    ) -> list[CPFSChemicalVapourTransportStep]:
         """
-        The normalizer for the `Chemical Vapour Transport` class.
+        Returns the steps of one run of a template, with the transport agent of each
+        step as an ensemble.
 
         Args:
-            archive (EntryArchive): The archive containing the section that is being
-            normalized.
+            template (TemplateData): The values read from the template.
+            archive (EntryArchive): The archive containing the section.
             logger (BoundLogger): A structlog logger.
+
+        Returns:
+            list[CPFSChemicalVapourTransportStep]: The steps of the run.
         """
-        super().normalize(archive, logger)
-        self.location = 'MPI CPfS Dresden'
-        if self.xlsx_file:
-            import pandas as pd
-
-            with archive.m_context.raw_file(self.xlsx_file, 'r') as xlsx:
-                inp = pd.read_csv(xlsx)
-                if inp.loc[2][1].split()[1] == 'CPFSChemicalVapourTransport':
-                    self.name = str(inp.loc[10][2])
-                    self.furnace = CPFSFurnace(name=str(inp.loc[13][2]))
-                    self.furnace.normalize(archive, logger)
-                    self.tube = CPFSCrystalGrowthTube(name=str(inp.loc[14][2]))
-                    self.tube.normalize(archive, logger)
-                    step = []
-                    step.append(
-                        CPFSChemicalVapourTransportStep(
-                            temperature_one=float(inp.loc[26][2]) + 273.15,
-                            temperature_two=float(inp.loc[27][2]) + 273.15,
-                            transport_agent=Ensemble(name=str(inp.loc[28][2])),
-                        )
-                    )
-                    self.steps = step
-                    components = []
-                    for i in range(5):
-                        if not pd.isna(inp.loc[19 + i][1]):
-                            single_component = CPFSInitialSynthesisComponent(
-                                name=str(inp.loc[19 + i][1]),
-                                state=str(inp.loc[19 + i][2]),
-                                weight=float(inp.loc[19 + i][3]),
-                                providing_company=str(inp.loc[19 + i][4]),
-                            )
-                            single_component.normalize(archive, logger)
-                            components.append(single_component)
-                    self.initial_materials = components
-                    crystal_ref = create_archive(
-                        CPFSCrystal(
-                            name=str(inp.loc[31][2]) + '_' + str(inp.loc[32][2]),
-                            sample_id=str(inp.loc[31][2]),
-                            achieved_composition=str(inp.loc[32][2]),
-                            final_crystal_length=float(inp.loc[33][2]) / 1000,
-                            single_poly=str(inp.loc[34][2]),
-                            crystal_shape=str(inp.loc[35][2]),
-                            crystal_orientation=str(inp.loc[36][2]),
-                            safety_reactivity=str(inp.loc[37][2]),
-                            description=str(inp.loc[38][2]),
-                        ),
-                        archive,
-                        str(inp.loc[31][2])
-                        + '_'
-                        + str(inp.loc[32][2])
-                        + '_CPFSCrystal.archive.json',
-                    )
-                    self.resulting_crystal = crystal_ref
-                else:
-                    self.xlsx_file = 'Not a valid CPFSChemicalVapourTransport template.'
+        return [
+            CPFSChemicalVapourTransportStep(
+                transport_agent=Ensemble(name=step.pop('transport_agent', None)),
+                **step,
+            )
+            for step in self.step_records(template)
+        ]
 
 
 m_package.__init_metainfo__()
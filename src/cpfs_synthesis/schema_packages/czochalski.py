@@ -16,7 +16,6 @@
 # limitations under the License.
 #
 
-from nomad.config import config
 from nomad.datamodel.data import (
     EntryData,
 )
@@ -26,7 +25,10 @@ from nomad.datamodel.metainfo.annotations import (
     SectionProperties,
 )
 from nomad.datamodel.metainfo.basesections import (
-    ActivityStep,
+    ProcessStep,
+)
+from nomad.datamodel.metainfo.plot import (
+    PlotSection,
 )
 from nomad.metainfo import (
     Package,
@@ -37,9 +39,6 @@ from nomad.metainfo import (
 from nomad_material_processing.crystal_growth import (
     CrystalGrowth,
 )
-from nomad_material_processing.utils import (
-    create_archive,
-)
 from structlog.stdlib import (
     BoundLogger,
 )
@@ -48,18 +47,18 @@ from cpfs_synthesis.cpfs_schemes import (
     CPFSCrucible,
     CPFSCrystal,
     CPFSFurnace,
+    CPFSGrowthSummary,
     CPFSInitialSynthesisComponent,
+    CPFSMeasuredLog,
+    CPFSProfileDeviation,
     CPFSRodInformation,
-)
-
-configuration = config.get_plugin_entry_point(
-    'cpfs_synthesis.schema_packages:schema_czochalski_entry_point'
+    CPFSTemplateProcess,
 )
 
 m_package = Package(name='MPI CPFS CZOCHRALSKI')
 
 
-class CPFSCzochralskiProcessStep(ActivityStep, EntryData):
+class CPFSCzochralskiProcessStep(ProcessStep, EntryData):
     """
     A step in the Czochralski Process.
     """
@@ -95,6 +94,13 @@ class CPFSCzochralskiProcessStep(ActivityStep, EntryData):
         ),
     )
 
+    measured_log = Quantity(
+        type=CPFSMeasuredLog,
+        description="""
+        The controller log of the process, which covers this step.
+        """,
+    )
+
     def normalize(self, archive, logger: BoundLogger) -> None:
         """
         The normalizer for the `CzochralskiProcessStep` class.
@@ -107,11 +113,18 @@ class CPFSCzochralskiProcessStep(ActivityStep, EntryData):
         super().normalize(archive, logger)
 
 
-class CPFSCzochralskiProcess(CrystalGrowth, EntryData):
+class CPFSCzochralskiProcess(
+    CPFSTemplateProcess, CrystalGrowth, PlotSection, EntryData
+):
     """
     Application definition section for a Czochralski Process at MPI CPFS.
     """
 
+    LAYOUT = 'CPFSCzochralskiProcess'
+    ENTRY_POINT = 'schema_czochalski_entry_point'
+    STEP = CPFSCzochralskiProcessStep
+    INSTRUMENTS = ('furnace', 'crucible')
+
     m_def = Section(
         links=['http://purl.obolibrary.org/obo/CHMO_0002158'],
         a_eln=ELNAnnotation(
@@ -132,9 +145,27 @@ class CPFSCzochralskiProcess(CrystalGrowth, EntryData):
     furnace = SubSection(
         section_def=CPFSFurnace,
     )
+    furnace_entry = Quantity(
+        type=CPFSFurnace,
+        description="""
+        The shared entry of the furnace, used instead of `furnace`.
+        """,
+        a_eln=ELNAnnotation(
+            component='ReferenceEditQuantity',
+        ),
+    )
     crucible = SubSection(
         section_def=CPFSCrucible,
     )
+    crucible_entry = Quantity(
+        type=CPFSCrucible,
+        description="""
+        The shared entry of the crucible, used instead of `crucible`.
+        """,
+        a_eln=ELNAnnotation(
+            component='ReferenceEditQuantity',
+        ),
+    )
     rod_information = SubSection(
         section_def=CPFSRodInformation,
     )
@@ -146,6 +177,15 @@ class CPFSCzochralskiProcess(CrystalGrowth, EntryData):
         section_def=CPFSCzochralskiProcessStep,
         repeats=True,
     )
+    controller_log = SubSection(
+        section_def=CPFSMeasuredLog,
+    )
+    deviation = SubSection(
+        section_def=CPFSProfileDeviation,
+    )
+    summary = SubSection(
+        section_def=CPFSGrowthSummary,
+    )
     resulting_crystal = Quantity(
         type=CPFSCrystal,
         a_eln=ELNAnnotation(
@@ -160,6 +200,27 @@ class CPFSCzochralskiProcess(CrystalGrowth, EntryData):
         a_browser=BrowserAnnotation(adaptor='RawFileAdaptor'),
         a_eln=ELNAnnotation(component='FileEditQuantity'),
     )
+    sheet_name = Quantity(
+        type=str,
+        description="""
+        The workbook sheet of `xlsx_file` that holds this run. If empty, every sheet
+        of the workbook is read and each further run is created as its own entry.
+        """,
+    )
+    template_checksum = Quantity(
+        type=str,
+        description="""
+        The checksum of the template content and layout version of the last
+        normalization. The template is only read again if it changes.
+        """,
+    )
+    figure_checksum = Quantity(
+        type=str,
+        description="""
+        The hash of the content of the figures set in the last normalization. The
+        figures are only built again if it changes.
+        """,
+    )
     lab_id = Quantity(
         type=str,
         description="""An ID string that is unique at least for the lab that produced
@@ -170,78 +231,5 @@ class CPFSCzochralskiProcess(CrystalGrowth, EntryData):
         description='Any information that cannot be captured in the other fields.',
     )
 
-    def normalize(self, archive, logger: BoundLogger) -> None:
-        """
-        The normalizer for the `CzochralskiProcess` class.
-
-        Args:
-            archive (EntryArchive): The archive containing the section that is being
-            normalized.
-            logger (BoundLogger): A structlog logger.
-        """
-        super().normalize(archive, logger)
-        self.location = 'MPI CPfS Dresden'
-        if self.xlsx_file:
-            import pandas as pd
-
-            with archive.m_context.raw_file(self.xlsx_file, 'r') as xlsx:
-                inp = pd.read_csv(xlsx)
-                if inp.loc[2][1].split()[1] == 'CPFSCzochralskiProcess':
-                    self.name = str(inp.loc[10][2])
-                    self.furnace = CPFSFurnace(name=str(inp.loc[13][2]))
-                    self.furnace.normalize(archive, logger)
-                    self.crucible = CPFSCrucible(name=str(inp.loc[14][2]))
-                    self.crucible.normalize(archive, logger)
-                    self.rod_information = CPFSRodInformation(
-                        rod_preparation=str(inp.loc[17][2]),
-                        seed_rod_diameter=float(inp.loc[18][2]) / 1000,
-                        feed_rod_diameter=float(inp.loc[19][2]) / 1000,
-                        feed_rod_crystal_direction=str(inp.loc[20][2]),
-                    )
-                    step = []
-                    step.append(
-                        CPFSCzochralskiProcessStep(
-                            melting_power_in_percent=float(inp.loc[32][2]),
-                            growth_power_in_percent=float(inp.loc[33][2]),
-                            rotation_speed=float(inp.loc[34][2]),
-                            rotation_direction=str(inp.loc[35][2]),
-                            pulling_rate=float(inp.loc[36][2]) / 1000 / 60,
-                        )
-                    )
-                    self.steps = step
-                    components = []
-                    for i in range(5):
-                        if not pd.isna(inp.loc[25 + i][1]):
-                            single_component = CPFSInitialSynthesisComponent(
-                                name=str(inp.loc[25 + i][1]),
-                                state=str(inp.loc[25 + i][2]),
-                                weight=float(inp.loc[25 + i][3]),
-                                providing_company=str(inp.loc[25 + i][4]),
-                            )
-                            single_component.normalize(archive, logger)
-                            components.append(single_component)
-                    self.initial_materials = components
-                    crystal_ref = create_archive(
-                        CPFSCrystal(
-                            name=str(inp.loc[39][2]) + '_' + str(inp.loc[40][2]),
-                            sample_id=str(inp.loc[39][2]),
-                            achieved_composition=str(inp.loc[40][2]),
-                            final_crystal_length=float(inp.loc[41][2]) / 1000,
-                            single_poly=str(inp.loc[42][2]),
-                            crystal_shape=str(inp.loc[43][2]),
-                            crystal_orientation=str(inp.loc[44][2]),
-                            safety_reactivity=str(inp.loc[45][2]),
-                            description=str(inp.loc[46][2]),
-                        ),
-                        archive,
-                        str(inp.loc[39][2])
-                        + '_'
-                        + str(inp.loc[40][2])
-                        + '_CPFSCrystal.archive.json',
-                    )
-                    self.resulting_crystal = crystal_ref
-                else:
-                    self.xlsx_file = 'Not a valid CPFSCzochalskiProcess template.'
-
 
 m_package.__init_metainfo__()
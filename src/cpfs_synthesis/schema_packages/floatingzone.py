@@ -16,7 +16,6 @@
 # limitations under the License.
 #
 
-from nomad.config import config
 from nomad.datamodel.data import (
     EntryData,
 )
@@ -26,7 +25,10 @@ from nomad.datamodel.metainfo.annotations import (
     SectionProperties,
 )
 from nomad.datamodel.metainfo.basesections import (
-    ActivityStep,
+    ProcessStep,
+)
+from nomad.datamodel.metainfo.plot import (
+    PlotSection,
 )
 from nomad.metainfo import (
     Package,
@@ -37,9 +39,6 @@ from nomad.metainfo import (
 from nomad_material_processing.crystal_growth import (
     CrystalGrowth,
 )
-from nomad_material_processing.utils import (
-    create_archive,
-)
 from structlog.stdlib import (
     BoundLogger,
 )
@@ -47,18 +46,18 @@ from structlog.stdlib import (
 from cpfs_synthesis.cpfs_schemes import (
     CPFSCrystal,
     CPFSFurnace,
+    CPFSGrowthSummary,
     CPFSInitialSynthesisComponent,
+    CPFSMeasuredLog,
+    CPFSProfileDeviation,
     CPFSRodInformation,
-)
-
-configuration = config.get_plugin_entry_point(
-    'cpfs_synthesis.schema_packages:schema_floatingzone_entry_point'
+    CPFSTemplateProcess,
 )
 
 m_package = Package(name='MPI CPFS FLOATING ZONE')
 
 
-class CPFSFloatingZoneProcessStep(ActivityStep, EntryData):
+class CPFSFloatingZoneProcessStep(ProcessStep, EntryData):
     """
     A step in the Floating Zone Process, for now same as CzochralskiProcessStep.
     """
@@ -94,6 +93,13 @@ class CPFSFloatingZoneProcessStep(ActivityStep, EntryData):
         ),
     )
 
+    measured_log = Quantity(
+        type=CPFSMeasuredLog,
+        description="""
+        The controller log of the process, which covers this step.
+        """,
+    )
+
     def normalize(self, archive, logger: BoundLogger) -> None:
         """
         The normalizer for the `FloatingZoneProcessStep` class.
@@ -106,11 +112,18 @@ class CPFSFloatingZoneProcessStep(ActivityStep, EntryData):
         super().normalize(archive, logger)
 
 
-class CPFSFloatingZoneProcess(CrystalGrowth, EntryData):
+class CPFSFloatingZoneProcess(
+    CPFSTemplateProcess, CrystalGrowth, PlotSection, EntryData
+):
     """
     Application definition section for a Floating Zone Process at MPI CPFS.
     """
 
+    LAYOUT = 'CPFSFloatingZone'
+    ENTRY_POINT = 'schema_floatingzone_entry_point'
+    STEP = CPFSFloatingZoneProcessStep
+    INSTRUMENTS = ('furnace',)
+
     m_def = Section(
         links=[''],
         a_eln=ELNAnnotation(
@@ -131,6 +144,15 @@ class CPFSFloatingZoneProcess(CrystalGrowth, EntryData):
     furnace = SubSection(
         section_def=CPFSFurnace,
     )
+    furnace_entry = Quantity(
+        type=CPFSFurnace,
+        description="""
+        The shared entry of the furnace, used instead of `furnace`.
+        """,
+        a_eln=ELNAnnotation(
+            component='ReferenceEditQuantity',
+        ),
+    )
     rod_information = SubSection(
         section_def=CPFSRodInformation,
     )
@@ -142,6 +164,15 @@ class CPFSFloatingZoneProcess(CrystalGrowth, EntryData):
         section_def=CPFSFloatingZoneProcessStep,
         repeats=True,
     )
+    controller_log = SubSection(
+        section_def=CPFSMeasuredLog,
+    )
+    deviation = SubSection(
+        section_def=CPFSProfileDeviation,
+    )
+    summary = SubSection(
+        section_def=CPFSGrowthSummary,
+    )
     resulting_crystal = Quantity(
         type=CPFSCrystal,
         a_eln=ELNAnnotation(
@@ -156,6 +187,27 @@ class CPFSFloatingZoneProcess(CrystalGrowth, EntryData):
         a_browser=BrowserAnnotation(adaptor='RawFileAdaptor'),
         a_eln=ELNAnnotation(component='FileEditQuantity'),
     )
+    sheet_name = Quantity(
+        type=str,
+        description="""
+        The workbook sheet of `xlsx_file` that holds this run. If empty, every sheet
+        of the workbook is read and each further run is created as its own entry.
+        """,
+    )
+    template_checksum = Quantity(
+        type=str,
+        description="""
+        The checksum of the template content and layout version of the last
+        normalization. The template is only read again if it changes.
+        """,
+    )
+    figure_checksum = Quantity(
+        type=str,
+        description="""
+        The hash of the content of the figures set in the last normalization. The
+        figures are only built again if it changes.
+        """,
+    )
     lab_id = Quantity(
         type=str,
         description="""An ID string that is unique at least for the lab that produced
@@ -166,76 +218,5 @@ class CPFSFloatingZoneProcess(CrystalGrowth, EntryData):
         description='Any information that cannot be captured in the other fields.',
     )
 
-    def normalize(self, archive, logger: BoundLogger) -> None:
-        """
-        The normalizer for the `FloatingZoneProcess` class.
-
-        Args:
-            archive (EntryArchive): The archive containing the section that is being
-            normalized.
-            logger (BoundLogger): A structlog logger.
-        """
-        super().normalize(archive, logger)
-        self.location = 'MPI CPfS Dresden'
-        if self.xlsx_file:
-            import pandas as pd
-
-            with archive.m_context.raw_file(self.xlsx_file, 'r') as xlsx:
-                inp = pd.read_csv(xlsx)
-                if inp.loc[2][1].split()[1] == 'CPFSFloatingZone':
-                    self.name = str(inp.loc[10][2])
-                    self.furnace = CPFSFurnace(name=str(inp.loc[13][2]))
-                    self.furnace.normalize(archive, logger)
-                    self.rod_information = CPFSRodInformation(
-                        rod_preparation=str(inp.loc[16][2]),
-                        seed_rod_diameter=float(inp.loc[17][2]) / 1000,
-                        feed_rod_diameter=float(inp.loc[18][2]) / 1000,
-                        feed_rod_crystal_direction=str(inp.loc[19][2]),
-                    )
-                    step = []
-                    step.append(
-                        CPFSFloatingZoneProcessStep(
-                            melting_power_in_percent=float(inp.loc[31][2]),
-                            growth_power_in_percent=float(inp.loc[32][2]),
-                            rotation_speed=float(inp.loc[33][2]),
-                            rotation_direction=str(inp.loc[34][2]),
-                            pulling_rate=float(inp.loc[35][2]) / 1000 / 60,
-                        )
-                    )
-                    self.steps = step
-                    components = []
-                    for i in range(5):
-                        if not pd.isna(inp.loc[24 + i][1]):
-                            single_component = CPFSInitialSynthesisComponent(
-                                name=str(inp.loc[24 + i][1]),
-                                state=str(inp.loc[24 + i][2]),
-                                weight=float(inp.loc[24 + i][3]),
-                                providing_company=str(inp.loc[24 + i][4]),
-                            )
-                            single_component.normalize(archive, logger)
-                            components.append(single_component)
-                    self.initial_materials = components
-                    crystal_ref = create_archive(
-                        CPFSCrystal(
-                            name=str(inp.loc[38][2]) + '_' + str(inp.loc[39][2]),
-                            sample_id=str(inp.loc[38][2]),
-                            achieved_composition=str(inp.loc[39][2]),
-                            final_crystal_length=float(inp.loc[40][2]) / 1000,
-                            single_poly=str(inp.loc[41][2]),
-                            crystal_shape=str(inp.loc[42][2]),
-                            crystal_orientation=str(inp.loc[43][2]),
-                            safety_reactivity=str(inp.loc[44][2]),
-                            description=str(inp.loc[45][2]),
-                        ),
-                        archive,
-                        str(inp.loc[38][2])
-                        + '_'
-                        + str(inp.loc[39][2])
-                        + '_CPFSCrystal.archive.json',
-                    )
-                    self.resulting_crystal = crystal_ref
-                else:
-                    self.xlsx_file = 'Not a valid CPFSFloatingZoneProcess template.'
-
 
 m_package.__init_metainfo__()
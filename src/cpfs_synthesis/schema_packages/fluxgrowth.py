@@ -16,8 +16,11 @@
 # limitations under the License.
 #
 
-from nomad.config import config
+import dataclasses
+from typing import TYPE_CHECKING
+
 from nomad.datamodel.data import (
+    ArchiveSection,
     EntryData,
 )
 from nomad.datamodel.metainfo.annotations import (
@@ -26,9 +29,13 @@ from nomad.datamodel.metainfo.annotations import (
     SectionProperties,
 )
 from nomad.datamodel.metainfo.basesections import (
-    ActivityStep,
+    ProcessStep,
+)
+from nomad.datamodel.metainfo.plot import (
+    PlotSection,
 )
 from nomad.metainfo import (
+    MEnum,
     Package,
     Quantity,
     Section,
@@ -37,9 +44,6 @@ from nomad.metainfo import (
 from nomad_material_processing.crystal_growth import (
     CrystalGrowth,
 )
-from nomad_material_processing.utils import (
-    create_archive,
-)
 from structlog.stdlib import (
     BoundLogger,
 )
@@ -49,17 +53,84 @@ from cpfs_synthesis.cpfs_schemes import (
     CPFSCrystal,
     CPFSCrystalGrowthTube,
     CPFSFurnace,
+    CPFSGrowthSummary,
     CPFSInitialSynthesisComponent,
+    CPFSMeasuredLog,
+    CPFSProfileDeviation,
+    CPFSTemplateProcess,
 )
 
-configuration = config.get_plugin_entry_point(
-    'cpfs_synthesis.schema_packages:schema_fluxgrowth_entry_point'
-)
+if TYPE_CHECKING:
+    from cpfs_synthesis.templates import (
+        TemplateData,
+    )
 
 m_package = Package(name='MPI CPFS FLUX GROWTH ZONE')
 
 
-class CPFSFluxGrowthProcessStep(ActivityStep, EntryData):
+class CPFSThermalSegment(ArchiveSection):
+    """
+    A linear segment of a temperature profile between two set points.
+    """
+
+    kind = Quantity(
+        type=MEnum('heating', 'dwell', 'cooling'),
+    )
+    start_time = Quantity(
+        type=float,
+        unit='second',
+        description='The process time at the start of the segment.',
+        a_eln=ELNAnnotation(defaultDisplayUnit='hour'),
+    )
+    duration = Quantity(
+        type=float,
+        unit='second',
+        a_eln=ELNAnnotation(defaultDisplayUnit='hour'),
+    )
+    start_temperature = Quantity(
+        type=float,
+        unit='kelvin',
+        a_eln=ELNAnnotation(defaultDisplayUnit='celsius'),
+    )
+    end_temperature = Quantity(
+        type=float,
+        unit='kelvin',
+        a_eln=ELNAnnotation(defaultDisplayUnit='celsius'),
+    )
+    rate = Quantity(
+        type=float,
+        unit='kelvin/second',
+        description='The heating rate, negative when cooling.',
+        a_eln=ELNAnnotation(defaultDisplayUnit='kelvin/hour'),
+    )
+    max_overshoot = Quantity(
+        type=float,
+        unit='kelvin',
+        description="""
+        The largest excess of the measured over the programmed temperature in the
+        segment, from the controller log.
+        """,
+    )
+    rms_error = Quantity(
+        type=float,
+        unit='kelvin',
+        description="""
+        The root mean square difference of the measured and the programmed
+        temperature in the segment.
+        """,
+    )
+    time_out_of_tolerance = Quantity(
+        type=float,
+        unit='second',
+        description="""
+        The time in the segment the measured temperature was further from the
+        programmed one than the deviation tolerance.
+        """,
+        a_eln=ELNAnnotation(defaultDisplayUnit='minute'),
+    )
+
+
+class CPFSFluxGrowthProcessStep(ProcessStep, EntryData):
     """
     A step in the Flux Growth Process.
     """
@@ -82,10 +153,60 @@ class CPFSFluxGrowthProcessStep(ActivityStep, EntryData):
             defaultDisplayUnit='celsius',
         ),
     )
+    max_temperature = Quantity(
+        type=float,
+        unit='kelvin',
+        description='The highest temperature of the profile.',
+        a_eln=ELNAnnotation(defaultDisplayUnit='celsius'),
+    )
+    total_duration = Quantity(
+        type=float,
+        unit='second',
+        description='The time from the first to the last point of the profile.',
+        a_eln=ELNAnnotation(defaultDisplayUnit='hour'),
+    )
+    thermal_budget = Quantity(
+        type=float,
+        unit='kelvin*second',
+        description='The integral of the temperature over the process time.',
+        a_eln=ELNAnnotation(defaultDisplayUnit='kelvin*hour'),
+    )
+    soak_duration = Quantity(
+        type=float,
+        unit='second',
+        description='The time spent dwelling at the highest temperature.',
+        a_eln=ELNAnnotation(defaultDisplayUnit='hour'),
+    )
+    dwell_duration = Quantity(
+        type=float,
+        unit='second',
+        description='The time spent in all dwells of the profile.',
+        a_eln=ELNAnnotation(defaultDisplayUnit='hour'),
+    )
+    growth_cooling_rate = Quantity(
+        type=float,
+        unit='kelvin/second',
+        description="""
+        The cooling rate of the longest cooling segment, where the crystal grows.
+        """,
+        a_eln=ELNAnnotation(defaultDisplayUnit='kelvin/hour'),
+    )
+    segments = SubSection(
+        section_def=CPFSThermalSegment,
+        repeats=True,
+    )
+
+    measured_log = Quantity(
+        type=CPFSMeasuredLog,
+        description="""
+        The controller log of the process, which covers this step.
+        """,
+    )
 
     def normalize(self, archive, logger: BoundLogger) -> None:
         """
-        The normalizer for the `FluxGrowthProcessStep` class.
+        The normalizer for the `FluxGrowthProcessStep` class. Derives the profile
+        analytics and segments from `process_time` and `temperature`.
 
         Args:
             archive (EntryArchive): The archive containing the section that is being
@@ -93,13 +214,57 @@ class CPFSFluxGrowthProcessStep(ActivityStep, EntryData):
             logger (BoundLogger): A structlog logger.
         """
         super().normalize(archive, logger)
+        if self.process_time is None or self.temperature is None:
+            return
+        if len(self.process_time) != len(self.temperature):
+            logger.warning('profile times and temperatures differ in length')
+            return
+        from cpfs_synthesis.schema_packages import (
+            get_configuration,
+        )
+        from cpfs_synthesis.thermal import (
+            analyze_profile,
+        )
+
+        configuration = get_configuration(
+            'cpfs_synthesis.schema_packages:schema_fluxgrowth_entry_point'
+        )
+        profile = analyze_profile(
+            self.process_time.to('second').magnitude,
+            self.temperature.to('kelvin').magnitude,
+            getattr(configuration, 'dwell_tolerance', 1.0) / 3600,
+        )
+        self.max_temperature = profile.max_temperature
+        self.total_duration = profile.total_duration
+        self.thermal_budget = profile.thermal_budget
+        self.soak_duration = profile.soak_duration
+        self.dwell_duration = profile.dwell_duration
+        self.growth_cooling_rate = profile.growth_cooling_rate
+        if self.duration is None:
+            self.duration = profile.total_duration
+        if profile.segments is None:
+            self.segments = []
+            return
+        columns = {
+            field.name: getattr(profile.segments, field.name).tolist()
+            for field in dataclasses.fields(profile.segments)
+        }
+        self.segments = [
+            CPFSThermalSegment(**dict(zip(columns, values)))
+            for values in zip(*columns.values())
+        ]
 
 
-class CPFSFluxGrowthProcess(CrystalGrowth, EntryData):
+class CPFSFluxGrowthProcess(CPFSTemplateProcess, CrystalGrowth, PlotSection, EntryData):
     """
     Application definition section for a FluxGrowthProcess at MPI CPFS.
     """
 
+    LAYOUT = 'CPFSFluxGrowth'
+    ENTRY_POINT = 'schema_fluxgrowth_entry_point'
+    STEP = CPFSFluxGrowthProcessStep
+    INSTRUMENTS = ('furnace', 'crucible', 'tube')
+
     m_def = Section(
         links=[''],
         a_eln=ELNAnnotation(
@@ -120,12 +285,39 @@ class CPFSFluxGrowthProcess(CrystalGrowth, EntryData):
     furnace = SubSection(
         section_def=CPFSFurnace,
     )
+    furnace_entry = Quantity(
+        type=CPFSFurnace,
+        description="""
+        The shared entry of the furnace, used instead of `furnace`.
+        """,
+        a_eln=ELNAnnotation(
+            component='ReferenceEditQuantity',
+        ),
+    )
     crucible = SubSection(
         section_def=CPFSCrucible,
     )
+    crucible_entry = Quantity(
+        type=CPFSCrucible,
+        description="""
+        The shared entry of the crucible, used instead of `crucible`.
+        """,
+        a_eln=ELNAnnotation(
+            component='ReferenceEditQuantity',
+        ),
+    )
     tube = SubSection(
         section_def=CPFSCrystalGrowthTube,
     )
+    tube_entry = Quantity(
+        type=CPFSCrystalGrowthTube,
+        description="""
+        The shared entry of the growth tube, used instead of `tube`.
+        """,
+        a_eln=ELNAnnotation(
+            component='ReferenceEditQuantity',
+        ),
+    )
     initial_materials = SubSection(
         section_def=CPFSInitialSynthesisComponent,
         repeats=True,
@@ -134,6 +326,15 @@ class CPFSFluxGrowthProcess(CrystalGrowth, EntryData):
         section_def=CPFSFluxGrowthProcessStep,
         repeats=True,
     )
+    controller_log = SubSection(
+        section_def=CPFSMeasuredLog,
+    )
+    deviation = SubSection(
+        section_def=CPFSProfileDeviation,
+    )
+    summary = SubSection(
+        section_def=CPFSGrowthSummary,
+    )
     resulting_crystal = Quantity(
         type=CPFSCrystal,
         a_eln=ELNAnnotation(
@@ -148,6 +349,27 @@ class CPFSFluxGrowthProcess(CrystalGrowth, EntryData):
         a_browser=BrowserAnnotation(adaptor='RawFileAdaptor'),
         a_eln=ELNAnnotation(component='FileEditQuantity'),
     )
+    sheet_name = Quantity(
+        type=str,
+        description="""
+        The workbook sheet of `xlsx_file` that holds this run. If empty, every sheet
+        of the workbook is read and each further run is created as its own entry.
+        """,
+    )
+    template_checksum = Quantity(
+        type=str,
+        description="""
+        The checksum of the template content and layout version of the last
+        normalization. The template is only read again if it changes.
+        """,
+    )
+    figure_checksum = Quantity(
+        type=str,
+        description="""
+        The hash of the content of the figures set in the last normalization. The
+        figures are only built again if it changes.
+        """,
+    )
     lab_id = Quantity(
         type=str,
         description="""An ID string that is unique at least for the lab that produced
@@ -158,75 +380,29 @@ class CPFSFluxGrowthProcess(CrystalGrowth, EntryData):
         description='Any information that cannot be captured in the other fields.',
     )
 
-    def normalize(self, archive, logger: BoundLogger) -> None:
+    def steps_from_template(
+        self, template: 'TemplateData', archive, logger: BoundLogger
+    ) -> list[CPFSFluxGrowthProcessStep]:
         """
-        The normalizer for the `FluxGrowthProcess` class.
+        Returns the single step of one run of a template, which holds the
+        temperature profile.
 
         Args:
-            archive (EntryArchive): The archive containing the section that is being
-            normalized.
+            template (TemplateData): The values read from the template.
+            archive (EntryArchive): The archive containing the section.
             logger (BoundLogger): A structlog logger.
+
+        Returns:
+            list[CPFSFluxGrowthProcessStep]: The step of the run.
         """
-        super().normalize(archive, logger)
-        self.location = 'MPI CPfS Dresden'
-        if self.xlsx_file:
-            import pandas as pd
-
-            with archive.m_context.raw_file(self.xlsx_file, 'r') as xlsx:
-                inp = pd.read_csv(xlsx)
-                if inp.loc[2][1].split()[1] == 'CPFSFluxGrowth':
-                    self.name = str(inp.loc[10][2])
-                    self.furnace = CPFSFurnace(name=str(inp.loc[13][2]))
-                    self.crucible = CPFSCrucible(name=str(inp.loc[14][2]))
-                    self.tube = CPFSCrystalGrowthTube(name=str(inp.loc[15][2]))
-                    self.furnace.normalize(archive, logger)
-                    time_tmp = []
-                    temp_tmp = []
-                    for i in range(20):
-                        if not pd.isna(inp.loc[29 + i])[1]:
-                            time_tmp.append(float(inp.loc[29 + i][1]) * 60 * 60)
-                            temp_tmp.append(float(inp.loc[29 + i][2]) + 273.15)
-                    step = []
-                    step.append(
-                        CPFSFluxGrowthProcessStep(
-                            process_time=time_tmp,
-                            temperature=temp_tmp,
-                        )
-                    )
-                    self.steps = step
-                    components = []
-                    for i in range(5):
-                        if not pd.isna(inp.loc[20 + i][1]):
-                            single_component = CPFSInitialSynthesisComponent(
-                                name=str(inp.loc[20 + i][1]),
-                                state=str(inp.loc[20 + i][2]),
-                                weight=float(inp.loc[20 + i][3]),
-                                providing_company=str(inp.loc[20 + i][4]),
-                            )
-                            single_component.normalize(archive, logger)
-                            components.append(single_component)
-                    self.initial_materials = components
-                    crystal_ref = create_archive(
-                        CPFSCrystal(
-                            name=str(inp.loc[51][2]) + '_' + str(inp.loc[52][2]),
-                            sample_id=str(inp.loc[51][2]),
-                            achieved_composition=str(inp.loc[52][2]),
-                            final_crystal_length=float(inp.loc[53][2]) / 1000,
-                            single_poly=str(inp.loc[54][2]),
-                            crystal_shape=str(inp.loc[55][2]),
-                            crystal_orientation=str(inp.loc[56][2]),
-                            safety_reactivity=str(inp.loc[57][2]),
-                            description=str(inp.loc[58][2]),
-                        ),
-                        archive,
-                        str(inp.loc[51][2])
-                        + '_'
-                        + str(inp.loc[52][2])
-                        + '_CPFSCrystal.archive.json',
-                    )
-                    self.resulting_crystal = crystal_ref
-                else:
-                    self.xlsx_file = 'Not a valid CPFSFluxGrowthProcess template.'
+        profile = template.series['profile']
+        step = CPFSFluxGrowthProcessStep(
+            process_time=profile['process_time'],
+            temperature=profile['temperature'],
+        )
+        # created after the sub sections were normalized, so derive the analytics now
+        step.normalize(archive, logger)
+        return [step]
 
 
 m_package.__init_metainfo__()
@@ -0,0 +1,145 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an 'AS IS' BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+Timing spans of the phases of a normalization.
+
+A normalizer decorated with `timed` collects the time, the number of calls and
+the bytes of every phase that runs within it, such as reading the template or
+creating archives, and logs them as one `SPANS_EVENT` with its logger. The phases
+are marked with `span`, which does nothing outside a timed normalizer, so helpers
+can be marked without passing a recorder around.
+"""
+
+import functools
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+SPANS_EVENT = 'normalizer spans'
+
+
+@dataclass
+class Phase:
+    """The time, calls and bytes of one phase of a normalization."""
+
+    calls: int = 0
+    nanoseconds: int = 0
+    bytes: int = 0
+
+
+class Span:
+    """
+    Times one run of a phase. Add the bytes the phase read or wrote to `bytes`.
+    """
+
+    __slots__ = ('_phases', '_start', 'bytes', 'phase')
+
+    def __init__(self, phases: dict[str, Phase], phase: str):
+        self._phases = phases
+        self.phase = phase
+        self.bytes = 0
+
+    def __enter__(self) -> 'Span':
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        phase = self._phases.get(self.phase)
+        if phase is None:
+            phase = self._phases[self.phase] = Phase()
+        phase.calls += 1
+        phase.nanoseconds += time.perf_counter_ns() - self._start
+        phase.bytes += self.bytes
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    # ignored outside of a timed normalizer
+    bytes = property(lambda self: 0, lambda self, value: None)
+
+    def __enter__(self) -> '_NoSpan':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+
+_NO_SPAN = _NoSpan()
+_phases: ContextVar[dict[str, Phase] | None] = ContextVar(
+    'cpfs_synthesis_spans', default=None
+)
+
+
+def span(phase: str) -> Span | _NoSpan:
+    """
+    Returns a context manager timing a phase of the current timed normalizer.
+
+    Args:
+        phase (str): The name of the phase, e.g. `parse template`.
+
+    Returns:
+        Span: The span, whose `bytes` the phase adds the bytes it handled to.
+    """
+    phases = _phases.get()
+    if phases is None:
+        return _NO_SPAN
+    return Span(phases, phase)
+
+
+def log_spans(logger, section: str, nanoseconds: int, phases: dict[str, Phase]):
+    """Logs the duration of a normalization and of its phases in milliseconds."""
+    logger.info(
+        SPANS_EVENT,
+        section=section,
+        duration_ms=round(nanoseconds / 1e6, 3),
+        spans={
+            name: {
+                'calls': phase.calls,
+                'duration_ms': round(phase.nanoseconds / 1e6, 3),
+                'bytes': phase.bytes,
+            }
+            for name, phase in phases.items()
+        },
+    )
+
+
+def timed(normalize):
+    """
+    Decorates the `normalize` method of a section to log the spans of its phases,
+    unless `timing_spans` is turned off on the schema entry points. A normalizer
+    that runs within another timed one adds its phases to the outer one.
+    """
+
+    @functools.wraps(normalize)
+    def wrapper(self, archive, logger) -> None:
+        from cpfs_synthesis.schema_packages import timing_spans_enabled
+
+        if logger is None or _phases.get() is not None or not timing_spans_enabled():
+            return normalize(self, archive, logger)
+        phases = {}
+        token = _phases.set(phases)
+        start = time.perf_counter_ns()
+        try:
+            return normalize(self, archive, logger)
+        finally:
+            nanoseconds = time.perf_counter_ns() - start
+            _phases.reset(token)
+            log_spans(logger, self.m_def.name, nanoseconds, phases)
+
+    return wrapper
@@ -0,0 +1,136 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an 'AS IS' BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+Growth statistics of an upload, built from the contributions of its runs.
+
+Every run read from a template contributes its technique, furnace, crucible,
+whether it gave a single crystal and the crystal length. A run writes its
+contribution to its own record when it is normalized, replacing the previous one,
+so no other run is ever read or rewritten. The totals of an upload hold the sums
+of these contributions per technique, furnace and crucible. They are summed once,
+when the statistics entry of the upload is parsed after all runs are processed.
+
+Deleting a run does not remove its record, delete the record in `.cpfs_runs` and
+reprocess the upload to count the remaining runs only.
+"""
+
+# the mainfile of the statistics entry, parsed after the runs of the upload
+STATISTICS_FILE = 'cpfs_upload_statistics.cpfs'
+STATISTICS_RECORDS = 'statistics'
+
+
+def run_contribution(template) -> dict:
+    """
+    Returns the contribution of a run to the statistics of its upload.
+
+    Args:
+        template (TemplateData): The values read from the template of the run.
+
+    Returns:
+        dict: The technique, furnace and crucible names, if the run gave a single
+            crystal and the crystal length in meters.
+    """
+    instruments = template.groups.get('instruments', {})
+    crystal = template.groups.get('crystal', {})
+    single_poly = crystal.get('single_poly') or ''
+    return {
+        'technique': template.technique,
+        'furnace': instruments.get('furnace'),
+        'crucible': instruments.get('crucible'),
+        'single_crystal': single_poly.strip().lower().startswith('single'),
+        'crystal_length': crystal.get('final_crystal_length'),
+    }
+
+
+def empty_totals() -> dict:
+    """Returns the totals of an upload without runs."""
+    return {'runs': 0, 'techniques': {}, 'furnaces': {}, 'crucibles': {}}
+
+
+def _count(counts: dict, name: str, sign: int, **values) -> None:
+    # the first value counts the runs, the entry goes once they are all removed
+    entry = counts.setdefault(name, dict.fromkeys(values, 0))
+    for key, value in values.items():
+        entry[key] += sign * value
+    if entry[next(iter(values))] == 0:
+        del counts[name]
+
+
+def apply_contribution(totals: dict, contribution: dict, sign: int) -> None:
+    """
+    Adds a contribution to the totals of an upload, or removes it if `sign` is -1.
+    """
+    totals['runs'] += sign
+    _count(
+        totals['techniques'],
+        contribution['technique'],
+        sign,
+        runs=1,
+        single_crystals=int(contribution['single_crystal']),
+    )
+    if contribution['furnace']:
+        _count(totals['furnaces'], contribution['furnace'], sign, runs=1)
+    length = contribution['crystal_length']
+    if contribution['crucible'] and length is not None:
+        _count(
+            totals['crucibles'],
+            contribution['crucible'],
+            sign,
+            crystals=1,
+            total_crystal_length=length,
+        )
+
+
+def update_totals(
+    totals: dict | None, contributions: dict | None, runs: dict[str, dict]
+) -> tuple[dict, dict]:
+    """
+    Returns the totals and contributions of an upload with the contributions of
+    `runs` added or replaced, without changing the given ones.
+
+    Args:
+        totals (dict | None): The current totals, `None` for a new upload.
+        contributions (dict | None): The contribution of each run by its entry.
+        runs (dict[str, dict]): The new contributions by entry.
+
+    Returns:
+        tuple[dict, dict]: The new totals and contributions.
+    """
+    totals = _copy(totals) if totals else empty_totals()
+    contributions = dict(contributions or {})
+    for run, contribution in runs.items():
+        previous = contributions.get(run)
+        if previous == contribution:
+            continue
+        if previous is not None:
+            apply_contribution(totals, previous, -1)
+        apply_contribution(totals, contribution, 1)
+        contributions[run] = contribution
+    return totals, contributions
+
+
+def _copy(totals: dict) -> dict:
+    # two levels of dicts below the kinds of totals
+    return {
+        key: (
+            {name: dict(entry) for name, entry in value.items()}
+            if isinstance(value, dict)
+            else value
+        )
+        for key, value in totals.items()
+    }
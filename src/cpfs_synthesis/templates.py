@@ -0,0 +1,835 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an 'AS IS' BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+Declarative cell maps for the CPFS growth-run templates.
+
+Every technique declares once where its values live in the template sheet. A
+layout is compiled into a row-indexed extraction plan, so reading a template is a
+single pass over its rows that stops after the last row the layout needs.
+
+Rows and columns are zero based and count like the original
+`pandas.read_csv(...).loc[row][column]` lookups, i.e. the first line of the sheet
+is the header and row 0 is the line below it.
+"""
+
+import hashlib
+import io
+import itertools
+import math
+import posixpath
+import re
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass, field
+from typing import BinaryIO
+
+import numpy as np
+
+from cpfs_synthesis.readers import is_xlsx, read_csv_rows, read_xlsx_sheets
+from cpfs_synthesis.spans import span
+
+
+def text(value: str) -> str:
+    return value
+
+
+def number(value: str | Sequence[str | None]) -> float | np.ndarray:
+    """
+    Converts a cell to `float`, or a whole column of cells to a float array at once.
+    Empty cells in a column become NaN.
+    """
+    if isinstance(value, str):
+        return float(value)
+    return np.asarray(value, dtype=float)
+
+
+def celsius_to_kelvin(value: str | Sequence[str | None]) -> float | np.ndarray:
+    return number(value) + 273.15
+
+
+def hours_to_seconds(value: str | Sequence[str | None]) -> float | np.ndarray:
+    return number(value) * 60 * 60
+
+
+def millimetre_to_metre(value: str | Sequence[str | None]) -> float | np.ndarray:
+    return number(value) / 1000
+
+
+def millimetre_per_minute_to_metre_per_second(
+    value: str | Sequence[str | None],
+) -> float | np.ndarray:
+    return number(value) / 1000 / 60
+
+
+@dataclass(frozen=True)
+class Cell:
+    """A single value at a fixed position of the sheet."""
+
+    row: int
+    column: int
+    convert: Callable[[str], object] = text
+
+
+@dataclass(frozen=True)
+class Column:
+    """A column of a `Table` or a `Series`."""
+
+    column: int
+    convert: Callable[[str], object] = text
+
+
+@dataclass(frozen=True)
+class Table:
+    """
+    A block of `rows` consecutive rows starting at `start`. Rows with an empty `key`
+    column are skipped.
+    """
+
+    start: int
+    rows: int
+    columns: dict[str, Column]
+    key: str
+
+
+@dataclass(frozen=True)
+class Series:
+    """
+    Columns read from `start` down to the first row whose `key` column is empty, is
+    not a number where the key is converted to one, or holds the `Label` of the
+    block below. The template reserves `rows` rows for the series. The cells below
+    it are found by that label, so a longer series may fill the spare rows or have
+    rows inserted for it.
+    """
+
+    start: int
+    rows: int
+    columns: dict[str, Column]
+    key: str
+
+
+@dataclass(frozen=True)
+class Label:
+    """A fixed text of the template, e.g. the caption of a block below a series."""
+
+    row: int
+    column: int
+    text: str
+
+
+@dataclass(frozen=True)
+class TemplateLayout:
+    """
+    The cell map of one template version.
+
+    Attributes:
+        technique: The technique marker, i.e. the second word of the `marker` cell.
+        version: The version of the layout, bump it whenever a cell moves.
+        groups: Named groups of cells, usually the keyword arguments of a section.
+        tables: Named tables, usually one section per non-empty row.
+        series: Named series of open-ended length, usually the array quantities of
+            a section.
+        labels: The labels by which the cells below a series are found, one
+            between each series and the cells below it.
+        marker: The cell holding the technique marker.
+    """
+
+    technique: str
+    version: int
+    groups: dict[str, dict[str, Cell]] = field(default_factory=dict)
+    tables: dict[str, Table] = field(default_factory=dict)
+    series: dict[str, Series] = field(default_factory=dict)
+    labels: tuple[Label, ...] = ()
+    marker: Cell = Cell(2, 1)
+
+
+@dataclass
+class TemplateData:
+    """The values extracted from one template sheet."""
+
+    technique: str | None = None
+    sheet: str | None = None
+    groups: dict[str, dict[str, object]] = field(default_factory=dict)
+    tables: dict[str, list[dict[str, object]]] = field(default_factory=dict)
+    series: dict[str, dict[str, Sequence]] = field(default_factory=dict)
+    errors: list[str] = field(default_factory=list)
+
+
+def cell_name(row: int, column: int) -> str:
+    """
+    Returns the spreadsheet name (e.g. `C12`) of a layout position. The header is
+    the first line of the sheet, so layout row 0 is spreadsheet row 2.
+    """
+    letters = ''
+    column += 1
+    while column:
+        column, rest = divmod(column - 1, 26)
+        letters = chr(ord('A') + rest) + letters
+    return f'{letters}{row + 2}'
+
+
+def technique_from_marker(value: str | None) -> str | None:
+    """
+    Returns the technique of a marker cell like `Template CPFSFluxGrowth`.
+    """
+    if not value:
+        return None
+    words = value.split()
+    if len(words) < 2:  # noqa: PLR2004
+        return None
+    return words[1]
+
+
+def _clean(value) -> str | None:
+    if value is None:
+        return None
+    if isinstance(value, float) and math.isnan(value):
+        # NaN, which is how pandas reports an empty cell
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+class CompiledLayout:
+    """
+    A `TemplateLayout` compiled into a plan of the form `row -> [(column, target)]`.
+    """
+
+    def __init__(self, layout: TemplateLayout):
+        self.layout = layout
+        self.plan: dict[int, list[tuple[int, tuple]]] = {}
+        self._add(layout.marker, ('marker',))
+        for group, cells in layout.groups.items():
+            for key, cell in cells.items():
+                self._add(cell, ('group', group, key))
+        for name, table in layout.tables.items():
+            for index in range(table.rows):
+                for key, column in table.columns.items():
+                    self._add(
+                        Cell(table.start + index, column.column, column.convert),
+                        ('table', name, index, key),
+                    )
+        self.series = {series.start: name for name, series in layout.series.items()}
+        # the label of the cells below each series
+        self.labels: dict[str, Label | None] = {}
+        for name, series in layout.series.items():
+            reserved = range(series.start, series.start + series.rows)
+            if any(row in reserved for row in self.plan):
+                raise ValueError(f'The rows of series {name} overlap other cells.')
+            below = [row for row in self.plan if row > series.start]
+            labels = [label for label in layout.labels if label.row > series.start]
+            label = min(labels, key=lambda label: label.row, default=None)
+            if below and (label is None or label.row > min(below)):
+                raise ValueError(f'The cells below series {name} have no label.')
+            self.labels[name] = label
+        self.last_row = max([*self.plan, *self.series])
+
+    def _add(self, cell: Cell, target: tuple) -> None:
+        self.plan.setdefault(cell.row, []).append(
+            (cell.column, target + (cell.convert,))
+        )
+
+    def extract(self, rows: Iterable[Sequence]) -> TemplateData:
+        """
+        Extracts all cells of the layout from the given rows in one pass. Reading
+        stops after the last row the layout refers to. If the label below a series
+        is missing, the cells below are read at their reserved rows, moved down by
+        the rows the series is longer.
+
+        Args:
+            rows (Iterable[Sequence]): The rows of the sheet below the header row.
+
+        Returns:
+            TemplateData: The converted values and the problems found on the way.
+        """
+        layout = self.layout
+        data = TemplateData(
+            groups={
+                group: dict.fromkeys(cells) for group, cells in layout.groups.items()
+            },
+        )
+        table_rows = {
+            name: [{} for _ in range(table.rows)]
+            for name, table in layout.tables.items()
+        }
+        # the rows below a series are shifted by `offset` to their layout position
+        offset = 0
+        series = None
+        # the label searched for below a series and the rows passed meanwhile
+        label = None
+        skipped: list[tuple[int, Sequence]] = []
+        for index, row in enumerate(rows):
+            if label is not None:
+                if not _has_label(row, label):
+                    skipped.append((index, row))
+                    continue
+                offset, label = index - label.row, None
+            position = index - offset
+            if series is None and position in self.series:
+                series = _SeriesReader(
+                    self.series[position], layout, index, self.labels
+                )
+            if series is not None:
+                if series.add(row, data):
+                    continue
+                label, offset = self._below_series(series, data, row, index, offset)
+                series = None
+                if label is not None:
+                    skipped.append((index, row))
+                    continue
+                position = index - offset
+            if self._read_cells(data, table_rows, row, index, position):
+                break
+        if series is not None:
+            series.finish(data)
+        if label is not None:
+            data.errors.append(
+                f'No {label.text!r} label below the series, the cells below it are '
+                'read at their reserved rows.'
+            )
+            self._read_rows(data, table_rows, skipped, offset)
+        for name, table in layout.tables.items():
+            data.tables[name] = [
+                row for row in table_rows[name] if row.get(table.key) is not None
+            ]
+        for name, spec in layout.series.items():
+            data.series.setdefault(
+                name,
+                {key: column.convert([]) for key, column in spec.columns.items()},
+            )
+        return data
+
+    def _read_rows(
+        self,
+        data: TemplateData,
+        table_rows: dict[str, list[dict]],
+        rows: list[tuple[int, Sequence]],
+        offset: int,
+    ) -> None:
+        """Reads the cells of the given rows by index, shifted by `offset`."""
+        for index, row in rows:
+            if self._read_cells(data, table_rows, row, index, index - offset):
+                break
+
+    def _below_series(
+        self,
+        series: '_SeriesReader',
+        data: TemplateData,
+        row: Sequence,
+        index: int,
+        offset: int,
+    ) -> tuple['Label | None', int]:
+        """
+        Finishes `series` at the row `index` and returns the label still to be
+        searched for below it, and the offset of the rows below it, which
+        assumes rows were inserted for the series while the label is not found.
+        """
+        excess = series.finish(data)
+        label = self.labels[series.name]
+        if label is not None and _has_label(row, label):
+            return None, index - label.row
+        return label, offset + excess
+
+    def _read_cells(
+        self,
+        data: TemplateData,
+        table_rows: dict[str, list[dict]],
+        row: Sequence,
+        index: int,
+        position: int,
+    ) -> bool:
+        """
+        Reads the cells of the layout row `position`, returns if reading can stop.
+        """
+        for column, (*target, convert) in self.plan.get(position, ()):
+            raw = _clean(row[column]) if column < len(row) else None
+            value = None
+            if raw is not None:
+                try:
+                    value = convert(raw)
+                except ValueError:
+                    data.errors.append(
+                        f'Cell {cell_name(index, column)}: {raw!r} is not a number.'
+                    )
+            if target[0] == 'marker':
+                data.technique = technique_from_marker(raw)
+            elif target[0] == 'group':
+                data.groups[target[1]][target[2]] = value
+            else:
+                table_rows[target[1]][target[2]][target[3]] = value
+        if (
+            position == self.layout.marker.row
+            and data.technique != self.layout.technique
+        ):
+            # a sheet of another technique, it is left out
+            return True
+        return position >= self.last_row
+
+
+def _has_label(row: Sequence, label: Label) -> bool:
+    value = _clean(row[label.column]) if label.column < len(row) else None
+    return value is not None and value.casefold() == label.text.casefold()
+
+
+class _SeriesReader:
+    """Collects the raw cells of a `Series` and converts them column by column."""
+
+    def __init__(
+        self,
+        name: str,
+        layout: TemplateLayout,
+        index: int,
+        labels: dict[str, Label | None],
+    ):
+        self.name = name
+        self.series = layout.series[name]
+        self.index = index
+        self.label = labels[name]
+        self.key = self.series.columns[self.series.key]
+        self.raw: dict[str, list[str | None]] = {key: [] for key in self.series.columns}
+
+    def add(self, row: Sequence, data: TemplateData) -> bool:
+        """Adds `row` to the series, returns `False` if the series ended before."""
+        column = self.key.column
+        key = _clean(row[column]) if column < len(row) else None
+        if key is None or (self.label is not None and _has_label(row, self.label)):
+            return False
+        if self.key.convert is not text:
+            try:
+                self.key.convert(key)
+            except ValueError:
+                index = self.index + len(self.raw[self.series.key])
+                data.errors.append(
+                    f'Cell {cell_name(index, column)}: {key!r} is not a number, '
+                    f'the {self.name} ends above it.'
+                )
+                return False
+        for key, column in self.series.columns.items():
+            self.raw[key].append(
+                _clean(row[column.column]) if column.column < len(row) else None
+            )
+        return True
+
+    def finish(self, data: TemplateData) -> int:
+        """
+        Converts the columns into `data` and returns the number of rows the series
+        is longer than reserved.
+        """
+        columns = {}
+        for key, column in self.series.columns.items():
+            raw = self.raw[key]
+            try:
+                columns[key] = column.convert(raw)
+            except ValueError:
+                # find the offending cells, they are left empty
+                values = list(raw)
+                for index, value in enumerate(raw):
+                    try:
+                        if value is not None:
+                            column.convert(value)
+                    except ValueError:
+                        data.errors.append(
+                            f'Cell {cell_name(self.index + index, column.column)}: '
+                            f'{value!r} is not a number.'
+                        )
+                        values[index] = None
+                columns[key] = column.convert(values)
+        data.series[self.name] = columns
+        return max(0, len(self.raw[self.series.key]) - self.series.rows)
+
+
+_compiled_layouts: dict[tuple[str, int], CompiledLayout] = {}
+
+
+def compile_layout(layout: TemplateLayout) -> CompiledLayout:
+    """
+    Returns the compiled form of `layout`, compiled once per technique and version.
+    """
+    key = (layout.technique, layout.version)
+    compiled = _compiled_layouts.get(key)
+    if compiled is None:
+        compiled = _compiled_layouts[key] = CompiledLayout(layout)
+    return compiled
+
+
+def read_templates(
+    file: BinaryIO, layout: TemplateLayout, sheet: str | None = None
+) -> list[TemplateData]:
+    """
+    Reads all runs of `layout`'s technique from a CSV template or an xlsx workbook.
+    A CSV template holds a single run, a workbook one run per sheet. Sheets with
+    another technique marker are ignored.
+
+    Args:
+        file (BinaryIO): The template opened in binary mode.
+        layout (TemplateLayout): The layout of the expected technique.
+        sheet (str | None): Only read the workbook sheet with this name.
+
+    Returns:
+        list[TemplateData]: The runs found, empty if the file is not a template of
+        the expected technique.
+    """
+    compiled = compile_layout(layout)
+    if not file.seekable():
+        file = io.BytesIO(file.read())
+    if not is_xlsx(file):
+        templates = [compiled.extract(read_csv_rows(file))]
+    else:
+        templates = []
+        for name, rows in read_xlsx_sheets(file):
+            if sheet is None or name == sheet:
+                template = compiled.extract(rows)
+                template.sheet = name
+                templates.append(template)
+    return [
+        template for template in templates if template.technique == layout.technique
+    ]
+
+
+def read_techniques(file: BinaryIO, marker: Cell = Cell(2, 1)) -> list[str]:
+    """
+    Returns the techniques named by the `marker` cell of a CSV template or of the
+    sheets of an xlsx workbook, without reading past the marker row.
+
+    Args:
+        file (BinaryIO): The template opened in binary mode.
+        marker (Cell): The cell holding the technique marker.
+
+    Returns:
+        list[str]: The distinct techniques in the order of the sheets.
+    """
+    if not file.seekable():
+        file = io.BytesIO(file.read())
+    if is_xlsx(file):
+        sheets = [list(rows) for _, rows in read_xlsx_sheets(file, marker.row)]
+    else:
+        sheets = [list(itertools.islice(read_csv_rows(file), marker.row + 1))]
+    techniques = []
+    for rows in sheets:
+        row = rows[marker.row] if marker.row < len(rows) else []
+        value = _clean(row[marker.column]) if marker.column < len(row) else None
+        technique = technique_from_marker(value)
+        if technique and technique not in techniques:
+            techniques.append(technique)
+    return techniques
+
+
+def template_checksum(digest: str, layout: TemplateLayout, sheet: str | None) -> str:
+    """
+    Returns the checksum identifying what `layout` reads from `sheet` of a template
+    whose content has the SHA-256 hex `digest`.
+    """
+    return f'{layout.technique}-v{layout.version}-{digest}-{sheet or ""}'.rstrip('-')
+
+
+@dataclass
+class TemplateFile:
+    """
+    The result of `load_templates`.
+
+    Attributes:
+        digest: The SHA-256 hex digest of the template content.
+        checksum: The checksum of the content, layout version and sheet.
+        templates: The runs found in the template, `None` if the checksum did not
+            change and the template was not read.
+    """
+
+    digest: str
+    checksum: str
+    layout: TemplateLayout
+    templates: list[TemplateData] | None = None
+
+    def checksum_for(self, sheet: str | None) -> str:
+        """Returns the checksum of a single sheet of the same template."""
+        return template_checksum(self.digest, self.layout, sheet)
+
+
+def load_templates(  # noqa: PLR0913
+    archive,
+    path: str,
+    layout: TemplateLayout,
+    *,
+    sheet: str | None = None,
+    checksum: str | None = None,
+    cache=None,
+) -> TemplateFile:
+    """
+    Reads the runs of the template at `path` from the raw files of `archive`, see
+    `read_templates`. The template is not parsed again if its checksum equals the
+    given `checksum` or if it is found in the `cache`.
+
+    Args:
+        archive (EntryArchive): The archive whose context provides the raw file.
+        path (str): The path of the template within the upload.
+        layout (TemplateLayout): The layout of the expected technique.
+        sheet (str | None): Only read the workbook sheet with this name.
+        checksum (str | None): The checksum of the last normalization.
+        cache (TemplateCache | None): The cache for parsed templates.
+
+    Returns:
+        TemplateFile: The checksum and the runs found in the template.
+    """
+    with (
+        span('read template') as timing,
+        archive.m_context.raw_file(path, 'rb') as file,
+    ):
+        content = file.read()
+        timing.bytes = len(content)
+    digest = hashlib.sha256(content).hexdigest()
+    result = TemplateFile(digest, template_checksum(digest, layout, sheet), layout)
+    if result.checksum == checksum:
+        return result
+    if cache is not None:
+        result.templates = cache.get(result.checksum)
+    if result.templates is None:
+        with span('parse template') as timing:
+            timing.bytes = len(content)
+            result.templates = read_templates(io.BytesIO(content), layout, sheet)
+        if cache is not None:
+            cache.put(result.checksum, result.templates)
+    return result
+
+
+def series_records(columns: dict[str, Sequence]) -> list[dict[str, object]]:
+    """
+    Returns the rows of a series as dicts of their non-empty values, e.g. the
+    keyword arguments of one section per row. The columns are converted to Python
+    values as a whole, not cell by cell.
+
+    Args:
+        columns (dict[str, Sequence]): The columns of the series by name.
+
+    Returns:
+        list[dict[str, object]]: One dict per row, without empty or NaN cells.
+    """
+    names = list(columns)
+    values = [
+        column.tolist() if isinstance(column, np.ndarray) else list(column)
+        for column in columns.values()
+    ]
+    return [
+        {
+            name: value
+            for name, value in zip(names, row)
+            # NaN is the only value not equal to itself
+            if value is not None and value == value  # noqa: PLR0124
+        }
+        for row in zip(*values)
+    ]
+
+
+def sheet_archive_name(path: str, sheet: str) -> str:
+    """
+    Returns the file name of the entry created for the run on `sheet` of the
+    workbook at `path`.
+    """
+    stem = posixpath.splitext(path)[0]
+    sheet = re.sub(r'[^\w.-]+', '_', sheet)
+    return f'{stem}_{sheet}.archive.json'
+
+
+def _initial_materials(start: int) -> Table:
+    return Table(
+        start=start,
+        rows=5,
+        columns={
+            'name': Column(1),
+            'state': Column(2),
+            'weight': Column(3, number),
+            'providing_company': Column(4),
+        },
+        key='name',
+    )
+
+
+def _crystal(start: int) -> dict[str, Cell]:
+    return {
+        'sample_id': Cell(start, 2),
+        'achieved_composition': Cell(start + 1, 2),
+        'final_crystal_length': Cell(start + 2, 2, millimetre_to_metre),
+        'single_poly': Cell(start + 3, 2),
+        'crystal_shape': Cell(start + 4, 2),
+        'crystal_orientation': Cell(start + 5, 2),
+        'safety_reactivity': Cell(start + 6, 2),
+        'description': Cell(start + 7, 2),
+    }
+
+
+def _rod_information(start: int) -> dict[str, Cell]:
+    return {
+        'rod_preparation': Cell(start, 2),
+        'seed_rod_diameter': Cell(start + 1, 2, millimetre_to_metre),
+        'feed_rod_diameter': Cell(start + 2, 2, millimetre_to_metre),
+        'feed_rod_crystal_direction': Cell(start + 3, 2),
+    }
+
+
+def _step_table(start: int, **columns: Column) -> Series:
+    # one step per row, below a header row, with its name and duration first
+    return Series(
+        start=start,
+        rows=10,
+        columns={
+            'name': Column(1),
+            'duration': Column(2, hours_to_seconds),
+            **columns,
+        },
+        key='name',
+    )
+
+
+def _power_step_table(start: int) -> Series:
+    return _step_table(
+        start,
+        melting_power_in_percent=Column(3, number),
+        growth_power_in_percent=Column(4, number),
+        rotation_speed=Column(5, number),
+        rotation_direction=Column(6),
+        pulling_rate=Column(7, millimetre_per_minute_to_metre_per_second),
+    )
+
+
+def _power_step(start: int) -> dict[str, Cell]:
+    return {
+        'melting_power_in_percent': Cell(start, 2, number),
+        'growth_power_in_percent': Cell(start + 1, 2, number),
+        'rotation_speed': Cell(start + 2, 2, number),
+        'rotation_direction': Cell(start + 3, 2),
+        'pulling_rate': Cell(start + 4, 2, millimetre_per_minute_to_metre_per_second),
+    }
+
+
+FLUX_GROWTH_LAYOUT = TemplateLayout(
+    technique='CPFSFluxGrowth',
+    version=3,
+    groups={
+        'process': {'name': Cell(10, 2)},
+        'instruments': {
+            'furnace': Cell(13, 2),
+            'crucible': Cell(14, 2),
+            'tube': Cell(15, 2),
+        },
+        'crystal': _crystal(51),
+    },
+    tables={'initial_materials': _initial_materials(20)},
+    series={
+        'profile': Series(
+            start=29,
+            rows=20,
+            columns={
+                'process_time': Column(1, hours_to_seconds),
+                'temperature': Column(2, celsius_to_kelvin),
+            },
+            key='process_time',
+        ),
+    },
+    labels=(Label(51, 1, 'Sample ID'),),
+)
+
+BRIDGMAN_LAYOUT = TemplateLayout(
+    technique='CPFSBridgmanTechnique',
+    version=2,
+    groups={
+        'process': {'name': Cell(10, 2)},
+        'instruments': {
+            'furnace': Cell(13, 2),
+            'crucible': Cell(14, 2),
+            'tube': Cell(15, 2),
+        },
+        'step': {
+            'temperature': Cell(27, 2, celsius_to_kelvin),
+            'pulling_rate': Cell(28, 2, millimetre_per_minute_to_metre_per_second),
+        },
+        'crystal': _crystal(31),
+    },
+    tables={'initial_materials': _initial_materials(20)},
+    series={
+        'steps': _step_table(
+            41,
+            temperature=Column(3, celsius_to_kelvin),
+            pulling_rate=Column(4, millimetre_per_minute_to_metre_per_second),
+        ),
+    },
+)
+
+CVT_LAYOUT = TemplateLayout(
+    technique='CPFSChemicalVapourTransport',
+    version=2,
+    groups={
+        'process': {'name': Cell(10, 2)},
+        'instruments': {
+            'furnace': Cell(13, 2),
+            'tube': Cell(14, 2),
+        },
+        'step': {
+            'temperature_one': Cell(26, 2, celsius_to_kelvin),
+            'temperature_two': Cell(27, 2, celsius_to_kelvin),
+            'transport_agent': Cell(28, 2),
+        },
+        'crystal': _crystal(31),
+    },
+    tables={'initial_materials': _initial_materials(19)},
+    series={
+        'steps': _step_table(
+            41,
+            temperature_one=Column(3, celsius_to_kelvin),
+            temperature_two=Column(4, celsius_to_kelvin),
+            transport_agent=Column(5),
+        ),
+    },
+)
+
+CZOCHRALSKI_LAYOUT = TemplateLayout(
+    technique='CPFSCzochralskiProcess',
+    version=2,
+    groups={
+        'process': {'name': Cell(10, 2)},
+        'instruments': {
+            'furnace': Cell(13, 2),
+            'crucible': Cell(14, 2),
+        },
+        'rod_information': _rod_information(17),
+        'step': _power_step(32),
+        'crystal': _crystal(39),
+    },
+    tables={'initial_materials': _initial_materials(25)},
+    series={'steps': _power_step_table(49)},
+)
+
+FLOATING_ZONE_LAYOUT = TemplateLayout(
+    technique='CPFSFloatingZone',
+    version=2,
+    groups={
+        'process': {'name': Cell(10, 2)},
+        'instruments': {'furnace': Cell(13, 2)},
+        'rod_information': _rod_information(16),
+        'step': _power_step(31),
+        'crystal': _crystal(38),
+    },
+    tables={'initial_materials': _initial_materials(24)},
+    series={'steps': _power_step_table(48)},
+)
+
+LAYOUTS = {
+    layout.technique: layout
+    for layout in (
+        FLUX_GROWTH_LAYOUT,
+        BRIDGMAN_LAYOUT,
+        CVT_LAYOUT,
+        CZOCHRALSKI_LAYOUT,
+        FLOATING_ZONE_LAYOUT,
+    )
+}
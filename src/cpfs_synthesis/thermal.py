@@ -0,0 +1,250 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an 'AS IS' BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+Analytics of temperature profiles given as set points, i.e. the temperatures at
+cumulative process times with linear ramps in between, and of the deviation of
+measured temperatures from them. All values are in SI units, seconds and kelvin.
+"""
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+import numpy as np
+
+HEATING = 'heating'
+DWELL = 'dwell'
+COOLING = 'cooling'
+
+# 1 K/h, the resolution the templates are written in
+DEFAULT_DWELL_TOLERANCE = 1 / 3600
+DEFAULT_DEVIATION_TOLERANCE = 5.0
+
+
+@dataclass
+class ThermalSegments:
+    """The linear segments between consecutive set points, as parallel arrays."""
+
+    kind: np.ndarray
+    start_time: np.ndarray
+    duration: np.ndarray
+    start_temperature: np.ndarray
+    end_temperature: np.ndarray
+    rate: np.ndarray
+
+
+@dataclass
+class ThermalProfile:
+    """
+    The analytics of a temperature profile.
+
+    Attributes:
+        max_temperature: The highest set point.
+        total_duration: The time from the first to the last set point.
+        thermal_budget: The integral of the temperature over time.
+        soak_duration: The time spent dwelling at the highest set point.
+        dwell_duration: The time spent in all dwells.
+        growth_cooling_rate: The cooling rate, as a positive number, of the
+            longest cooling segment, which is where flux growth happens.
+        segments: The heating, dwell and cooling segments.
+    """
+
+    max_temperature: float | None = None
+    total_duration: float | None = None
+    thermal_budget: float | None = None
+    soak_duration: float | None = None
+    dwell_duration: float | None = None
+    growth_cooling_rate: float | None = None
+    segments: ThermalSegments | None = None
+
+
+def analyze_profile(
+    time: Sequence[float],
+    temperature: Sequence[float],
+    dwell_tolerance: float = DEFAULT_DWELL_TOLERANCE,
+) -> ThermalProfile:
+    """
+    Derives the analytics of a profile in a few array operations, independent of
+    the number of set points. Set points with a missing time or temperature are
+    ignored, as are segments whose time does not advance.
+
+    Args:
+        time (Sequence[float]): The cumulative process times in seconds.
+        temperature (Sequence[float]): The set points in kelvin.
+        dwell_tolerance (float): The rate in K/s up to which a segment counts as a
+            dwell.
+
+    Returns:
+        ThermalProfile: The analytics, empty if there is no valid set point.
+    """
+    time = np.asarray(time, dtype=float)
+    temperature = np.asarray(temperature, dtype=float)
+    valid = ~(np.isnan(time) | np.isnan(temperature))
+    time, temperature = time[valid], temperature[valid]
+    if not time.size:
+        return ThermalProfile()
+
+    duration = np.diff(time)
+    forward = duration > 0
+    start_time = time[:-1][forward]
+    start_temperature = temperature[:-1][forward]
+    end_temperature = temperature[1:][forward]
+    duration = duration[forward]
+    rate = (end_temperature - start_temperature) / duration
+    kind = np.where(
+        rate > dwell_tolerance,
+        HEATING,
+        np.where(rate < -dwell_tolerance, COOLING, DWELL),
+    )
+
+    max_temperature = temperature.max()
+    dwell = kind == DWELL
+    soak = dwell & np.isclose(
+        np.minimum(start_temperature, end_temperature),
+        max_temperature,
+        rtol=0,
+        atol=dwell_tolerance * duration,
+    )
+    cooling = np.flatnonzero(kind == COOLING)
+    growth_cooling_rate = None
+    if cooling.size:
+        growth_cooling_rate = float(-rate[cooling[np.argmax(duration[cooling])]])
+    return ThermalProfile(
+        max_temperature=float(max_temperature),
+        total_duration=float(time[-1] - time[0]),
+        thermal_budget=float(
+            np.sum((start_temperature + end_temperature) / 2 * duration)
+        ),
+        soak_duration=float(duration[soak].sum()),
+        dwell_duration=float(duration[dwell].sum()),
+        growth_cooling_rate=growth_cooling_rate,
+        segments=ThermalSegments(
+            kind=kind,
+            start_time=start_time,
+            duration=duration,
+            start_temperature=start_temperature,
+            end_temperature=end_temperature,
+            rate=rate,
+        ),
+    )
+
+
+@dataclass
+class ProfileDeviation:
+    """
+    The deviation of measured temperatures from the programmed ones, per segment.
+
+    Attributes:
+        samples: The number of compared samples.
+        max_overshoot: The largest excess of the measured over the programmed
+            temperature, zero if it never was above.
+        rms_error: The root mean square of the difference.
+        time_out_of_tolerance: The time the difference exceeded the tolerance.
+    """
+
+    samples: np.ndarray
+    max_overshoot: np.ndarray
+    rms_error: np.ndarray
+    time_out_of_tolerance: np.ndarray
+
+    def total(self) -> 'ProfileDeviation':
+        """Returns the deviation over all segments, as arrays of one value."""
+        samples = self.samples.sum()
+        squares = np.nansum(self.rms_error**2 * self.samples)
+        return ProfileDeviation(
+            samples=np.array([samples]),
+            max_overshoot=np.array(
+                [np.nanmax(self.max_overshoot) if samples else np.nan]
+            ),
+            rms_error=np.array([np.sqrt(squares / samples) if samples else np.nan]),
+            time_out_of_tolerance=np.array([self.time_out_of_tolerance.sum()]),
+        )
+
+
+class DeviationAccumulator:
+    """
+    Accumulates the deviation of a measured temperature from the programmed one
+    over the chunks of a log, with the samples sorted by time.
+
+    Args:
+        boundaries (Sequence[float]): The start times of the segments followed by
+            the end time of the last one, in seconds. Samples outside are ignored.
+        tolerance (float): The difference in kelvin beyond which a sample counts as
+            out of tolerance.
+    """
+
+    def __init__(self, boundaries: Sequence[float], tolerance: float):
+        self.boundaries = np.asarray(boundaries, dtype=float)
+        self.tolerance = tolerance
+        segments = max(len(self.boundaries) - 1, 0)
+        self._samples = np.zeros(segments, dtype=int)
+        self._squares = np.zeros(segments)
+        self._overshoot = np.full(segments, -np.inf)
+        self._out_of_tolerance = np.zeros(segments)
+        self._last_time: float | None = None
+
+    def add(self, time: np.ndarray, measured: np.ndarray, programmed: np.ndarray):
+        """
+        Adds a chunk of samples, the measured and the programmed temperature at the
+        same times.
+        """
+        if not len(time):
+            return
+        # each sample stands for the time since the previous one
+        previous = time[0] if self._last_time is None else self._last_time
+        interval = np.diff(time, prepend=previous)
+        self._last_time = time[-1]
+        error = measured - programmed
+        segment = np.searchsorted(self.boundaries, time, side='right') - 1
+        inside = (segment >= 0) & (segment < len(self._samples)) & ~np.isnan(error)
+        segment, error, interval = segment[inside], error[inside], interval[inside]
+        if not segment.size:
+            return
+        size = len(self._samples)
+        self._samples += np.bincount(segment, minlength=size)
+        self._squares += np.bincount(segment, error**2, minlength=size)
+        self._out_of_tolerance += np.bincount(
+            segment, interval * (np.abs(error) > self.tolerance), minlength=size
+        )
+        # the segments of sorted samples are contiguous runs
+        starts = np.flatnonzero(np.r_[True, segment[1:] != segment[:-1]])
+        runs = segment[starts]
+        self._overshoot[runs] = np.maximum(
+            self._overshoot[runs], np.maximum.reduceat(error, starts)
+        )
+
+    def result(self) -> ProfileDeviation:
+        """Returns the deviation per segment, NaN for segments without samples."""
+        compared = self._samples > 0
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rms_error = np.sqrt(self._squares / self._samples)
+        return ProfileDeviation(
+            samples=self._samples.copy(),
+            max_overshoot=np.where(compared, np.maximum(self._overshoot, 0), np.nan),
+            rms_error=np.where(compared, rms_error, np.nan),
+            time_out_of_tolerance=self._out_of_tolerance.copy(),
+        )
+
+
+def programmed_temperature(
+    time: Sequence[float], temperature: Sequence[float], at: np.ndarray
+) -> np.ndarray:
+    """
+    Returns the programmed temperature of a profile at the times `at`, linear
+    between set points and NaN outside the profile.
+    """
+    return np.interp(at, time, temperature, left=np.nan, right=np.nan)
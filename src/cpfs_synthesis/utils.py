@@ -0,0 +1,315 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an 'AS IS' BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+
+from cpfs_synthesis.spans import span
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# set to the time of normalization by `BaseSection.normalize`, not by the template
+VOLATILE_KEYS = frozenset({'datetime'})
+# the records of the runs of an upload that its summary entries are built from
+RUN_RECORDS = '.cpfs_runs'
+
+_locks_lock = threading.Lock()
+_upload_locks: dict[str, threading.Lock] = {}
+
+
+@contextmanager
+def upload_lock(upload: str):
+    """
+    Serializes writes to the raw files of one upload, between the threads of this
+    process and, where `fcntl` is available, the processes of this host.
+
+    Args:
+        upload (str): The upload id, or the directory of uploads without one.
+    """
+    with _locks_lock:
+        lock = _upload_locks.setdefault(upload, threading.Lock())
+    with lock:
+        if fcntl is None:
+            yield
+            return
+        # directories are no file names
+        digest = hashlib.sha256(upload.encode()).hexdigest()[:16]
+        path = os.path.join(tempfile.gettempdir(), f'cpfs_synthesis-{digest}.lock')
+        with open(path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def canonical_json(data) -> str:
+    """Serializes `data` with sorted keys and without insignificant whitespace."""
+    return json.dumps(data, sort_keys=True, separators=(',', ':'))
+
+
+def _stable(data):
+    if isinstance(data, dict):
+        return {
+            key: _stable(value)
+            for key, value in data.items()
+            if key not in VOLATILE_KEYS
+        }
+    if isinstance(data, list):
+        return [_stable(value) for value in data]
+    return data
+
+
+def _os_path(context, file_name: str) -> str | None:
+    local_dir = getattr(context, 'local_dir', None)
+    if local_dir:
+        return os.path.join(local_dir, file_name)
+    upload_files = getattr(context, 'upload_files', None)
+    if upload_files is None or not hasattr(upload_files, 'raw_file_object'):
+        return None
+    return upload_files.raw_file_object(file_name).os_path
+
+
+@contextmanager
+def raw_file_writer(context, file_name: str):
+    """
+    Yields the path of a temporary local file to write the raw file `file_name` to,
+    e.g. with `h5py`. Once the block completes, the temporary file replaces the
+    target in one step if the raw files are on a local file system, so readers never
+    see a partially written file. Otherwise it is copied into the upload.
+    """
+    path = _os_path(context, file_name)
+    directory = None
+    if path is not None:
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.', suffix='.tmp')
+    os.close(fd)
+    try:
+        yield tmp_path
+        if path is None:
+            with (
+                open(tmp_path, 'rb') as source,
+                context.raw_file(file_name, 'wb') as target,
+            ):
+                shutil.copyfileobj(source, target)
+        else:
+            os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def write_raw_file(context, file_name: str, content: str) -> None:
+    """
+    Writes `content` to the raw file `file_name`, atomically where the raw files
+    are on a local file system, see `raw_file_writer`.
+    """
+    with raw_file_writer(context, file_name) as path, open(path, 'w') as file:
+        file.write(content)
+
+
+def read_raw_json(context, file_name: str):
+    """Returns the parsed JSON raw file `file_name` or `None`."""
+    if not context.raw_path_exists(file_name):
+        return None
+    try:
+        with context.raw_file(file_name, 'rb') as file:
+            return json.load(file)
+    except ValueError:
+        return None
+
+
+def _creates_archives(context) -> bool:
+    from nomad.datamodel.context import ClientContext
+
+    return not isinstance(context, ClientContext) or getattr(
+        context, 'creates_archives', False
+    )
+
+
+def update_archive(archive, file_name: str, update) -> bool:
+    """
+    Updates the entry `file_name` in the upload of `archive` from its current
+    content. The file is read, updated and written while holding the lock of the
+    upload, so concurrent updates are not lost. It is only written, and its entry
+    only processed, if the canonical JSON of its `data` changes, leaving aside the
+    `VOLATILE_KEYS`. Other top level keys, e.g. added when the entry is saved in
+    the GUI, are not compared and kept.
+
+    Args:
+        archive (EntryArchive): The archive whose upload receives the entry.
+        file_name (str): The path of the `.archive.json` file within the upload.
+        update (Callable[[dict | None], dict]): Returns the new archive content
+            from the current one, `None` if the file does not exist yet.
+
+    Returns:
+        bool: If the entry was written, never for client contexts that do not
+        create archives.
+    """
+    context = archive.m_context
+    if not _creates_archives(context):
+        return False
+    upload = archive.metadata.upload_id
+    if upload is None:
+        upload = os.path.abspath(getattr(context, 'local_dir', None) or '.')
+    with span('create archive') as timing:
+        with upload_lock(upload):
+            existing = read_raw_json(context, file_name)
+            data = update(existing)
+            changed = existing is None or canonical_json(
+                _stable(existing.get('data'))
+            ) != canonical_json(_stable(data.get('data')))
+            if changed:
+                content = canonical_json({**(existing or {}), **data})
+                write_raw_file(context, file_name, content)
+                timing.bytes = len(content)
+        if changed:
+            # outside of the lock, processing may run right away and create archives
+            context.process_updated_raw_file(file_name, allow_modify=True)
+    return changed
+
+
+def run_record_name(kind: str, run: str) -> str:
+    """Returns the raw file of the `kind` record of the run entry `run`."""
+    return f'{RUN_RECORDS}/{kind}/{run}.json'
+
+
+def write_run_record(archive, kind: str, run: str, record) -> bool:
+    """
+    Writes the `kind` record of the run entry `run` to its own raw file in the
+    upload of `archive`, if it changed. A run never reads or writes the records of
+    other runs, so runs normalized at the same time do not wait for each other.
+
+    Args:
+        archive (EntryArchive): The archive of the normalized run.
+        kind (str): The kind of record, e.g. `statistics`.
+        run (str): The mainfile of the run entry.
+        record: The JSON serializable record of the run.
+
+    Returns:
+        bool: If the record was written, never for client contexts that do not
+        create archives.
+    """
+    context = archive.m_context
+    if not _creates_archives(context):
+        return False
+    file_name = run_record_name(kind, run)
+    content = canonical_json(record)
+    if canonical_json(read_raw_json(context, file_name)) == content:
+        return False
+    write_raw_file(context, file_name, content)
+    return True
+
+
+def read_run_records(directory: str, kind: str) -> dict[str, object]:
+    """
+    Returns the `kind` records of the runs of an upload by run entry, see
+    `write_run_record`.
+
+    Args:
+        directory (str): The directory with the raw files of the upload.
+        kind (str): The kind of record, e.g. `statistics`.
+    """
+    root = os.path.join(directory, RUN_RECORDS, kind)
+    records = {}
+    for path, _, files in os.walk(root):
+        for file_name in files:
+            # skips the temporary files of records that are being written
+            if not file_name.endswith('.json') or file_name.startswith('.'):
+                continue
+            record_path = os.path.join(path, file_name)
+            run = os.path.relpath(record_path, root)[: -len('.json')]
+            with open(record_path) as file:
+                records[run.replace(os.sep, '/')] = json.load(file)
+    return dict(sorted(records.items()))
+
+
+def add_upload_entry(archive, file_name: str, content: str) -> bool:
+    """
+    Adds the raw file `file_name` to the upload of `archive` and processes its
+    entry, unless it exists.
+
+    Args:
+        archive (EntryArchive): The archive whose upload receives the entry.
+        file_name (str): The path of the mainfile within the upload.
+        content (str): The content of the mainfile.
+
+    Returns:
+        bool: If the file was added, never for client contexts that do not create
+        archives.
+    """
+    context = archive.m_context
+    if not _creates_archives(context) or context.raw_path_exists(file_name):
+        return False
+    write_raw_file(context, file_name, content)
+    context.process_updated_raw_file(file_name, allow_modify=True)
+    return True
+
+
+def create_archive(entity, archive, file_name: str) -> str | None:
+    """
+    Creates or updates the entry `file_name` in the upload of `archive` with
+    `entity` as data and returns a reference to it, see `update_archive`.
+
+    Client contexts only receive archives if they set `creates_archives`. Without
+    an upload id, the entry is referenced by its mainfile, which resolves once the
+    directory is uploaded as a whole.
+
+    Args:
+        entity (ArchiveSection): The data of the new entry.
+        archive (EntryArchive): The archive whose upload receives the entry.
+        file_name (str): The path of the `.archive.json` file within the upload.
+
+    Returns:
+        str | None: The reference to the data of the entry, `None` for client
+        contexts that do not create archives.
+    """
+    if not _creates_archives(archive.m_context):
+        return None
+    data = {'data': entity.m_to_dict(with_root_def=True)}
+    update_archive(archive, file_name, lambda existing: data)
+    return archive_reference(archive, file_name)
+
+
+def archive_reference(archive, file_name: str) -> str | None:
+    """
+    Returns a reference to the data of the entry `file_name` in the upload of
+    `archive`, see `create_archive`, `None` for client contexts that do not create
+    archives.
+    """
+    from nomad_material_processing.utils import (
+        get_entry_id_from_file_name,
+        get_reference,
+    )
+
+    if not _creates_archives(archive.m_context):
+        return None
+    if archive.metadata.upload_id is None:
+        return f'../upload/archive/mainfile/{file_name}#data'
+    return get_reference(
+        archive.metadata.upload_id, get_entry_id_from_file_name(file_name, archive)
+    )
@@ -0,0 +1,295 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an 'AS IS' BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+Offline validation of growth-run templates before they are uploaded.
+
+Templates are read with the layouts and unit conversions of the normalizers, but
+without NOMAD, and every problem of a file is reported in one pass: cells that
+are not numbers, values a normalizer would fail on or store unusable, and values
+it would only log a warning for, such as unknown instruments or formulas.
+"""
+
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+
+import numpy as np
+
+from cpfs_synthesis.formula import MATERIAL_STATES, FormulaError, atomic_fractions
+from cpfs_synthesis.ingest import find_templates
+from cpfs_synthesis.instruments import CRUCIBLES, FURNACES, TUBES, lookup_instrument
+from cpfs_synthesis.templates import (
+    LAYOUTS,
+    TemplateData,
+    TemplateLayout,
+    cell_name,
+    read_techniques,
+    read_templates,
+)
+
+ERROR = 'error'
+WARNING = 'warning'
+
+INSTRUMENT_KINDS = {'furnace': FURNACES, 'crucible': CRUCIBLES, 'tube': TUBES}
+
+# the files of a pool task, validating a template takes about a millisecond
+CHUNK_SIZE = 16
+
+
+@dataclass
+class Problem:
+    """A problem found in a template."""
+
+    level: str
+    message: str
+    sheet: str | None = None
+    cell: str | None = None
+
+
+@dataclass
+class FileReport:
+    """The problems found in one template file."""
+
+    path: str
+    techniques: list[str] = field(default_factory=list)
+    runs: int = 0
+    problems: list[Problem] = field(default_factory=list)
+
+    @property
+    def valid(self) -> bool:
+        return all(problem.level != ERROR for problem in self.problems)
+
+
+@dataclass
+class ValidationReport:
+    """The problems found in a directory of templates."""
+
+    files: list[FileReport] = field(default_factory=list)
+    seconds: float = 0.0
+
+    def to_dict(self) -> dict:
+        """Returns the report as JSON serializable dict."""
+        problems = [problem for file in self.files for problem in file.problems]
+        return {
+            'summary': {
+                'files': len(self.files),
+                'valid': sum(file.valid for file in self.files),
+                'errors': sum(problem.level == ERROR for problem in problems),
+                'warnings': sum(problem.level == WARNING for problem in problems),
+                'seconds': round(self.seconds, 3),
+            },
+            'files': [
+                {**asdict(file), 'valid': file.valid}
+                for file in self.files
+                if file.techniques or file.problems
+            ],
+        }
+
+
+def _group_cell(layout: TemplateLayout, group: str, key: str) -> str:
+    cell = layout.groups[group][key]
+    return cell_name(cell.row, cell.column)
+
+
+def _is_formula(formula: str) -> bool:
+    try:
+        atomic_fractions(formula)
+    except FormulaError:
+        return False
+    return True
+
+
+def _temperatures(template: TemplateData) -> list[tuple[str, np.ndarray]]:
+    values = [
+        (key, value)
+        for group in template.groups.values()
+        for key, value in group.items()
+        if 'temperature' in key and value is not None
+    ]
+    values.extend(
+        (key, value)
+        for columns in template.series.values()
+        for key, value in columns.items()
+        if 'temperature' in key
+    )
+    return [
+        (key, np.atleast_1d(np.asarray(value, dtype=float))) for key, value in values
+    ]
+
+
+def _check_instruments(
+    template: TemplateData, layout: TemplateLayout, catalog: str | None, report
+) -> None:
+    if not template.groups['process'].get('name'):
+        report(WARNING, 'The run has no name.', _group_cell(layout, 'process', 'name'))
+    for key, kind in INSTRUMENT_KINDS.items():
+        if key not in layout.groups['instruments']:
+            continue
+        name = template.groups['instruments'].get(key)
+        cell = _group_cell(layout, 'instruments', key)
+        if not name:
+            report(WARNING, f'The {key} is missing.', cell)
+        elif lookup_instrument(kind, name, catalog) is None:
+            report(WARNING, f'The {key} {name!r} is not in the catalog.', cell)
+
+
+def _check_materials(template: TemplateData, layout: TemplateLayout, report) -> None:
+    for row in template.tables.get('initial_materials', []):
+        name, state = row['name'], row.get('state')
+        if state is not None and state not in MATERIAL_STATES:
+            report(
+                ERROR,
+                f'The state {state!r} of {name!r} is not one of '
+                f'{", ".join(MATERIAL_STATES)}.',
+            )
+        if not _is_formula(name):
+            report(WARNING, f'The initial material {name!r} is not a formula.')
+    crystal = template.groups['crystal']
+    for key in ('sample_id', 'achieved_composition'):
+        if not crystal.get(key):
+            report(
+                ERROR,
+                f'The crystal has no {key.replace("_", " ")}, its entry is named '
+                'after both.',
+                _group_cell(layout, 'crystal', key),
+            )
+    composition = crystal.get('achieved_composition')
+    if composition and not _is_formula(composition):
+        report(
+            WARNING,
+            f'The achieved composition {composition!r} is not a formula.',
+            _group_cell(layout, 'crystal', 'achieved_composition'),
+        )
+
+
+def _check_steps(template: TemplateData, report) -> None:
+    for key, values in _temperatures(template):
+        if np.any(values < 0):
+            report(ERROR, f'The {key.replace("_", " ")} is below absolute zero.')
+    profile = template.series.get('profile')
+    if profile is not None and len(profile['process_time']):
+        if np.any(np.isnan(profile['temperature'])):
+            report(ERROR, 'The temperature profile has empty temperatures.')
+        if np.any(np.diff(profile['process_time']) <= 0):
+            report(ERROR, 'The process times of the profile do not increase.')
+    steps = template.series.get('steps')
+    if steps is not None:
+        for name, duration in zip(steps['name'], steps['duration']):
+            if np.isnan(duration):
+                report(WARNING, f'The step {name!r} has no duration.')
+
+
+def validate_template(
+    template: TemplateData, layout: TemplateLayout, catalog: str | None = None
+) -> list[Problem]:
+    """
+    Returns the problems of one run read from a template.
+
+    Args:
+        template (TemplateData): The values read from the template.
+        layout (TemplateLayout): The layout the template was read with.
+        catalog (str | None): The instrument catalog, the one shipped with this
+            plugin if `None`.
+
+    Returns:
+        list[Problem]: The problems found, the cells that are not numbers first.
+    """
+    problems = [Problem(ERROR, error) for error in template.errors]
+
+    def report(level: str, message: str, cell: str | None = None) -> None:
+        problems.append(Problem(level, message, cell=cell))
+
+    _check_instruments(template, layout, catalog, report)
+    _check_materials(template, layout, report)
+    _check_steps(template, report)
+    return problems
+
+
+def validate_file(path: str, directory: str, catalog: str | None = None) -> FileReport:
+    """
+    Validates every run of every technique in the template at `path`.
+
+    Args:
+        path (str): The path of the template relative to `directory`.
+        directory (str): The directory that is validated.
+        catalog (str | None): The instrument catalog.
+
+    Returns:
+        FileReport: The techniques, number of runs and problems of the file.
+    """
+    result = FileReport(path)
+    try:
+        with open(os.path.join(directory, path), 'rb') as file:
+            content = file.read()
+        techniques = read_techniques(io.BytesIO(content))
+        for technique in techniques:
+            layout = LAYOUTS.get(technique)
+            if layout is None:
+                result.problems.append(
+                    Problem(
+                        ERROR, f'Not a valid template, unknown technique {technique}.'
+                    )
+                )
+                continue
+            result.techniques.append(technique)
+            for template in read_templates(io.BytesIO(content), layout):
+                result.runs += 1
+                for problem in validate_template(template, layout, catalog):
+                    problem.sheet = template.sheet
+                    result.problems.append(problem)
+    except Exception as error:
+        result.problems.append(Problem(ERROR, f'{type(error).__name__}: {error}'))
+    return result
+
+
+def _validate_file(arguments: tuple[str, str, str | None]) -> FileReport:
+    return validate_file(*arguments)
+
+
+def validate(
+    directory: str, workers: int | None = None, catalog: str | None = None
+) -> ValidationReport:
+    """
+    Validates all templates below `directory` in a pool of worker processes.
+    Files without a technique marker are not templates and left out of the report.
+
+    Args:
+        directory (str): The directory to scan for templates.
+        workers (int | None): The number of worker processes, one per CPU if
+            `None`. With a single worker, the templates are validated in this
+            process.
+        catalog (str | None): The instrument catalog, the one shipped with this
+            plugin if `None`.
+
+    Returns:
+        ValidationReport: The problems per template file.
+    """
+    start = time.perf_counter()
+    report = ValidationReport()
+    tasks = [(path, directory, catalog) for path in find_templates(directory)]
+    if workers == 1:
+        report.files = [_validate_file(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            report.files = list(
+                executor.map(_validate_file, tasks, chunksize=CHUNK_SIZE)
+            )
+    report.seconds = time.perf_counter() - start
+    return report
@@ -0,0 +1,51 @@
+import os
+import shutil
+
+import pytest
+from nomad.client import normalize_all
+from nomad.datamodel import EntryArchive, EntryMetadata
+
+from cpfs_synthesis.ingest import client_context
+from cpfs_synthesis.schema_packages import process_section
+from cpfs_synthesis.templates import read_techniques
+
+DATA = os.path.join('tests', 'data')
+
+
+@pytest.fixture
+def upload_context(tmp_path):
+    """A client context that writes the archives created to `tmp_path`."""
+    return client_context(str(tmp_path))
+
+
+@pytest.fixture
+def processed_run(tmp_path):
+    """
+    Returns a function that processes the run of a template in the upload at
+    `tmp_path`, or at `directory`, with all normalizers and returns its archive.
+    The template is copied from `tests/data` unless it exists in the upload, so a
+    test can write a changed template first.
+    """
+
+    def process(
+        template,
+        directory=None,
+        mainfile=None,
+        logger=None,
+        **quantities,
+    ):
+        directory = directory or tmp_path
+        path = directory / template
+        if not path.exists():
+            shutil.copy(os.path.join(DATA, template), path)
+        with open(path, 'rb') as file:
+            technique = read_techniques(file)[0]
+        archive = EntryArchive(
+            m_context=client_context(str(directory)),
+            metadata=EntryMetadata(mainfile=mainfile or f'{template}.archive.json'),
+        )
+        archive.data = process_section(technique)(xlsx_file=template, **quantities)
+        normalize_all(archive, logger=logger)
+        return archive
+
+    return process
@@ -0,0 +1,123 @@
+import json
+import logging
+import os
+
+import pytest
+from nomad.datamodel import EntryArchive, EntryMetadata
+
+from cpfs_synthesis.lineage import LINEAGE_FILE, LINEAGE_RECORDS
+from cpfs_synthesis.parsers import parser_upload_summary_entry_point
+from cpfs_synthesis.parsers.parser import (
+    CPFSTemplateParser,
+    CPFSUploadSummaryParser,
+    sniff_techniques,
+)
+from cpfs_synthesis.statistics import STATISTICS_FILE, STATISTICS_RECORDS
+from cpfs_synthesis.utils import run_record_name
+
+
+def is_mainfile(parser, file_name):
+    path = os.path.join('tests', 'data', file_name)
+    with open(path, 'rb') as file:
+        buffer = file.read(512)
+    return parser.is_mainfile(path, 'text/csv', buffer, None)
+
+
+@pytest.mark.parametrize(
+    'file_name, matches',
+    [
+        ('fluxgrowth.csv', True),
+        ('fluxgrowth.xlsx', True),
+        ('test.archive.yaml', False),
+    ],
+)
+def test_is_mainfile(file_name, matches):
+    parser = CPFSTemplateParser(mainfile_name_re=r'.*\.(csv|xlsx|yaml)$')
+    assert is_mainfile(parser, file_name) is matches
+
+
+def test_sniff_techniques_reads_the_buffer_only():
+    with open(os.path.join('tests', 'data', 'bridgman.csv'), 'rb') as file:
+        buffer = file.read(512)
+
+    assert sniff_techniques('does-not-exist.csv', buffer) == ['CPFSBridgmanTechnique']
+
+
+def test_parse_file():
+    parser = CPFSTemplateParser()
+    archive = EntryArchive(metadata=EntryMetadata(mainfile='floatingzone.csv'))
+    parser.parse(
+        os.path.join('tests', 'data', 'floatingzone.csv'),
+        archive,
+        logging.getLogger(),
+    )
+
+    assert archive.data.m_def.name == 'CPFSFloatingZoneProcess'
+    assert archive.data.xlsx_file == 'floatingzone.csv'
+
+
+def test_is_mainfile_skips_ingested_templates(tmp_path):
+    parser = CPFSTemplateParser()
+    path = tmp_path / 'fluxgrowth.csv'
+    path.write_bytes(open(os.path.join('tests', 'data', 'fluxgrowth.csv'), 'rb').read())
+    buffer = path.read_bytes()[:512]
+    assert parser.is_mainfile(str(path), 'text/csv', buffer, None)
+
+    (tmp_path / 'fluxgrowth.csv.archive.json').write_text('{}')
+
+    assert not parser.is_mainfile(str(path), 'text/csv', buffer, None)
+
+
+def test_parse_upload_statistics(tmp_path):
+    # after the parsers of the runs
+    assert parser_upload_summary_entry_point.level > 0
+    for run, furnace in [('a.csv', 'Furnace1'), ('sub/b.csv', 'Furnace2')]:
+        record = tmp_path / run_record_name(STATISTICS_RECORDS, run)
+        record.parent.mkdir(parents=True, exist_ok=True)
+        record.write_text(
+            json.dumps(
+                {
+                    'technique': 'CPFSBridgmanTechnique',
+                    'furnace': furnace,
+                    'crucible': None,
+                    'single_crystal': True,
+                    'crystal_length': None,
+                }
+            )
+        )
+    archive = EntryArchive(metadata=EntryMetadata(mainfile=STATISTICS_FILE))
+
+    CPFSUploadSummaryParser().parse(
+        str(tmp_path / STATISTICS_FILE), archive, logging.getLogger()
+    )
+
+    assert list(archive.data.contributions) == ['a.csv', 'sub/b.csv']
+    assert [furnace.name for furnace in archive.data.furnaces] == [
+        'Furnace1',
+        'Furnace2',
+    ]
+
+
+def test_parse_lineage(tmp_path):
+    record = tmp_path / run_record_name(LINEAGE_RECORDS, 'a.csv')
+    record.parent.mkdir(parents=True)
+    record.write_text(
+        json.dumps(
+            {
+                'technique': 'CPFSBridgmanTechnique',
+                'name': 'a',
+                'furnace': 'Furnace1',
+                'precursors': [['Bi', 'Sigma']],
+                'crystal': 'BR001_CPFSCrystal.archive.json',
+                'sample_id': 'BR001',
+            }
+        )
+    )
+    archive = EntryArchive(metadata=EntryMetadata(mainfile=LINEAGE_FILE))
+
+    CPFSUploadSummaryParser().parse(
+        str(tmp_path / LINEAGE_FILE), archive, logging.getLogger()
+    )
+
+    assert archive.data.precursors == ['Bi']
+    assert list(archive.data.index['runs']) == ['a.csv']
@@ -1,7 +1,85 @@
+import os
+
+import pytest
+from nomad.client import normalize_all, parse
+from nomad.datamodel import EntryArchive, EntryMetadata
+from nomad.utils import get_logger
+
+from cpfs_synthesis.cpfs_schemes import CPFSCrystal
+
+
 def test_schema_package():
-    pass
-    # test_file = os.path.join('tests', 'data', 'test.archive.yaml')
-    # entry_archive = parse(test_file)[0]
-    # normalize_all(entry_archive)
+    test_file = os.path.join('tests', 'data', 'test.archive.yaml')
+    entry_archive = parse(test_file)[0]
+    normalize_all(entry_archive)
+
+    process = entry_archive.data
+    assert process.method == 'Flux Growth Process'
+    step = process.steps[0]
+    assert step.max_temperature.to('degC').magnitude == pytest.approx(1100)
+    assert step.growth_cooling_rate.to('kelvin/hour').magnitude == pytest.approx(5)
+    assert [segment.kind for segment in step.segments] == [
+        'heating',
+        'dwell',
+        'cooling',
+        'cooling',
+    ]
+    bi2te3 = process.initial_materials[0]
+    assert [
+        (element.element, element.atomic_fraction)
+        for element in bi2te3.elemental_composition
+    ] == [('Bi', pytest.approx(0.4)), ('Te', pytest.approx(0.6))]
+    assert [figure.label for figure in process.figures] == ['Temperature']
+
+    summary = process.summary
+    assert summary.max_temperature.to('degC').magnitude == pytest.approx(1100)
+    # the fastest cooling is the quench after the growth
+    assert summary.max_cooling_rate > step.growth_cooling_rate
+    assert {'Bi', 'Te'} <= set(entry_archive.results.material.elements)
+    assert entry_archive.results.eln.methods == ['Flux Growth Process']
+
+
+def test_multi_step_template(tmp_path, processed_run):
+    with open(os.path.join('tests', 'data', 'bridgman.csv')) as file:
+        lines = file.read().splitlines()
+    # the step table starts below the crystal, after its header row
+    lines[41:44] = [
+        ',Step,Duration (h),Temperature (C),Pulling rate (mm/min)',
+        ',melting,12,1000,',
+        ',growth,100,950,0.05',
+    ]
+    (tmp_path / 'bridgman.csv').write_text('\n'.join(lines) + '\n')
+    archive = processed_run('bridgman.csv')
+
+    steps = archive.data.steps
+    assert [step.name for step in steps] == ['melting', 'growth']
+    assert steps[0].duration.to('hour').magnitude == pytest.approx(12)
+    assert steps[0].pulling_rate is None
+    assert steps[1].temperature.to('degC').magnitude == pytest.approx(950)
+    summary = archive.data.summary
+    assert summary.max_temperature.to('degC').magnitude == pytest.approx(1000)
+    assert summary.duration.to('hour').magnitude == pytest.approx(112)
+    assert summary.max_pulling_rate.to('mm/minute').magnitude == pytest.approx(0.05)
+
+
+def test_flux_growth_template(processed_run):
+    archive = processed_run('fluxgrowth.csv')
+
+    step = archive.data.steps[0]
+    assert step.max_temperature.to('degC').magnitude == pytest.approx(1100)
+    assert step.total_duration.to('hour').magnitude == pytest.approx(120)
+    assert step.growth_cooling_rate.to('kelvin/hour').magnitude == pytest.approx(5)
+    assert [segment.kind for segment in step.segments] == [
+        'heating',
+        'dwell',
+        'cooling',
+        'cooling',
+    ]
+
+
+def test_crystal_results():
+    archive = EntryArchive(metadata=EntryMetadata())
+    archive.data = CPFSCrystal(name='crystal', achieved_composition='Co3Sn2S2')
+    archive.data.normalize(archive, get_logger(__name__))
 
-    # assert entry_archive.data.message == 'Hello Markus!'
+    assert archive.results.material.elements == ['Co', 'S', 'Sn']
@@ -0,0 +1,53 @@
+import os
+
+import numpy as np
+
+from cpfs_synthesis.cache import TemplateCache
+from cpfs_synthesis.templates import TemplateData
+
+
+def test_template_cache_lru():
+    cache = TemplateCache(max_entries=2)
+    for checksum in 'abc':
+        cache.put(checksum, [TemplateData(technique=checksum)])
+
+    assert cache.get('a') is None
+    assert cache.get('c')[0].technique == 'c'
+    assert cache.stats() == {'hits': 1, 'disk_hits': 0, 'misses': 1, 'entries': 2}
+
+
+def test_template_cache_disk_tier(tmp_path):
+    template = TemplateData(
+        technique='CPFSCzochralskiProcess',
+        groups={'process': {'name': 'run'}},
+        series={
+            'steps': {
+                'name': ['seeding', 'growth'],
+                'duration': np.array([1800.0, np.nan]),
+            }
+        },
+    )
+    TemplateCache(directory=str(tmp_path)).put('a', [template])
+
+    cache = TemplateCache(directory=str(tmp_path))
+    cached = cache.get('a')[0]
+    assert cached.groups == template.groups
+    assert cached.series['steps']['name'] == ['seeding', 'growth']
+    duration = cached.series['steps']['duration']
+    assert isinstance(duration, np.ndarray)
+    np.testing.assert_array_equal(duration, template.series['steps']['duration'])
+    assert cache.get('a')[0] is cached
+    assert cache.stats() == {'hits': 1, 'disk_hits': 1, 'misses': 0, 'entries': 1}
+
+
+def test_template_cache_disk_tier_evicts_least_recently_used(tmp_path):
+    cache = TemplateCache(directory=str(tmp_path), max_files=2)
+    for time, checksum in enumerate('ab'):
+        cache.put(checksum, [TemplateData(technique=checksum)])
+        os.utime(tmp_path / f'{checksum}.json', ns=(time, time))
+    # reading `a` from another worker makes `b` the least recently used
+    assert TemplateCache(directory=str(tmp_path)).get('a') is not None
+
+    cache.put('c', [TemplateData(technique='c')])
+
+    assert sorted(os.listdir(tmp_path)) == ['a.json', 'c.json']
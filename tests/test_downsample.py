@@ -0,0 +1,125 @@
+import io
+
+import numpy as np
+import pytest
+from nomad.datamodel import EntryArchive, EntryMetadata
+from nomad.datamodel.context import ClientContext
+from nomad.units import ureg
+from nomad.utils import get_logger
+
+from cpfs_synthesis.cpfs_schemes import CPFSMeasuredLog
+from cpfs_synthesis.downsample import MAX_POINTS, MinMaxPyramid, downsample
+from cpfs_synthesis.figures import read_log_traces
+from cpfs_synthesis.logs import LogReader, write_log_hdf5
+from cpfs_synthesis.schema_packages.fluxgrowth import (
+    CPFSFluxGrowthProcess,
+    CPFSFluxGrowthProcessStep,
+)
+
+SAMPLES = 20000
+SPIKE = 2000.0
+POINTS = 1000
+
+
+def signal(samples: int) -> dict[str, np.ndarray]:
+    time = np.arange(samples, dtype=float)
+    temperature = 1000 + np.sin(time / 500)
+    # a single spike the overview has to keep at every level
+    temperature[12345] = SPIKE
+    return {'time': time, 'temperature': temperature}
+
+
+@pytest.mark.parametrize('chunk_size', [SAMPLES, 1000, 77])
+def test_pyramid_in_chunks(chunk_size):
+    series = signal(SAMPLES)
+    pyramid = MinMaxPyramid(bucket=16, factor=4, max_points=POINTS // 5)
+    for start in range(0, SAMPLES, chunk_size):
+        pyramid.add(
+            {
+                name: values[start : start + chunk_size]
+                for name, values in series.items()
+            }
+        )
+
+    levels = pyramid.levels()
+
+    assert [level.bucket for level in levels] == [16, 64, 256]
+    assert len(levels[0].time) == SAMPLES // 16
+    assert levels[0].time[:2].tolist() == [0, 16]
+    assert levels[-1].minimum['temperature'] == pytest.approx(
+        [
+            series['temperature'][start : start + 256].min()
+            for start in range(0, SAMPLES, 256)
+        ]
+    )
+    assert 2 * len(levels[-1].time) <= POINTS // 5
+    for level in levels:
+        assert level.maximum['temperature'].max() == SPIKE
+
+
+def test_downsample():
+    series = signal(SAMPLES)
+
+    time, values = downsample(series['time'], series['temperature'], max_points=POINTS)
+
+    assert len(time) <= POINTS
+    assert values.max() == SPIKE
+    assert values.min() == pytest.approx(series['temperature'].min())
+    assert downsample([0, 1], [2, 3])[1].tolist() == [2, 3]
+
+
+def test_read_log_traces(tmp_path):
+    series = signal(SAMPLES)
+    log = 'time [s],temperature [K]\n' + ''.join(
+        f'{t:g},{T:.3f}\n' for t, T in zip(series['time'], series['temperature'])
+    )
+    path = str(tmp_path / 'log.h5')
+
+    summary = write_log_hdf5(LogReader(io.BytesIO(log.encode())), path)
+    with open(path, 'rb') as file:
+        traces = read_log_traces(file, max_points=POINTS)
+
+    assert summary.overview == [64]
+    time, temperature = traces['temperature']
+    assert len(time) <= POINTS
+    assert temperature.max() == SPIKE
+    assert traces['units'] == {'temperature': 'kelvin'}
+
+
+def test_process_figures(tmp_path):
+    (tmp_path / 'run.log.csv').write_text(
+        'time [s],temperature [°C],power [%]\n'
+        + ''.join(f'{second},{900 + second % 7},{50}\n' for second in range(SAMPLES))
+    )
+    archive = EntryArchive(
+        m_context=ClientContext(local_dir=str(tmp_path)),
+        metadata=EntryMetadata(mainfile='run.archive.json'),
+    )
+    log = CPFSMeasuredLog(log_file='run.log.csv')
+    step = CPFSFluxGrowthProcessStep(
+        process_time=ureg.Quantity([0, 2, 5], 'hour'),
+        temperature=ureg.Quantity([300, 1200, 1200], 'kelvin'),
+    )
+    process = CPFSFluxGrowthProcess(controller_log=log, steps=[step])
+    archive.data = process
+    logger = get_logger(__name__)
+    log.normalize(archive, logger)
+    process.normalize(archive, logger)
+
+    assert [figure.label for figure in process.figures] == ['Temperature', 'Power']
+    temperature = process.figures[0].figure
+    assert [trace['name'] for trace in temperature['data']] == [
+        'programmed 1',
+        'temperature',
+    ]
+    assert temperature['data'][0]['y'] == pytest.approx([26.85, 926.85, 926.85])
+    assert len(temperature['data'][1]['x']) <= MAX_POINTS
+    assert process.figures[1].figure['layout']['yaxis']['title']['text'] == (
+        'Power (percent)'
+    )
+
+    checksum = process.figure_checksum
+    figures = process.figures
+    process.normalize(archive, logger)
+    assert process.figure_checksum == checksum
+    assert process.figures[0] is figures[0]
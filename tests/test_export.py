@@ -0,0 +1,126 @@
+import json
+import os
+import shutil
+import sys
+
+import pytest
+
+from cpfs_synthesis.export import (
+    MISSING_ARCHIVE,
+    archive_rows,
+    export,
+    table_columns,
+)
+from cpfs_synthesis.schema_packages.bridgman import CPFSBridgmanTechnique
+
+
+def write_run(processed_run, directory):
+    archive = processed_run('bridgman.csv', directory)
+    data = archive.data.m_to_dict(with_root_def=True)
+    with open(directory / 'bridgman.csv.archive.json', 'w') as file:
+        json.dump({'data': data}, file)
+    return data
+
+
+def test_archive_rows(tmp_path, processed_run):
+    data = write_run(processed_run, tmp_path)
+    tables = table_columns(CPFSBridgmanTechnique.m_def, 'bridgman')
+    assert sorted(tables) == [
+        'bridgman',
+        'bridgman_initial_materials',
+        'bridgman_steps',
+    ]
+    temperature = next(
+        column
+        for column in tables['bridgman']
+        if column.name == 'summary.max_temperature'
+    )
+    assert temperature.unit == 'kelvin'
+
+    rows = list(archive_rows(data, 'bridgman', tables, 'run.archive.json', 1))
+
+    assert [table for table, _ in rows] == [
+        'bridgman',
+        'bridgman_steps',
+        'bridgman_initial_materials',
+        'bridgman_initial_materials',
+    ]
+    run = rows[0][1]
+    assert run['entry'] == 'run.archive.json'
+    assert run['summary.max_temperature'] == pytest.approx(1223.15)
+    assert run['resulting_crystal'].endswith(
+        'BR007_Bi2Te3_CPFSCrystal.archive.json#data'
+    )
+    assert [row['name'] for _, row in rows[2:]] == ['Bi2Te3', 'Co']
+    assert rows[3][1]['index'] == 1
+
+
+def test_export_needs_pyarrow(tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, 'pyarrow', None)
+
+    with pytest.raises(ImportError, match='cpfs_synthesis\\[export\\]'):
+        export(str(tmp_path), str(tmp_path / 'tables'))
+
+
+def test_incremental_export(tmp_path, processed_run):
+    pq = pytest.importorskip('pyarrow.parquet')
+    directory = tmp_path / 'upload'
+    directory.mkdir()
+    write_run(processed_run, directory)
+    output = str(tmp_path / 'tables')
+
+    first = export(str(directory), output, batch_size=1)
+    assert first.rows['bridgman'] == 1
+    assert first.rows['crystals'] == 1
+    assert export(str(directory), output).rows == {}
+
+    # only the changed entry is appended
+    path = directory / 'bridgman.csv.archive.json'
+    data = json.loads(path.read_text())
+    data['data']['name'] = 'renamed'
+    path.write_text(json.dumps(data))
+    third = export(str(directory), output)
+
+    assert third.rows == {
+        'bridgman': 1,
+        'bridgman_initial_materials': 2,
+        'bridgman_steps': 1,
+    }
+    runs = pq.read_table(os.path.join(output, 'bridgman')).to_pylist()
+    assert [(run['name'], run['export']) for run in runs] == [
+        ('Bridgman run 7', 1),
+        ('renamed', third.export),
+    ]
+
+
+def test_export_processed_archives(tmp_path, processed_run):
+    pytest.importorskip('pyarrow')
+    directory = tmp_path / 'upload'
+    directory.mkdir()
+    data = write_run(processed_run, directory)
+    (directory / 'bridgman.csv.archive.json').unlink()
+    # the run created by the parser, downloaded as processed archive
+    (directory / 'upload_id').mkdir()
+    (directory / 'upload_id' / 'entry_id.json').write_text(
+        json.dumps({'metadata': {'mainfile': 'bridgman.csv'}, 'data': data})
+    )
+    (directory / 'log.csv').write_text('time [s],temperature [°C]\n0,25.1\n')
+
+    summary = export(str(directory), str(tmp_path / 'tables'))
+
+    assert summary.rows['bridgman'] == 1
+    assert summary.errors == {}
+
+
+def test_export_reports_templates_without_archive(tmp_path, processed_run):
+    pytest.importorskip('pyarrow')
+    directory = tmp_path / 'upload'
+    directory.mkdir()
+    write_run(processed_run, directory)
+    # uploaded to NOMAD, the run of this template is created by the parser
+    shutil.copy(os.path.join('tests', 'data', 'cvt.csv'), directory)
+
+    summary = export(str(directory), str(tmp_path / 'tables'))
+
+    assert summary.rows['bridgman'] == 1
+    assert summary.errors == {'cvt.csv': MISSING_ARCHIVE}
@@ -0,0 +1,32 @@
+import pytest
+
+from cpfs_synthesis.formula import FormulaError, atomic_fractions, element_counts
+
+
+@pytest.mark.parametrize(
+    'formula, counts',
+    [
+        ('Co', {'Co': 1}),
+        ('Bi2Te3', {'Bi': 2, 'Te': 3}),
+        ('Fe0.95Se', {'Fe': 0.95, 'Se': 1}),
+        ('Ca(OH)2', {'Ca': 1, 'O': 2, 'H': 2}),
+        ('K4[Fe(CN)6]', {'K': 4, 'Fe': 1, 'C': 6, 'N': 6}),
+        ('CuSO4·5H2O', {'Cu': 1, 'S': 1, 'O': 9, 'H': 10}),
+        ('Na2CO3 * 10 H2O', {'Na': 2, 'C': 1, 'O': 13, 'H': 20}),
+        ('FeSeFe', {'Fe': 2, 'Se': 1}),
+    ],
+)
+def test_element_counts(formula, counts):
+    assert dict(element_counts(formula)) == pytest.approx(counts)
+
+
+def test_atomic_fractions():
+    assert dict(atomic_fractions('Bi2Te3')) == pytest.approx({'Bi': 0.4, 'Te': 0.6})
+
+
+@pytest.mark.parametrize(
+    'formula', ['', '2', 'Bismuth', 'Xx2', 'Ca(OH', 'Ca)2', 'Fe(Se]', 'H2O·']
+)
+def test_invalid_formula(formula):
+    with pytest.raises(FormulaError):
+        element_counts(formula)
@@ -0,0 +1,46 @@
+import json
+import os
+import shutil
+
+from cpfs_synthesis.cli import main
+from cpfs_synthesis.ingest import find_templates, ingest
+
+
+def test_ingest_directory(tmp_path):
+    directory = tmp_path / 'templates'
+    shutil.copytree(os.path.join('tests', 'data'), directory / 'runs')
+    (directory / 'notes.csv').write_text('no,template\n')
+
+    summary = ingest(str(directory), output=str(tmp_path / 'output'), workers=1)
+
+    assert summary.errors == []
+    assert [result.path for result in summary.ingested] == [
+        path for path in find_templates(str(directory)) if path != 'notes.csv'
+    ]
+    with open(tmp_path / 'output' / 'runs' / 'fluxgrowth.xlsx.archive.json') as file:
+        data = json.load(file)['data']
+    assert data['resulting_crystal'] == (
+        '../upload/archive/mainfile/FG042_CoBi2Te3_CPFSCrystal.archive.json#data'
+    )
+    assert data['furnace_entry'] == (
+        '../upload/archive/mainfile/Furnace1_CPFSFurnace.archive.json#data'
+    )
+    assert 'furnace' not in data
+    assert (tmp_path / 'output' / 'Furnace1_CPFSFurnace.archive.json').exists()
+    assert (tmp_path / 'output' / 'runs' / 'fluxgrowth.xlsx').exists()
+    assert (
+        tmp_path / 'output' / 'runs' / 'fluxgrowth_Run_B_repeat_.archive.json'
+    ).exists()
+    assert (tmp_path / 'output' / 'FG043_CoBi2Te3_CPFSCrystal.archive.json').exists()
+
+
+def test_cli_reports_errors(tmp_path, capsys):
+    shutil.copy(os.path.join('tests', 'data', 'cvt.csv'), tmp_path / 'cvt.csv')
+    (tmp_path / 'notes.csv').write_text('no,template\n')
+    (tmp_path / 'broken.xlsx').write_bytes(b'PK\x03\x04 truncated')
+
+    assert main(['ingest', str(tmp_path), '--workers', '1']) == 1
+
+    report = capsys.readouterr().out
+    assert 'Ingested 1 of 3 files (6 archives)' in report
+    assert 'broken.xlsx: BadZipFile' in report
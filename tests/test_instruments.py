@@ -0,0 +1,96 @@
+import json
+import os
+
+from nomad.datamodel import EntryArchive, EntryMetadata
+from nomad.datamodel.context import ClientContext
+from nomad.units import ureg
+from nomad.utils import get_logger
+
+from cpfs_synthesis.cpfs_schemes import CPFSCrucible, CPFSFurnace, set_instrument
+from cpfs_synthesis.instruments import FURNACES, load_catalog, lookup_instrument
+from cpfs_synthesis.schema_packages.cvt import CPFSChemicalVapourTransport
+
+logger = get_logger(__name__)
+
+
+def test_default_catalog():
+    archive = EntryArchive(metadata=EntryMetadata())
+    archive.data = CPFSFurnace(name='Furnace2')
+    archive.data.normalize(archive, logger)
+
+    assert archive.data.model == 'FurnaceModel2'
+    assert archive.data.heating == 'Resistance'
+
+    crucible = CPFSCrucible(name='CrucibleType2')
+    crucible.normalize(archive, logger)
+    assert crucible.diameter == 12 * ureg.millimeter
+
+
+def test_catalog_reloads_on_modification(tmp_path):
+    path = str(tmp_path / 'instruments.json')
+    with open(path, 'w') as file:
+        json.dump({FURNACES: {'F1': {'model': 'A'}}}, file)
+    os.utime(path, ns=(0, 1_000_000_000))
+
+    catalog = load_catalog(path)
+    assert lookup_instrument(FURNACES, 'F1', path) == {'model': 'A'}
+    assert load_catalog(path) is catalog
+
+    with open(path, 'w') as file:
+        json.dump({FURNACES: {'F1': {'model': 'B'}, 'F2': {}}}, file)
+    os.utime(path, ns=(0, 2_000_000_000))
+
+    assert lookup_instrument(FURNACES, 'F1', path) == {'model': 'B'}
+    assert lookup_instrument(FURNACES, 'F3', path) is None
+
+
+def test_shared_instrument_entries(upload_context):
+    runs = []
+    for mainfile in ('a.archive.json', 'b.archive.json'):
+        archive = EntryArchive(
+            m_context=upload_context, metadata=EntryMetadata(mainfile=mainfile)
+        )
+        archive.data = CPFSChemicalVapourTransport()
+        set_instrument(archive.data, 'furnace', 'Furnace2', archive, logger)
+        runs.append(archive.data)
+
+    assert upload_context.updated == ['Furnace2_CPFSFurnace.archive.json']
+    assert [run.furnace_entry.m_proxy_value for run in runs] == [
+        '../upload/archive/mainfile/Furnace2_CPFSFurnace.archive.json#data'
+    ] * 2
+    assert runs[1].furnace is None
+
+
+def test_embedded_instrument_without_upload(tmp_path):
+    archive = EntryArchive(
+        m_context=ClientContext(local_dir=str(tmp_path)),
+        metadata=EntryMetadata(mainfile='a.archive.json'),
+    )
+    archive.data = CPFSChemicalVapourTransport()
+    set_instrument(archive.data, 'furnace', 'Furnace2', archive, logger)
+
+    assert archive.data.furnace.model == 'FurnaceModel2'
+    assert archive.data.furnace_entry is None
+
+
+def test_shared_instrument_entry_keeps_edits(tmp_path, upload_context):
+    file_name = 'Furnace2_CPFSFurnace.archive.json'
+    edited = {
+        'data': {
+            'm_def': 'cpfs_synthesis.cpfs_schemes.CPFSFurnace',
+            'name': 'Furnace2',
+            'model': 'Rebuilt',
+        }
+    }
+    with open(tmp_path / file_name, 'w') as file:
+        json.dump(edited, file)
+    archive = EntryArchive(
+        m_context=upload_context, metadata=EntryMetadata(mainfile='a.archive.json')
+    )
+    archive.data = CPFSChemicalVapourTransport()
+    set_instrument(archive.data, 'furnace', 'Furnace2', archive, logger)
+
+    assert upload_context.updated == []
+    assert archive.data.furnace_entry.m_proxy_value.endswith(f'{file_name}#data')
+    with open(tmp_path / file_name) as file:
+        assert json.load(file) == edited
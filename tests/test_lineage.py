@@ -0,0 +1,83 @@
+import pytest
+
+from cpfs_synthesis.lineage import (
+    LINEAGE_FILE,
+    LineageIndex,
+    crystal_archive_name,
+    crystal_name,
+    update_index,
+)
+from cpfs_synthesis.templates import TemplateData
+
+
+def record(sample_id, *precursors, furnace='Furnace1'):
+    return {
+        'technique': 'CPFSBridgmanTechnique',
+        'name': sample_id,
+        'furnace': furnace,
+        'precursors': [list(precursor) for precursor in precursors],
+        'crystal': f'{sample_id}_CPFSCrystal.archive.json',
+        'sample_id': sample_id,
+    }
+
+
+def test_update_index_replaces_runs():
+    runs = {
+        'a.csv': record('BR001', ('Bi', 'Alfa Aesar'), ('Te', 'Sigma')),
+        'b.csv': record('BR002', ('Bi', 'Sigma')),
+        'c.csv': record('FZ001', ('Bi', None)),
+    }
+    index = LineageIndex(update_index(None, runs))
+    assert index.runs_from_precursor('Bi') == ['a.csv', 'b.csv', 'c.csv']
+    assert index.crystals_from_precursor('Bi', 'Alfa Aesar') == [
+        'BR001_CPFSCrystal.archive.json'
+    ]
+    assert index.runs_with_sample_prefix('BR') == ['a.csv', 'b.csv']
+    assert index.lineage_of_crystal('FZ001_CPFSCrystal.archive.json')[0][
+        'precursors'
+    ] == [['Bi', None]]
+
+    updated = LineageIndex(
+        update_index(index.index, {'b.csv': record('FZ002', ('Te', 'Sigma'))})
+    )
+    assert updated.runs_from_precursor('Bi', 'Sigma') == []
+    assert updated.runs_from_precursor('Te') == ['a.csv', 'b.csv']
+    assert updated.runs_with_sample_prefix('FZ') == ['c.csv', 'b.csv']
+    assert updated.runs_of_crystal('BR002_CPFSCrystal.archive.json') == []
+    # the given index is left as it was
+    assert index.runs_with_sample_prefix('BR') == ['a.csv', 'b.csv']
+
+
+def test_lineage_entry(tmp_path, processed_run):
+    for template in ('bridgman.csv', 'cvt.csv'):
+        processed_run(template)
+
+    assert (tmp_path / LINEAGE_FILE).exists()
+    index = LineageIndex.build(str(tmp_path))
+    assert index.runs_from_precursor('Bi2Te3', 'Alfa Aesar') == [
+        'bridgman.csv.archive.json',
+        'cvt.csv.archive.json',
+    ]
+    crystals = index.crystals_from_precursor('Co')
+    assert all((tmp_path / crystal).exists() for crystal in crystals)
+    assert index.runs_with_sample_prefix('CVT') == ['cvt.csv.archive.json']
+    lineage = index.lineage_of_crystal(crystals[0])
+    assert [run['furnace'] for run in lineage] == ['Furnace2']
+
+
+@pytest.mark.parametrize(
+    'crystal, name',
+    [
+        ({'sample_id': 'BR001', 'achieved_composition': 'Bi2Te3'}, 'BR001_Bi2Te3'),
+        ({'sample_id': 'BR001', 'achieved_composition': None}, 'BR001'),
+        ({'sample_id': None, 'achieved_composition': 'Bi2Te3'}, 'Bi2Te3'),
+        ({'sample_id': None, 'achieved_composition': None}, 'run 7'),
+    ],
+)
+def test_crystal_name_skips_missing_parts(crystal, name):
+    template = TemplateData(
+        technique='CPFSBridgmanTechnique',
+        groups={'process': {'name': 'run 7'}, 'crystal': crystal},
+    )
+    assert crystal_name(template) == name
+    assert crystal_archive_name(template) == f'{name}_CPFSCrystal.archive.json'
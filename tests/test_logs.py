@@ -0,0 +1,248 @@
+import io
+
+import h5py
+import numpy as np
+import pytest
+from nomad.datamodel import EntryArchive, EntryMetadata
+from nomad.datamodel.context import ClientContext
+from nomad.units import ureg
+from nomad.utils import get_logger
+
+from cpfs_synthesis.cpfs_schemes import CPFSMeasuredLog
+from cpfs_synthesis.logs import (
+    LOG_FORMATS,
+    LogFormat,
+    LogReader,
+    parse_channel,
+    register_log_format,
+    write_log_hdf5,
+)
+from cpfs_synthesis.schema_packages.czochalski import CPFSCzochralskiProcess
+from cpfs_synthesis.schema_packages.fluxgrowth import (
+    CPFSFluxGrowthProcess,
+    CPFSFluxGrowthProcessStep,
+)
+
+SAMPLES = 1000
+
+LOG = (
+    'time [s];Temperature [°C];Power [%];Rotation [rpm];Pull position [mm]\n'
+    + ''.join(
+        f'{second};{1000 + second % 10};{50};{6};{second / 100}\n'
+        for second in range(SAMPLES)
+    )
+)
+
+
+def test_parse_channel():
+    channel = parse_channel('Pull position (mm)')
+
+    assert channel.name == 'pull_position'
+    assert channel.unit == 'meter'
+    assert channel.convert(np.array([1.0])) == pytest.approx(0.001)
+    assert parse_channel('rotation [rpm]').convert(np.array([60.0])) == 1
+    assert parse_channel('power [%]').unit == 'percent'
+    for header in ('temperature [furlong]', 'power [foo]'):
+        with pytest.raises(ValueError):
+            parse_channel(header)
+
+
+def test_read_log_in_chunks():
+    reader = LogReader(io.BytesIO(LOG.encode()), chunk_size=300)
+    chunks = list(reader)
+
+    assert [len(chunk['time']) for chunk in chunks] == [300, 300, 300, 100]
+    assert chunks[0]['temperature'][:2] == pytest.approx([1273.15, 1274.15])
+    assert chunks[-1]['pull_position'][-1] == pytest.approx(9.99e-3)
+
+
+def test_read_log_with_timestamps():
+    log = 'time,temperature [K]\n2024-01-01T00:00:00,300\n\n2024-01-01T00:00:01.5,\n'
+    reader = LogReader(io.BytesIO(log.encode()))
+    (chunk,) = reader
+
+    assert chunk['time'].tolist() == [0, 1.5]
+    assert np.isnan(chunk['temperature'][1])
+    assert reader.start_time.isoformat() == '2024-01-01T00:00:00+00:00'
+
+
+def test_write_log_hdf5(tmp_path):
+    path = str(tmp_path / 'log.h5')
+
+    summary = write_log_hdf5(LogReader(io.BytesIO(LOG.encode()), chunk_size=256), path)
+
+    assert summary.samples == SAMPLES
+    assert summary.duration == SAMPLES - 1
+    with h5py.File(path) as file:
+        temperature = file['log/temperature']
+        assert temperature.shape == (SAMPLES,)
+        assert temperature.chunks == (256,)
+        assert temperature.compression == 'gzip'
+        assert temperature.attrs['units'] == 'kelvin'
+
+
+def test_measured_log(tmp_path):
+    (tmp_path / 'run.log.csv').write_text(LOG)
+    archive = EntryArchive(
+        m_context=ClientContext(local_dir=str(tmp_path)),
+        metadata=EntryMetadata(mainfile='run.archive.json'),
+    )
+    log = CPFSMeasuredLog(log_file='run.log.csv')
+    archive.data = CPFSFluxGrowthProcess(
+        controller_log=log, steps=[CPFSFluxGrowthProcessStep()]
+    )
+    log.normalize(archive, get_logger(__name__))
+    archive.data.normalize(archive, get_logger(__name__))
+
+    assert log.samples == SAMPLES
+    assert log.temperature == 'run.log.csv.h5#/log/temperature'
+    assert archive.data.steps[0].measured_log is log
+    assert (tmp_path / 'run.log.csv.h5').exists()
+
+
+EUROTHERM = (
+    'Eurotherm nanodac export\n'
+    'Instrument,nanodac,Serial,12345\n'
+    'Date,Time,Loop.1.Main.PV (°C),Loop.1.Main.WorkingSP (°C),Loop.1.OP.Output (%),'
+    'Alarm.1.Status\n'
+    '2026-10-01,23:59:59,1000.5,1000.0,42.0,0\n'
+    '2026-10-02,00:00:01,1001.5,1000.0,41.0,0\n'
+)
+
+JUMO = (
+    'JUMO LOGOSCREEN;Ofen 3\n'
+    'Datum;Uhrzeit;Istwert [°C];Sollwert [°C];Stellgrad [%];Drehzahl [rpm]\n'
+    '01.10.2026;12:00:00;25,5;25,0;0,0;6,0\n'
+    '01.10.2026;12:00:10;26,5;;1,5;6,0\n'
+)
+
+
+def test_read_vendor_logs():
+    reader = LogReader(io.BytesIO(EUROTHERM.encode()))
+    (chunk,) = reader
+
+    assert reader.format.name == 'eurotherm'
+    assert [channel.name for channel in reader.channels] == [
+        'time',
+        'temperature',
+        'setpoint',
+        'power',
+    ]
+    assert chunk['time'].tolist() == [0, 2]
+    assert chunk['setpoint'] == pytest.approx([1273.15] * 2)
+    assert reader.start_time.isoformat() == '2026-10-01T23:59:59+00:00'
+
+    reader = LogReader(io.BytesIO(JUMO.encode()))
+    (chunk,) = reader
+
+    assert reader.format.name == 'jumo'
+    assert chunk['time'].tolist() == [0, 10]
+    assert chunk['temperature'] == pytest.approx([298.65, 299.65])
+    assert np.isnan(chunk['setpoint'][1])
+    assert chunk['power'].tolist() == [0, 1.5]
+    assert chunk['rotation'] == pytest.approx([0.1, 0.1])
+
+
+def test_register_log_format():
+    log_format = register_log_format(
+        LogFormat(
+            name='test',
+            marker='^# test controller',
+            header_row=1,
+            columns={'t': 'time [h]', 'T': 'temperature [K]'},
+        )
+    )
+    try:
+        reader = LogReader(io.BytesIO(b'# test controller\nt,x,T\n1,7,300\n2,7,301\n'))
+        (chunk,) = reader
+    finally:
+        LOG_FORMATS.pop(log_format.name)
+
+    assert reader.format is log_format
+    assert chunk['time'].tolist() == [3600, 7200]
+    assert list(chunk) == ['time', 'temperature']
+
+
+def normalize_with_log(tmp_path, log: str, process):
+    (tmp_path / 'run.log.csv').write_text(log)
+    archive = EntryArchive(
+        m_context=ClientContext(local_dir=str(tmp_path)),
+        metadata=EntryMetadata(mainfile='run.archive.json'),
+    )
+    process.controller_log = CPFSMeasuredLog(log_file='run.log.csv')
+    archive.data = process
+    logger = get_logger(__name__)
+    for step in process.steps:
+        step.normalize(archive, logger)
+    process.controller_log.normalize(archive, logger)
+    process.normalize(archive, logger)
+    return process
+
+
+def test_deviation_from_profile(tmp_path):
+    # heat to 1000 K in 1000 s and dwell, 20 K too hot for the first 100 s of it
+    overshoot = np.zeros(2 * SAMPLES)
+    overshoot[SAMPLES : SAMPLES + 100] = 20
+    log = 'time [s],temperature [K]\n' + ''.join(
+        f'{second},{300 + 0.7 * min(second, SAMPLES) + overshoot[second]}\n'
+        for second in range(2 * SAMPLES)
+    )
+    step = CPFSFluxGrowthProcessStep(
+        process_time=ureg.Quantity([0, 1000, 3000], 'second'),
+        temperature=ureg.Quantity([300, 1000, 1000], 'kelvin'),
+    )
+    process = normalize_with_log(tmp_path, log, CPFSFluxGrowthProcess(steps=[step]))
+
+    deviation = process.deviation
+    assert deviation.reference == 'programmed profile'
+    assert deviation.samples == SAMPLES * 2
+    assert deviation.max_overshoot.to('kelvin').magnitude == pytest.approx(20)
+    assert deviation.time_out_of_tolerance == ureg.Quantity(100, 'second')
+    heating, dwell = step.segments
+    assert heating.max_overshoot.magnitude == pytest.approx(0)
+    assert dwell.rms_error.magnitude == pytest.approx(np.sqrt(0.1) * 20)
+
+    checksum = deviation.checksum
+    process.normalize(archive=process.m_root(), logger=get_logger(__name__))
+    assert process.deviation is deviation
+    assert process.deviation.checksum == checksum
+
+
+def test_deviation_of_template_run(tmp_path, processed_run):
+    # the programmed profile of the flux growth template, 20 K too hot in the dwell
+    time = np.arange(0, 432001, 600)
+    temperature = np.interp(
+        time,
+        [0, 18000, 54000, 414000, 432000],
+        [298.15, 1373.15, 1373.15, 873.15, 298.15],
+    )
+    temperature[np.searchsorted(time, 20000) : np.searchsorted(time, 30000)] += 20
+    log = 'time [s],temperature [K]\n' + ''.join(
+        f'{second},{value}\n' for second, value in zip(time, temperature)
+    )
+    (tmp_path / 'run.log.csv').write_text(log)
+    archive = processed_run(
+        'fluxgrowth.csv', controller_log=CPFSMeasuredLog(log_file='run.log.csv')
+    )
+
+    deviation = archive.data.deviation
+    assert deviation.reference == 'programmed profile'
+    assert deviation.max_overshoot.to('kelvin').magnitude == pytest.approx(20)
+    segments = archive.data.steps[0].segments
+    assert [segment.kind for segment in segments] == [
+        'heating',
+        'dwell',
+        'cooling',
+        'cooling',
+    ]
+    assert segments[0].max_overshoot.magnitude == pytest.approx(0)
+    assert segments[1].max_overshoot.magnitude == pytest.approx(20)
+
+
+def test_deviation_from_setpoint(tmp_path):
+    process = normalize_with_log(tmp_path, EUROTHERM, CPFSCzochralskiProcess())
+
+    assert process.deviation.reference == 'controller setpoint'
+    assert process.deviation.samples == len(EUROTHERM.splitlines()) - 3
+    assert process.deviation.max_overshoot.magnitude == pytest.approx(1.5)
+    assert process.deviation.time_out_of_tolerance.magnitude == 0
@@ -0,0 +1,29 @@
+import os
+import subprocess
+import sys
+
+from cpfs_synthesis.templates import LAYOUTS
+
+
+def test_normalize_benchmark():
+    # the synthetic templates have to stay valid for every layout
+    output = subprocess.run(
+        [
+            sys.executable,
+            os.path.join('benchmarks', 'normalize.py'),
+            '--runs',
+            '2',
+            '--profile',
+            '30',
+            '--repeat',
+            '1',
+            '--threshold',
+            'inf',
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    timed = [line.split()[1] for line in output.stdout.splitlines()]
+    assert set(LAYOUTS) <= set(timed)
@@ -0,0 +1,63 @@
+import json
+import os
+import subprocess
+import sys
+
+# generous against the ~150 ms measured, it catches eagerly imported dependencies
+LOAD_BUDGET = float(os.environ.get('CPFS_PLUGIN_LOAD_BUDGET', '0.6'))
+
+# only needed once a template or log is read
+DEFERRED_MODULES = {
+    'cpfs_synthesis.cache',
+    'cpfs_synthesis.downsample',
+    'cpfs_synthesis.export',
+    'cpfs_synthesis.figures',
+    'cpfs_synthesis.lineage',
+    'cpfs_synthesis.logs',
+    'cpfs_synthesis.readers',
+    'cpfs_synthesis.statistics',
+    'cpfs_synthesis.templates',
+    'cpfs_synthesis.utils',
+    'cpfs_synthesis.validate',
+}
+
+# the type of the HDF5 quantities of measured logs, imported by the schemas
+SCHEMA_MODULES = {'nomad.datamodel.hdf5'}
+
+
+def test_plugin_load():
+    output = subprocess.run(
+        [
+            sys.executable,
+            os.path.join('benchmarks', 'plugin_load.py'),
+            '--repeat',
+            '2',
+            '--json',
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    result = json.loads(output.stdout)
+
+    modules = set(result['modules']) - SCHEMA_MODULES
+    assert {module.split('.')[0] for module in modules} == {'cpfs_synthesis'}
+    assert not modules & DEFERRED_MODULES
+    assert result['seconds'] < LOAD_BUDGET
+
+
+def test_figures_do_not_import_log_readers():
+    # the log readers import pandas, only runs with a controller log need them
+    output = subprocess.run(
+        [
+            sys.executable,
+            '-c',
+            'import sys, cpfs_synthesis.figures; '
+            "print('cpfs_synthesis.logs' in sys.modules)",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert output.stdout.strip() == 'False'
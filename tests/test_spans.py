@@ -0,0 +1,59 @@
+import shutil
+
+from cpfs_synthesis.cache import get_template_cache
+from cpfs_synthesis.spans import SPANS_EVENT, span
+
+
+class RecordingLogger:
+    def __init__(self):
+        self.events = []
+
+    def _record(self, event, **kwargs):
+        self.events.append((event, kwargs))
+
+    debug = info = warning = error = _record
+
+    def bind(self, **kwargs):
+        return self
+
+
+def normalize_template(tmp_path, processed_run, logger):
+    get_template_cache().clear()
+    shutil.copy('tests/data/fluxgrowth.csv', tmp_path / 'run.csv')
+    return processed_run('run.csv', mainfile='run.archive.json', logger=logger)
+
+
+def test_span_outside_normalizer():
+    with span('parse template') as timing:
+        timing.bytes += 10
+
+    assert timing.bytes == 0
+
+
+def test_normalizer_spans(tmp_path, processed_run):
+    logger = RecordingLogger()
+    normalize_template(tmp_path, processed_run, logger)
+
+    events = [kwargs for event, kwargs in logger.events if event == SPANS_EVENT]
+    assert len(events) == 1
+    assert events[0]['section'] == 'CPFSFluxGrowthProcess'
+    spans = events[0]['spans']
+    size = (tmp_path / 'run.csv').stat().st_size
+    assert spans['read template']['bytes'] == size
+    assert spans['parse template']['calls'] == 1
+    assert spans['instrument lookup']['calls'] >= 1
+    assert spans['formula']['calls'] >= 1
+    assert spans['create archive']['bytes'] > 0
+    assert events[0]['duration_ms'] >= sum(
+        phase['duration_ms'] for phase in spans.values()
+    )
+
+
+def test_normalizer_spans_turned_off(tmp_path, processed_run, monkeypatch):
+    monkeypatch.setattr(
+        'cpfs_synthesis.schema_packages.timing_spans_enabled', lambda: False
+    )
+    logger = RecordingLogger()
+    normalize_template(tmp_path, processed_run, logger)
+
+    assert SPANS_EVENT not in [event for event, _ in logger.events]
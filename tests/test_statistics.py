@@ -0,0 +1,113 @@
+import json
+
+import pytest
+
+from cpfs_synthesis.cpfs_schemes import upload_statistics
+from cpfs_synthesis.statistics import (
+    STATISTICS_FILE,
+    STATISTICS_RECORDS,
+    update_totals,
+)
+from cpfs_synthesis.utils import run_record_name
+
+
+def contribution(technique='CPFSBridgmanTechnique', **values):
+    return {
+        'technique': technique,
+        'furnace': 'Furnace1',
+        'crucible': 'Crucible1',
+        'single_crystal': True,
+        'crystal_length': 0.004,
+        **values,
+    }
+
+
+def test_update_totals_replaces_runs():
+    runs = {
+        'a.csv': contribution(),
+        'b.csv': contribution(single_crystal=False, crystal_length=0.002),
+        'c.csv': contribution('CPFSFloatingZone', crucible=None),
+    }
+    totals, contributions = update_totals(None, None, runs)
+    assert totals['runs'] == len(runs)
+    assert totals['techniques']['CPFSBridgmanTechnique'] == {
+        'runs': 2,
+        'single_crystals': 1,
+    }
+    assert totals['furnaces'] == {'Furnace1': {'runs': 3}}
+    assert totals['crucibles'] == {
+        'Crucible1': {'crystals': 2, 'total_crystal_length': pytest.approx(0.006)}
+    }
+
+    updated, contributions = update_totals(
+        totals, contributions, {'b.csv': contribution(furnace='Furnace2')}
+    )
+    assert updated['runs'] == len(runs)
+    assert updated['techniques']['CPFSBridgmanTechnique'] == {
+        'runs': 2,
+        'single_crystals': 2,
+    }
+    assert updated['furnaces'] == {'Furnace1': {'runs': 2}, 'Furnace2': {'runs': 1}}
+    assert updated['crucibles']['Crucible1']['total_crystal_length'] == (
+        pytest.approx(0.008)
+    )
+    assert contributions['b.csv']['furnace'] == 'Furnace2'
+    # the given totals are left as they were
+    assert totals['furnaces'] == {'Furnace1': {'runs': 3}}
+
+
+def read_statistics(directory):
+    assert (directory / STATISTICS_FILE).exists()
+    return upload_statistics(str(directory)).m_to_dict()
+
+
+def test_upload_statistics(tmp_path, processed_run):
+    runs = ['bridgman.csv', 'cvt.csv']
+    for template in runs:
+        processed_run(template)
+
+    statistics = read_statistics(tmp_path)
+    assert statistics['runs'] == len(runs)
+    assert [technique['success_rate'] for technique in statistics['techniques']] == [
+        1,
+        1,
+    ]
+    assert statistics['crucibles'] == [
+        {'name': 'CrucibleType2', 'crystals': 1, 'average_crystal_length': 0.0055}
+    ]
+
+    # the changed run replaces its contribution
+    template = (tmp_path / 'bridgman.csv').read_text()
+    (tmp_path / 'bridgman.csv').write_text(
+        template.replace('Furnace2', 'Furnace3').replace(',single,', ',poly,')
+    )
+    processed_run('bridgman.csv')
+
+    statistics = read_statistics(tmp_path)
+    assert statistics['runs'] == len(runs)
+    assert statistics['furnaces'] == [{'name': 'Furnace3', 'runs': 2}]
+    assert statistics['techniques'][0] == {
+        'technique': 'CPFSBridgmanTechnique',
+        'runs': 1,
+        'single_crystals': 0,
+        'success_rate': 0,
+    }
+
+
+def test_upload_statistics_keeps_the_records_of_other_runs(tmp_path, processed_run):
+    # another worker recorded its run in the meantime
+    other = tmp_path / run_record_name(STATISTICS_RECORDS, 'other.csv.archive.json')
+    other.parent.mkdir(parents=True)
+    other.write_text(json.dumps(contribution(furnace='Furnace9')))
+    processed_run('bridgman.csv')
+    record = tmp_path / run_record_name(STATISTICS_RECORDS, 'bridgman.csv.archive.json')
+    written = record.stat().st_mtime_ns
+
+    # an unchanged run leaves its record as it is
+    processed_run('bridgman.csv')
+
+    assert record.stat().st_mtime_ns == written
+    assert read_statistics(tmp_path)['furnaces'] == [
+        {'name': 'Furnace2', 'runs': 1},
+        {'name': 'Furnace9', 'runs': 1},
+    ]
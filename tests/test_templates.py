@@ -0,0 +1,264 @@
+import io
+import os
+import zipfile
+
+import numpy as np
+import pytest
+
+from cpfs_synthesis.readers import read_csv_rows
+from cpfs_synthesis.templates import (
+    FLUX_GROWTH_LAYOUT,
+    LAYOUTS,
+    compile_layout,
+    read_techniques,
+    read_templates,
+    series_records,
+)
+
+TEMPLATES = {
+    'CPFSFluxGrowth': 'fluxgrowth.csv',
+    'CPFSBridgmanTechnique': 'bridgman.csv',
+    'CPFSChemicalVapourTransport': 'cvt.csv',
+    'CPFSCzochralskiProcess': 'czochalski.csv',
+    'CPFSFloatingZone': 'floatingzone.csv',
+}
+
+
+def read_rows(file_name):
+    with open(os.path.join('tests', 'data', file_name), 'rb') as file:
+        return list(read_csv_rows(file))
+
+
+@pytest.mark.parametrize('technique, file_name', TEMPLATES.items())
+def test_layout_extract(technique, file_name):
+    template = compile_layout(LAYOUTS[technique]).extract(read_rows(file_name))
+
+    assert template.technique == technique
+    assert template.errors == []
+    assert template.groups['process']['name']
+    assert [row['name'] for row in template.tables['initial_materials']] == [
+        'Bi2Te3',
+        'Co',
+    ]
+    assert template.groups['crystal']['final_crystal_length'] == pytest.approx(0.0055)
+
+
+def test_flux_growth_profile():
+    template = compile_layout(FLUX_GROWTH_LAYOUT).extract(read_rows('fluxgrowth.csv'))
+
+    profile = template.series['profile']
+    assert profile['process_time'].tolist() == [
+        0,
+        5 * 3600,
+        15 * 3600,
+        115 * 3600,
+        120 * 3600,
+    ]
+    assert profile['temperature'][1] == pytest.approx(1373.15)
+
+
+def test_flux_growth_profile_longer_than_reserved():
+    rows = read_rows('fluxgrowth.csv')
+    segments = [['', str(hour), '500'] for hour in range(300)]
+    # the rows reserved for the profile are filled and 280 more are inserted
+    rows[29:49] = segments
+    rows[40][2] = 'hot'
+
+    template = compile_layout(FLUX_GROWTH_LAYOUT).extract(rows)
+
+    profile = template.series['profile']
+    assert profile['process_time'].tolist() == [hour * 3600 for hour in range(300)]
+    assert np.isnan(profile['temperature'][11])
+    assert template.errors == ["Cell C42: 'hot' is not a number."]
+    assert template.groups['crystal']['sample_id'] == 'FG042'
+
+
+@pytest.mark.parametrize('segments', [21, 22])
+def test_flux_growth_profile_fills_spare_rows(segments):
+    rows = read_rows('fluxgrowth.csv')
+    # typed into the blank rows between the profile and the crystal, none inserted
+    rows[29 : 29 + segments] = [['', str(hour), '500'] for hour in range(segments)]
+
+    template = compile_layout(FLUX_GROWTH_LAYOUT).extract(rows)
+
+    assert template.errors == []
+    assert len(template.series['profile']['process_time']) == segments
+    assert not np.isnan(template.series['profile']['temperature']).any()
+    assert template.groups['crystal']['sample_id'] == 'FG042'
+    assert template.groups['crystal']['achieved_composition'] == 'CoBi2Te3'
+
+
+def test_flux_growth_profile_ends_at_text():
+    rows = read_rows('fluxgrowth.csv')
+    rows[32][1] = 'later'
+
+    template = compile_layout(FLUX_GROWTH_LAYOUT).extract(rows)
+
+    assert template.series['profile']['process_time'].tolist() == [
+        0,
+        5 * 3600,
+        15 * 3600,
+    ]
+    assert template.errors == [
+        "Cell B34: 'later' is not a number, the profile ends above it."
+    ]
+    assert template.groups['crystal']['sample_id'] == 'FG042'
+
+
+def test_flux_growth_without_crystal_label():
+    rows = read_rows('fluxgrowth.csv')
+    rows[51][1] = 'Sample'
+
+    template = compile_layout(FLUX_GROWTH_LAYOUT).extract(rows)
+
+    assert template.errors == [
+        "No 'Sample ID' label below the series, the cells below it are read at "
+        'their reserved rows.'
+    ]
+    assert template.groups['crystal']['sample_id'] == 'FG042'
+
+
+def test_step_table():
+    rows = read_rows('czochalski.csv')
+    # a header row and one row per step below the crystal
+    rows[48:52] = [
+        ['', 'Step', 'Duration (h)', 'Melting power (%)', 'Growth power (%)'],
+        ['', 'seeding', '0.5', '40', '', '10', 'clockwise', '1'],
+        ['', 'necking', '1', '', '42', '15', 'clockwise', '2'],
+        ['', 'growth', '24', '', '45', '', '', 'slow'],
+    ]
+
+    template = compile_layout(LAYOUTS['CPFSCzochralskiProcess']).extract(rows)
+
+    assert template.errors == ["Cell H53: 'slow' is not a number."]
+    steps = series_records(template.series['steps'])
+    assert [step['name'] for step in steps] == ['seeding', 'necking', 'growth']
+    assert steps[1] == {
+        'name': 'necking',
+        'duration': 3600,
+        'growth_power_in_percent': 42,
+        'rotation_speed': 15,
+        'rotation_direction': 'clockwise',
+        'pulling_rate': pytest.approx(2 / 60e3),
+    }
+    assert steps[2] == {
+        'name': 'growth',
+        'duration': 24 * 3600,
+        'growth_power_in_percent': 45,
+    }
+
+
+def test_step_table_fills_spare_rows():
+    rows = read_rows('czochalski.csv')
+    steps = [['', f'step {index}', '1'] for index in range(12)]
+    rows[48:61] = [['', 'Step', 'Duration (h)'], *steps]
+
+    template = compile_layout(LAYOUTS['CPFSCzochralskiProcess']).extract(rows)
+
+    assert template.errors == []
+    assert template.series['steps']['name'] == [row[1] for row in steps]
+    assert template.groups['crystal']['sample_id']
+
+
+def test_layout_without_step_table():
+    template = compile_layout(LAYOUTS['CPFSFloatingZone']).extract(
+        read_rows('floatingzone.csv')
+    )
+
+    assert series_records(template.series['steps']) == []
+    assert template.groups['step']['growth_power_in_percent'] is not None
+
+
+def test_layout_reports_invalid_cells():
+    rows = read_rows('bridgman.csv')
+    rows[27][2] = 'hot'
+
+    template = compile_layout(LAYOUTS['CPFSBridgmanTechnique']).extract(rows)
+
+    assert template.groups['step']['temperature'] is None
+    assert template.errors == ["Cell C29: 'hot' is not a number."]
+
+
+def test_layout_stops_after_last_row():
+    def rows():
+        yield from read_rows('cvt.csv')
+        raise AssertionError('read past the last row of the layout')
+
+    compile_layout(LAYOUTS['CPFSChemicalVapourTransport']).extract(rows())
+
+
+def test_read_csv_rows_is_lazy():
+    file = io.BytesIO(b'\xef\xbb\xbfheader,,\n\na,b,c\n,,\n' + b'x,y,z\n' * 10000)
+
+    rows = read_csv_rows(file)
+    assert next(rows) == ['a', 'b', 'c']
+    assert next(rows) == ['', '', '']
+    rows.close()
+
+    assert file.tell() < len(file.getvalue())
+    assert not file.closed
+
+
+def test_read_templates_xlsx_workbook():
+    path = os.path.join('tests', 'data', 'fluxgrowth.xlsx')
+    with open(path, 'rb') as file:
+        templates = read_templates(file, FLUX_GROWTH_LAYOUT)
+
+    assert [template.sheet for template in templates] == ['Run A', 'Run B (repeat)']
+    assert [template.groups['crystal']['sample_id'] for template in templates] == [
+        'FG042',
+        'FG043',
+    ]
+    assert np.array_equal(
+        templates[0].series['profile']['temperature'],
+        templates[1].series['profile']['temperature'],
+    )
+
+    with open(path, 'rb') as file:
+        templates = read_templates(file, FLUX_GROWTH_LAYOUT, sheet='Run B (repeat)')
+    assert [template.sheet for template in templates] == ['Run B (repeat)']
+
+
+def test_read_templates_xlsx_stops_after_last_row():
+    filler = ''.join(
+        f'<row r="{row}"><c r="A{row}"><v>1</v></c></row>' for row in range(100, 30000)
+    )
+    workbook = io.BytesIO()
+    with (
+        zipfile.ZipFile(os.path.join('tests', 'data', 'fluxgrowth.xlsx')) as source,
+        zipfile.ZipFile(workbook, 'w') as target,
+    ):
+        for item in source.infolist():
+            content = source.read(item)
+            if item.filename.startswith('xl/worksheets/'):
+                # many rows after the layout, then XML that fails once it is parsed
+                content = content.replace(
+                    b'</sheetData>', f'{filler}<row></sheetData>'.encode()
+                )
+            target.writestr(item, content)
+    workbook.seek(0)
+
+    templates = read_templates(workbook, FLUX_GROWTH_LAYOUT)
+
+    assert [template.groups['crystal']['sample_id'] for template in templates] == [
+        'FG042',
+        'FG043',
+    ]
+
+
+def test_read_templates_other_technique():
+    with open(os.path.join('tests', 'data', 'cvt.csv'), 'rb') as file:
+        assert read_templates(file, FLUX_GROWTH_LAYOUT) == []
+
+
+@pytest.mark.parametrize(
+    'file_name, techniques',
+    [
+        ('fluxgrowth.xlsx', ['CPFSFluxGrowth']),
+        ('czochalski.csv', ['CPFSCzochralskiProcess']),
+        ('test.archive.yaml', []),
+    ],
+)
+def test_read_techniques(file_name, techniques):
+    with open(os.path.join('tests', 'data', file_name), 'rb') as file:
+        assert read_techniques(file) == techniques
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from cpfs_synthesis.thermal import (
+    DeviationAccumulator,
+    analyze_profile,
+    programmed_temperature,
+)
+
+HOUR = 3600
+
+# heat to 1100 °C in 5 h, soak 10 h, cool at 5 K/h for growth, then quench
+TIME = [0, 5 * HOUR, 15 * HOUR, 115 * HOUR, 120 * HOUR]
+TEMPERATURE = [298.15, 1373.15, 1373.15, 873.15, 298.15]
+
+
+def test_analyze_profile():
+    profile = analyze_profile(TIME, TEMPERATURE)
+
+    assert profile.max_temperature == pytest.approx(1373.15)
+    assert profile.total_duration == 120 * HOUR
+    assert profile.soak_duration == 10 * HOUR
+    assert profile.dwell_duration == 10 * HOUR
+    assert profile.growth_cooling_rate * HOUR == pytest.approx(5)
+    assert profile.thermal_budget == pytest.approx(np.trapezoid(TEMPERATURE, TIME))
+    assert profile.segments.kind.tolist() == ['heating', 'dwell', 'cooling', 'cooling']
+
+
+def test_analyze_profile_skips_missing_points():
+    temperature = [298.15, np.nan, 1373.15, 873.15, 298.15]
+
+    profile = analyze_profile([*TIME, np.nan], [*temperature, 300])
+
+    assert profile.segments.kind.tolist() == ['heating', 'cooling', 'cooling']
+    assert profile.soak_duration == 0
+    assert analyze_profile([], []).max_temperature is None
+
+
+@pytest.mark.parametrize('chunk_size', [1000, 7])
+def test_deviation_in_chunks(chunk_size):
+    # a log every minute over the first 20 h, overshooting by 8 K for 10 minutes
+    # after the ramp and otherwise 1 K below the profile
+    time = np.arange(0, 20 * HOUR, 60.0)
+    measured = programmed_temperature(TIME, TEMPERATURE, time) - 1
+    overshoot = (time >= 5 * HOUR) & (time < 5 * HOUR + 600)
+    measured[overshoot] += 9
+    boundaries = [*TIME]
+    accumulator = DeviationAccumulator(boundaries, tolerance=5)
+
+    for start in range(0, len(time), chunk_size):
+        chunk = slice(start, start + chunk_size)
+        accumulator.add(
+            time[chunk],
+            measured[chunk],
+            programmed_temperature(TIME, TEMPERATURE, time[chunk]),
+        )
+    deviation = accumulator.result()
+
+    assert deviation.samples.tolist() == [300, 600, 300, 0]
+    assert deviation.max_overshoot[:3] == pytest.approx([0, 8, 0])
+    assert np.isnan(deviation.max_overshoot[3])
+    assert deviation.time_out_of_tolerance.tolist() == [0, 600, 0, 0]
+    assert deviation.rms_error[0] == pytest.approx(1)
+    total = deviation.total()
+    assert total.samples[0] == len(time)
+    assert total.max_overshoot[0] == pytest.approx(8)
+    assert total.rms_error[0] == pytest.approx(np.sqrt((1190 + 640) / 1200))
@@ -0,0 +1,104 @@
+import json
+import threading
+
+from nomad.datamodel import EntryArchive, EntryMetadata
+
+from cpfs_synthesis.utils import (
+    canonical_json,
+    read_raw_json,
+    update_archive,
+    upload_lock,
+    write_raw_file,
+)
+
+WRITERS = 4
+INCREMENTS = 20
+
+
+class RawFileObject:
+    def __init__(self, os_path):
+        self.os_path = os_path
+
+
+class UploadFiles:
+    def __init__(self, directory):
+        self.directory = directory
+
+    def raw_file_object(self, path):
+        return RawFileObject(str(self.directory / path))
+
+
+class Context:
+    def __init__(self, directory):
+        self.directory = directory
+        self.upload_files = UploadFiles(directory)
+
+    def raw_path_exists(self, path):
+        return (self.directory / path).exists()
+
+    def raw_file(self, path, mode='r'):
+        return open(self.directory / path, mode)
+
+
+def test_write_raw_file_replaces_atomically(tmp_path):
+    context = Context(tmp_path)
+    write_raw_file(context, 'crystal.archive.json', canonical_json({'b': 1, 'a': 2}))
+    write_raw_file(context, 'crystal.archive.json', canonical_json({'a': 3}))
+
+    assert read_raw_json(context, 'crystal.archive.json') == {'a': 3}
+    assert [path.name for path in tmp_path.iterdir()] == ['crystal.archive.json']
+
+
+def test_upload_lock_serializes_writers(tmp_path):
+    context = Context(tmp_path)
+    write_raw_file(context, 'counter.json', json.dumps(0))
+
+    def increment():
+        for _ in range(INCREMENTS):
+            with upload_lock('test-upload'):
+                value = read_raw_json(context, 'counter.json')
+                write_raw_file(context, 'counter.json', json.dumps(value + 1))
+
+    threads = [threading.Thread(target=increment) for _ in range(WRITERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert read_raw_json(context, 'counter.json') == WRITERS * INCREMENTS
+
+
+def test_upload_locks_of_directories_are_independent(tmp_path):
+    acquired = threading.Event()
+
+    def lock_other():
+        with upload_lock(str(tmp_path / 'b')):
+            acquired.set()
+
+    with upload_lock(str(tmp_path / 'a')):
+        thread = threading.Thread(target=lock_other)
+        thread.start()
+        assert acquired.wait(timeout=5)
+    thread.join()
+
+
+def test_update_archive_compares_data_only(tmp_path, upload_context):
+    archive = EntryArchive(
+        m_context=upload_context, metadata=EntryMetadata(mainfile='a.archive.json')
+    )
+    data = {'name': 'Crucible1', 'datetime': '2026-01-01T00:00:00'}
+    saved = {
+        'm_def': 'nomad.datamodel.EntryArchive',
+        'metadata': {'entry_name': 'Crucible1'},
+        'data': data,
+    }
+    (tmp_path / 'crucible.archive.json').write_text(json.dumps(saved))
+
+    # saved in the GUI, with the same data up to the time of normalization
+    update = {'data': {**data, 'datetime': '2026-02-01T00:00:00'}}
+    assert not update_archive(archive, 'crucible.archive.json', lambda _: update)
+    assert upload_context.updated == []
+
+    update = {'data': {'name': 'Crucible2'}}
+    assert update_archive(archive, 'crucible.archive.json', lambda _: update)
+    assert read_raw_json(upload_context, 'crucible.archive.json') == {**saved, **update}
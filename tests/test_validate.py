@@ -0,0 +1,65 @@
+import json
+import os
+import shutil
+
+import pytest
+
+from cpfs_synthesis.cli import main
+from cpfs_synthesis.cpfs_schemes import CPFSInitialSynthesisComponent
+from cpfs_synthesis.formula import MATERIAL_STATES
+from cpfs_synthesis.validate import validate
+
+
+def write_broken_cvt(path):
+    with open(os.path.join('tests', 'data', 'cvt.csv')) as file:
+        text = file.read()
+    text = (
+        text.replace(',,800,,', ',,80O,,')
+        .replace('Co,Pieces', 'Co,Chunks')
+        .replace('Furnace3', 'Furnace9')
+        .replace('CVT003', '')
+    )
+    path.write_text(text)
+
+
+def test_validate_reports_every_problem(tmp_path):
+    shutil.copy(os.path.join('tests', 'data', 'bridgman.csv'), tmp_path)
+    write_broken_cvt(tmp_path / 'cvt.csv')
+    (tmp_path / 'other.csv').write_text(',,\n,,\n,,\n,Template CPFSSputtering,\n')
+    (tmp_path / 'notes.csv').write_text('no,template\n')
+
+    report = validate(str(tmp_path), workers=1).to_dict()
+
+    files = {file['path']: file for file in report['files']}
+    assert sorted(files) == ['bridgman.csv', 'cvt.csv', 'other.csv']
+    assert files['bridgman.csv']['valid']
+    cvt = files['cvt.csv']
+    assert not cvt['valid']
+    assert cvt['techniques'] == ['CPFSChemicalVapourTransport']
+    assert [problem['message'] for problem in cvt['problems']] == [
+        "Cell C28: '80O' is not a number.",
+        "The furnace 'Furnace9' is not in the catalog.",
+        "The state 'Chunks' of 'Co' is not one of Powder, Polycrystal, Plate, Pieces.",
+        'The crystal has no sample id, its entry is named after both.',
+    ]
+    assert cvt['problems'][1]['cell'] == 'C15'
+    assert not files['other.csv']['valid']
+    assert report['summary']['warnings'] == 1
+    assert report['summary']['valid'] == len(['bridgman.csv', 'notes.csv'])
+
+
+def test_cli_writes_report(tmp_path):
+    write_broken_cvt(tmp_path / 'cvt.csv')
+
+    assert main(['validate', str(tmp_path), '-o', str(tmp_path / 'report.json')]) == 1
+
+    with open(tmp_path / 'report.json') as file:
+        report = json.load(file)
+    assert report['summary']['files'] == 1
+
+
+def test_material_states():
+    for state in MATERIAL_STATES:
+        CPFSInitialSynthesisComponent(state=state)
+    with pytest.raises(ValueError):
+        CPFSInitialSynthesisComponent(state='Chunks')